@@ -124,7 +124,8 @@ User=$USER
 Group=www-data
 WorkingDirectory=$PROJECT_DIR
 Environment="PATH=$PROJECT_DIR/venv/bin"
-ExecStart=$PROJECT_DIR/venv/bin/gunicorn --workers 3 --bind unix:$PROJECT_DIR/pola_hidup_tracker.sock pola_hidup_tracker.wsgi:application --settings=pola_hidup_tracker.production_settings
+Environment="DJANGO_SETTINGS_MODULE=pola_hidup_tracker.production_settings"
+ExecStart=$PROJECT_DIR/venv/bin/gunicorn --workers 3 --worker-class uvicorn_worker.UvicornWorker --bind unix:$PROJECT_DIR/pola_hidup_tracker.sock pola_hidup_tracker.asgi:application
 Restart=always
 
 [Install]
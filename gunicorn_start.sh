@@ -7,7 +7,8 @@ USER="www-data"
 GROUP="www-data"
 NUM_WORKERS=3
 DJANGO_SETTINGS_MODULE="pola_hidup_tracker.production_settings"
-DJANGO_WSGI_MODULE="pola_hidup_tracker.wsgi"
+# ASGI: view AJAX async tidak memblokir worker selama menunggu database
+DJANGO_ASGI_MODULE="pola_hidup_tracker.asgi"
 
 echo "Starting $NAME as `whoami`"
 
@@ -22,9 +23,10 @@ RUNDIR=$(dirname $SOCKFILE)
 test -d $RUNDIR || mkdir -p $RUNDIR
 
 # Start your Django Unicorn
-exec gunicorn ${DJANGO_WSGI_MODULE}:application \
+exec gunicorn ${DJANGO_ASGI_MODULE}:application \
   --name $NAME \
   --workers $NUM_WORKERS \
+  --worker-class uvicorn_worker.UvicornWorker \
   --user=$USER --group=$GROUP \
   --bind=unix:$SOCKFILE \
   --log-level=info \
@@ -0,0 +1,133 @@
+"""Rule engine pencapaian: pencapaian dibuka sekali lalu disimpan sebagai baris ``Achievement``.
+
+Setiap perubahan aktivitas mengirim signal ``activity_changed`` berisi delta
+jumlah total dan selesai. Delta itu diterjemahkan ke event (aktivitas bertambah,
+berkurang, selesai, batal selesai) dan hanya rule yang terdampak event tersebut
+yang dievaluasi, sekali per user setelah transaksi di-commit. Rule yang sudah
+terbuka tidak dievaluasi lagi, jadi halaman profil cukup membaca baris
+``Achievement`` tanpa menghitung apa pun.
+
+Rule baru cukup didaftarkan dengan decorator ``rule`` beserta event pemicunya.
+"""
+import threading
+from collections import namedtuple
+
+from django.db import transaction
+from django.dispatch import receiver
+from django.utils.functional import cached_property
+
+from .models import Achievement, DailyRollup, Week
+from .signals import activity_changed
+
+TOTAL_UP = 'total_up'
+TOTAL_DOWN = 'total_down'
+COMPLETED_UP = 'completed_up'
+COMPLETED_DOWN = 'completed_down'
+ALL_EVENTS = frozenset({TOTAL_UP, TOTAL_DOWN, COMPLETED_UP, COMPLETED_DOWN})
+
+AchievementRule = namedtuple('AchievementRule', ['code', 'title', 'description', 'icon', 'events', 'check'])
+
+RULES = {}
+
+
+def rule(code, title, description, icon, events):
+    """Mendaftarkan rule; ``events`` adalah event yang bisa membuat kondisinya berubah menjadi terpenuhi"""
+    def decorator(check):
+        RULES[code] = AchievementRule(code, title, description, icon, frozenset(events), check)
+        return check
+    return decorator
+
+
+class UserFacts:
+    """Data user yang dibutuhkan rule, masing-masing diambil paling banyak sekali per evaluasi"""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+
+    @cached_property
+    def totals(self):
+        return DailyRollup.totals_for_user(self.user_id)
+
+    @cached_property
+    def streak(self):
+        return DailyRollup.streak_for_user(self.user_id)
+
+
+@rule('first_week', 'First Week', 'Menyelesaikan minggu pertama', 'bi-flag-fill', [TOTAL_UP])
+def first_week(facts):
+    return Week.objects.filter(user_id=facts.user_id).exists()
+
+
+@rule('high_achiever', 'High Achiever', 'Completion rate di atas 80%', 'bi-star-fill', [COMPLETED_UP, TOTAL_DOWN])
+def high_achiever(facts):
+    totals = facts.totals
+    return totals['total'] > 0 and totals['completed'] * 100 >= totals['total'] * 80
+
+
+@rule('week_warrior', 'Week Warrior', 'Konsisten selama seminggu', 'bi-fire', [COMPLETED_UP, TOTAL_DOWN])
+def week_warrior(facts):
+    return facts.streak >= 7
+
+
+@rule('century_club', 'Century Club', 'Lebih dari 100 aktivitas', 'bi-trophy-fill', [TOTAL_UP])
+def century_club(facts):
+    return facts.totals['total'] >= 100
+
+
+def events_for(total=0, completed=0):
+    events = set()
+    if total:
+        events.add(TOTAL_UP if total > 0 else TOTAL_DOWN)
+    if completed:
+        events.add(COMPLETED_UP if completed > 0 else COMPLETED_DOWN)
+    return events
+
+
+def evaluate(user_id, events=ALL_EVENTS):
+    """Mengevaluasi rule yang terpicu ``events`` dan belum terbuka, mengembalikan kode yang baru dibuka"""
+    candidates = {code for code, achievement_rule in RULES.items() if achievement_rule.events & events}
+    if not candidates:
+        return []
+    candidates -= set(
+        Achievement.objects.filter(user_id=user_id, code__in=candidates).values_list('code', flat=True)
+    )
+    facts = UserFacts(user_id)
+    unlocked = [code for code in sorted(candidates) if RULES[code].check(facts)]
+    if unlocked:
+        Achievement.objects.bulk_create(
+            [Achievement(user_id=user_id, code=code) for code in unlocked], ignore_conflicts=True
+        )
+    return unlocked
+
+
+def unlocked_for(user):
+    """Rule pencapaian yang sudah terbuka untuk user, urut waktu terbuka (satu query)"""
+    return [
+        {'rule': RULES[code], 'unlocked_at': unlocked_at}
+        for code, unlocked_at in Achievement.objects.filter(user=user).values_list('code', 'unlocked_at')
+        if code in RULES
+    ]
+
+
+# Event yang menunggu commit, per thread: {user_id: set(event)}
+_pending = threading.local()
+
+
+def _flush():
+    pending, _pending.events = getattr(_pending, 'events', {}), {}
+    for user_id, events in pending.items():
+        evaluate(user_id, events)
+
+
+@receiver(activity_changed, dispatch_uid='tracker.achievements')
+def queue_evaluation(sender, user_id, total=0, completed=0, rebuild=False, **kwargs):
+    """Mengumpulkan event selama transaksi; semua perubahan satu transaksi dievaluasi sekali setelah commit"""
+    events = ALL_EVENTS if rebuild else events_for(total, completed)
+    if not events:
+        return
+    if not hasattr(_pending, 'events'):
+        _pending.events = {}
+    _pending.events.setdefault(user_id, set()).update(events)
+    # Didaftarkan setiap kali: transaksi yang di-rollback membuang callback-nya,
+    # dan event yang tertinggal ikut dievaluasi ulang (aman, hanya membaca status) di commit berikutnya
+    transaction.on_commit(_flush, robust=True)
@@ -1,20 +1,146 @@
 from django.contrib import admin
-from .models import Week, Activity
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connections, transaction
+from django.db.models import Case, F, FloatField, Value, When
+from django.utils.functional import cached_property
+from .models import Week, Activity, Achievement, ScheduleTemplate, ScheduleTemplateItem
+
+# Di bawah jumlah ini COUNT(*) sungguhan cukup murah dan hasilnya tepat
+ESTIMATED_COUNT_THRESHOLD = 10000
+
+
+def estimated_row_count(model, using='default'):
+    """Perkiraan jumlah baris tabel dari statistik planner, None jika statistik belum ada"""
+    table = model._meta.db_table
+    connection = connections[using]
+    try:
+        with connection.cursor() as cursor:
+            if connection.vendor == 'postgresql':
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [table])
+            elif connection.vendor == 'sqlite':
+                # Baris pertama stat di sqlite_stat1 (hasil ANALYZE) adalah jumlah baris tabel
+                cursor.execute('SELECT stat FROM sqlite_stat1 WHERE tbl = %s LIMIT 1', [table])
+            else:
+                return None
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    # PostgreSQL memberi -1 untuk tabel yang belum pernah di-ANALYZE
+    return estimate if estimate >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Paginator changelist tanpa COUNT(*) penuh atas tabel besar.
+
+    Tanpa filter, jumlah baris diambil dari statistik planner. Dengan filter,
+    hitungan dibatasi ``ESTIMATED_COUNT_THRESHOLD`` baris (COUNT atas subquery
+    ber-LIMIT), jadi biayanya tetap kecil berapa pun ukuran tabelnya.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = estimated_row_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > ESTIMATED_COUNT_THRESHOLD:
+                return estimate
+        return queryset.order_by().values('pk')[:ESTIMATED_COUNT_THRESHOLD + 1].count()
+
 
 @admin.register(Week)
 class WeekAdmin(admin.ModelAdmin):
-    list_display = ['start_date', 'end_date', 'get_progress_percentage', 'created_at']
-    list_filter = ['start_date', 'created_at']
-    search_fields = ['start_date']
-    readonly_fields = ['created_at', 'updated_at']
+    list_display = ['start_date', 'end_date', 'user', 'get_progress_percentage', 'created_at']
+    list_select_related = ['user']
+    # Filter dan urutan default memakai week_start_date_idx; cari user lewat index username
+    list_filter = ['start_date']
+    search_fields = ['=user__username']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    readonly_fields = [
+        'total_activities', 'completed_activities', 'revision', 'template', 'template_total', 'template_completed',
+        'archived_at', 'created_at', 'updated_at',
+    ]
 
+    def get_queryset(self, request):
+        # Progress dihitung dari counter tersimpan di query yang sama, agar kolomnya bisa diurutkan
+        return super().get_queryset(request).annotate(progress=Case(
+            When(total_activities=0, then=Value(0.0)),
+            default=F('completed_activities') * Value(100.0) / F('total_activities'),
+            output_field=FloatField(),
+        ))
+
+    @admin.display(description='Progress', ordering='progress')
     def get_progress_percentage(self, obj):
         return f"{obj.get_progress_percentage()}%"
-    get_progress_percentage.short_description = 'Progress'
+
+    def delete_model(self, request, obj):
+        Week.delete_weeks([obj])
+
+    def delete_queryset(self, request, queryset):
+        # Cascade biasa meninggalkan rollup harian dan tidak mencatat tombstone delta-sync
+        Week.delete_weeks(queryset)
 
 @admin.register(Activity)
 class ActivityAdmin(admin.ModelAdmin):
-    list_display = ['name', 'day', 'week', 'completed', 'is_default', 'created_at']
-    list_filter = ['day', 'completed', 'is_default', 'week__start_date']
-    search_fields = ['name']
+    list_display = ['name', 'day', 'week', 'get_user', 'completed', 'is_default', 'created_at']
+    list_select_related = ['week__user']
+    # Pilihan filter statis (tanpa query); tanggal week memakai week_start_date_idx
+    list_filter = ['week__start_date', 'day', 'completed', 'is_default']
+    search_fields = ['=week__user__username']
+    raw_id_fields = ['week']
+    # Urutan primary key: halaman pertama dibaca langsung dari index tanpa sort seluruh tabel
+    ordering = ['-pk']
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
     readonly_fields = ['created_at', 'updated_at']
+
+    @admin.display(description='User', ordering='week__user__username')
+    def get_user(self, obj):
+        return obj.week.user
+
+    def delete_queryset(self, request, queryset):
+        # "Hapus terpilih" memakai queryset.delete() yang melewati Activity.delete:
+        # tombstone dicatat lalu counter, revisi, rollup dan cache week terdampak dihitung ulang
+        with transaction.atomic():
+            weeks = list(Week.objects.filter(pk__in=queryset.values('week_id')))
+            Activity.delete_with_tombstones(queryset)
+            Week.rebuild_summaries(weeks)
+
+class ScheduleTemplateItemInline(admin.TabularInline):
+    model = ScheduleTemplateItem
+    fields = ['position', 'day', 'name', 'time']
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+    def has_add_permission(self, request, obj=None):
+        return False
+
+@admin.register(ScheduleTemplate)
+class ScheduleTemplateAdmin(admin.ModelAdmin):
+    """Versi template hanya dibaca: isinya dirujuk oleh week dan tidak boleh berubah"""
+    list_display = ['version', 'created_at']
+    readonly_fields = ['version', 'digest', 'created_at']
+    inlines = [ScheduleTemplateItemInline]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        # Week arsip merujuk versi lewat detail arsipnya, bukan lewat foreign key
+        return False
+
+@admin.register(Achievement)
+class AchievementAdmin(admin.ModelAdmin):
+    """Pencapaian dibuka oleh rule engine; admin hanya melihat"""
+    list_display = ['user', 'code', 'unlocked_at']
+    list_select_related = ['user']
+    list_filter = ['code']
+    search_fields = ['=user__username']
+    readonly_fields = ['user', 'code', 'unlocked_at']
+
+    def has_add_permission(self, request):
+        return False
@@ -0,0 +1,124 @@
+"""Statistik per user untuk halaman stats.
+
+Breakdown per minggu dan per hari dihasilkan oleh satu query agregat, breakdown
+per nama aktivitas oleh tiga query tetap, lalu seluruh hasilnya disimpan di
+cache per user. Kunci cache memuat versi statistik user yang
+dinaikkan setiap kali aktivitasnya berubah, sehingga kunjungan berulang
+tidak menyentuh database sampai datanya benar-benar berubah.
+"""
+from django.core.cache import cache
+from django.db.models import Count, Q, Sum
+from django.db.models.functions import Coalesce, ExtractIsoWeekDay
+
+from .caching import get_version, stats_version_key
+from .metrics import record_cache_lookup
+from .models import Week, Activity, DailyRollup, WeekArchive
+
+# Entri lama tidak perlu dihapus: version bump membuatnya tidak terpakai
+STATS_CACHE_TIMEOUT = 60 * 60 * 24
+
+# Jumlah minggu terakhir yang ditampilkan pada breakdown per minggu
+WEEKLY_BREAKDOWN_LIMIT = 12
+
+
+def _row(label, total, completed):
+    return {
+        'label': label,
+        'total': total,
+        'completed': completed,
+        'rate': Week.calculate_progress(total, completed),
+    }
+
+
+def completion_by_week(user):
+    """Completion rate per minggu, langsung dari counter tersimpan di Week"""
+    weeks = (
+        Week.objects.filter(user=user, total_activities__gt=0)
+        .order_by('-start_date')
+        .values_list('start_date', 'end_date', 'total_activities', 'completed_activities')[:WEEKLY_BREAKDOWN_LIMIT]
+    )
+    return [
+        _row(f"{start:%d/%m} - {end:%d/%m/%Y}", total, completed)
+        for start, end, total, completed in weeks
+    ]
+
+
+def completion_by_weekday(user):
+    """Completion rate per hari dalam minggu (Senin..Minggu) dari rollup harian"""
+    per_weekday = (
+        DailyRollup.objects.filter(user=user)
+        .annotate(weekday=ExtractIsoWeekDay('date'))
+        .values('weekday')
+        .annotate(total=Coalesce(Sum('total'), 0), completed=Coalesce(Sum('completed'), 0))
+        .order_by('weekday')
+    )
+    labels = dict(Activity.DAYS_CHOICES)
+    day_keys = [day for day, _ in Activity.DAYS_CHOICES]
+    return [
+        _row(labels[day_keys[row['weekday'] - 1]], row['total'], row['completed'])
+        for row in per_weekday
+    ]
+
+
+def completion_by_activity(user):
+    """Completion rate per nama aktivitas (mis. 'Olahraga Pagi' vs 'Olahraga Sore').
+
+    Baris Activity dijumlahkan dengan satu agregat; item template dihitung dari
+    bitmap setiap week yang merujuk template (satu query, item dari cache) dan
+    week arsip dari jumlah per nama di ringkasannya.
+
+    Jumlah query tetap tiga, tetapi bitmap dibaca di Python: O(week x item
+    template), sekitar 108 bit per week. Status template sengaja disimpan sebagai
+    bitmap biner per week (satu baris, bukan ~108) dan SQLite tidak punya operasi
+    bit pada blob, jadi agregat per posisi tidak bisa dilakukan secara portabel di
+    SQL; tabel rollup per nama akan menambah satu tulis di setiap toggle. Karena
+    hasilnya di-cache sampai versi statistik user naik, biaya ini hanya dibayar
+    sekali setelah aktivitas berubah.
+    """
+    per_name = {
+        row['name']: [row['total'], row['completed']]
+        for row in Activity.objects.filter(week__user=user)
+        .values('name')
+        .annotate(total=Count('id'), completed=Count('id', filter=Q(completed=True)))
+        .order_by()
+    }
+    templated = Week.objects.filter(user=user, template__isnull=False).only('id', 'template_id', 'template_state')
+    for week in templated:
+        for activity in week.template_activities():
+            counts = per_name.setdefault(activity.name, [0, 0])
+            counts[0] += 1
+            counts[1] += activity.completed
+    # Week arsip sudah tidak punya baris maupun bitmap: jumlah per nama dibaca dari ringkasannya
+    for archived in WeekArchive.objects.filter(week__user=user).values_list('per_name', flat=True):
+        for name, (total, completed) in archived.items():
+            counts = per_name.setdefault(name, [0, 0])
+            counts[0] += total
+            counts[1] += completed
+    rows = sorted(per_name.items(), key=lambda item: (-item[1][0], item[0]))
+    return [_row(name, total, completed) for name, (total, completed) in rows]
+
+
+def build_user_statistics(user):
+    """Menghitung semua statistik user langsung dari database"""
+    totals = DailyRollup.totals_for_user(user)
+    return {
+        'total_weeks': Week.objects.filter(user=user).count(),
+        'total_activities': totals['total'],
+        'completed_activities': totals['completed'],
+        'completion_rate': Week.calculate_progress(totals['total'], totals['completed']),
+        'by_week': completion_by_week(user),
+        'by_weekday': completion_by_weekday(user),
+        'by_activity': completion_by_activity(user),
+    }
+
+
+def get_user_statistics(user):
+    """Statistik user dari cache; dihitung ulang hanya setelah versi statistik user naik"""
+    version = get_version(stats_version_key(user.pk))
+    key = f'tracker:stats:{user.pk}:{version}'
+    stats = cache.get(key)
+    record_cache_lookup(stats is not None, stats is None)
+    if stats is None:
+        stats = build_user_statistics(user)
+        cache.set(key, stats, STATS_CACHE_TIMEOUT)
+    return stats
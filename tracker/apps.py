@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TrackerConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tracker'
+
+    def ready(self):
+        # Mendaftarkan receiver rule engine pencapaian ke signal activity_changed
+        from . import achievements  # noqa: F401
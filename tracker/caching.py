@@ -0,0 +1,60 @@
+"""Helper versi cache untuk invalidasi berbasis version bump.
+
+Entri cache tidak pernah dihapus satu per satu; kuncinya memuat nomor versi
+sehingga menaikkan versi otomatis membuat entri lama tidak terpakai lagi
+(dan akhirnya kedaluwarsa di Redis/LocMem).
+"""
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .metrics import record_cache_lookup
+
+
+def _fresh_version():
+    # Versi awal berbasis waktu agar kunci versi yang sempat ter-evict
+    # tidak kembali ke nomor lama dan menghidupkan entri basi.
+    return time.time_ns() // 1000
+
+
+def get_version(key):
+    """Mengambil versi saat ini untuk ``key``, membuatnya jika belum ada"""
+    version = cache.get(key)
+    record_cache_lookup(version is not None, version is None)
+    if version is None:
+        fresh = _fresh_version()
+        cache.add(key, fresh, None)
+        version = cache.get(key, fresh)
+    return version
+
+
+def get_versions(keys):
+    """Seperti ``get_version`` untuk banyak kunci sekaligus (satu round trip jika semuanya ada)"""
+    versions = cache.get_many(keys)
+    record_cache_lookup(len(versions), 0)
+    for key in keys:
+        if key not in versions:
+            versions[key] = get_version(key)
+    return versions
+
+
+def bump_version(key):
+    """Menaikkan versi ``key`` sehingga semua entri yang bergantung padanya menjadi usang"""
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _fresh_version(), None)
+
+
+def bump_version_on_commit(key):
+    """Menaikkan versi setelah transaksi berjalan di-commit, agar pembaca tidak meng-cache data pra-commit"""
+    transaction.on_commit(lambda: bump_version(key))
+
+
+def stats_version_key(user_id):
+    return f'tracker:stats:version:{user_id}'
+
+
+def dashboard_day_version_key(week_id, day):
+    return f'tracker:dashboard:version:{week_id}:{day}'
@@ -0,0 +1,96 @@
+"""Ekspor seluruh riwayat aktivitas user sebagai CSV atau NDJSON secara streaming.
+
+Week dan baris Activity dibaca sebagai dua stream terurut per tanggal week
+(``aiterator(chunk_size=...)``, server-side cursor di PostgreSQL) lalu
+digabung per week, sehingga memori tetap konstan berapa pun panjang riwayat.
+Item template dibentuk dari bitmap week dan week arsip dari ringkasannya,
+keduanya tanpa query tambahan per week. Generator-nya async agar respons
+streaming di bawah ASGI tidak dikumpulkan dulu ke memori dan tidak menahan
+thread worker selama klien mengunduh.
+"""
+import csv
+import json
+
+from asgiref.sync import sync_to_async
+
+from .models import Week, Activity, ScheduleTemplate
+
+EXPORT_FIELDS = ('week_start', 'date', 'day', 'name', 'time', 'completed', 'is_default')
+# Jumlah baris per fetch dari database
+EXPORT_CHUNK_SIZE = 2000
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson; charset=utf-8', 'ndjson'),
+}
+
+
+class _LineBuffer:
+    """Objek mirip file untuk csv.writer: ``write`` langsung mengembalikan barisnya"""
+
+    def write(self, value):
+        return value
+
+
+def _load_templates():
+    # Item semua versi template masuk cache proses, jadi penggabungan per week murni Python
+    for template_id in ScheduleTemplate.objects.values_list('pk', flat=True):
+        ScheduleTemplate.items_for(template_id)
+
+
+def _week_entries(week, rows):
+    """Baris ekspor satu week: item template/arsip diikuti baris Activity (sudah urut waktu dibuat)"""
+    if week.is_archived:
+        activities = week.archive.activities()
+    else:
+        activities = week.template_activities()
+    entries = [
+        (activity.day, activity.name, activity.time, activity.completed, activity.is_default)
+        for activity in activities
+    ] + rows
+    return [
+        {
+            'week_start': week.start_date.isoformat(),
+            'date': Week.date_for_day(week.start_date, day).isoformat(),
+            'day': day,
+            'name': name,
+            'time': time or '',
+            'completed': completed,
+            'is_default': is_default,
+        }
+        for day, name, time, completed, is_default in entries
+    ]
+
+
+async def export_rows(user, chunk_size=EXPORT_CHUNK_SIZE):
+    """Semua aktivitas user urut tanggal week, satu list dict per week"""
+    await sync_to_async(_load_templates)()
+    weeks = Week.objects.filter(user=user).select_related('archive').order_by('start_date')
+    # Diurutkan menurut tanggal week lewat join di SQL, sejajar dengan stream week di atas.
+    # values() dan bukan values_list(): iterator values_list menjalankan query-nya di event loop.
+    activities = (
+        Activity.objects.filter(week__user=user)
+        .order_by('week__start_date', 'created_at', 'id')
+        .values('week_id', 'day', 'name', 'time', 'completed', 'is_default')
+        .aiterator(chunk_size=chunk_size)
+    )
+    pending = await anext(activities, None)
+    async for week in weeks.aiterator(chunk_size=chunk_size):
+        rows = []
+        while pending is not None and pending['week_id'] == week.pk:
+            rows.append((pending['day'], pending['name'], pending['time'], pending['completed'], pending['is_default']))
+            pending = await anext(activities, None)
+        yield _week_entries(week, rows)
+
+
+async def stream_export(user, export_format):
+    """Potongan teks CSV/NDJSON untuk StreamingHttpResponse, satu potongan per week"""
+    if export_format == 'csv':
+        writer = csv.writer(_LineBuffer())
+        yield writer.writerow(EXPORT_FIELDS)
+        async for entries in export_rows(user):
+            if entries:
+                yield ''.join(writer.writerow([entry[field] for field in EXPORT_FIELDS]) for entry in entries)
+    else:
+        async for entries in export_rows(user):
+            if entries:
+                yield ''.join(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
@@ -33,11 +33,40 @@ class ActivityForm(forms.ModelForm):
             'time': 'Format waktu bersifat opsional. Contoh: 08:00 - 10:00 atau 2 jam',
         }
 
-    def __init__(self, *args, **kwargs):
+    def __init__(self, *args, week=None, **kwargs):
         super().__init__(*args, **kwargs)
+        # Week tujuan: ``week`` bukan field form, jadi constraint unik (week, day, name) divalidasi di clean()
+        self.week = week
         # Menambahkan CSS classes untuk styling Bootstrap
         for field_name, field in self.fields.items():
             field.widget.attrs.update({'class': 'form-control'})
         
         # Khusus untuk select day
-        self.fields['day'].widget.attrs.update({'class': 'form-select'})
\ No newline at end of file
+        self.fields['day'].widget.attrs.update({'class': 'form-select'})
+
+    def clean(self):
+        cleaned_data = super().clean()
+        day, name = cleaned_data.get('day'), cleaned_data.get('name')
+        if self.week is not None and day and name:
+            duplicates = Activity.objects.filter(week=self.week, day=day, name=name)
+            if self.instance.pk is not None:
+                duplicates = duplicates.exclude(pk=self.instance.pk)
+            # Item template tidak punya baris Activity, tapi tetap tampil sebagai aktivitas hari itu
+            template_names = {item.name for item in self.week.template_items() if item.day == day}
+            if name in template_names or duplicates.exists():
+                self.add_error('name', 'Aktivitas dengan nama ini sudah ada pada hari tersebut.')
+        return cleaned_data
+
+class ImportForm(forms.Form):
+    """Form unggah file CSV/.ics untuk impor aktivitas massal"""
+    file = forms.FileField(
+        label='File CSV atau .ics',
+        help_text='CSV dengan kolom name, day/date, time (opsional), atau kalender .ics',
+        widget=forms.ClearableFileInput(attrs={'class': 'form-control', 'accept': '.csv,.ics,text/csv,text/calendar'}),
+    )
+    week_offset = forms.IntegerField(
+        label='Week untuk baris tanpa tanggal',
+        initial=0,
+        help_text='Offset dari minggu ini (0 = minggu ini, -1 = minggu lalu); dipakai jika baris CSV tidak punya date/week_offset',
+        widget=forms.NumberInput(attrs={'class': 'form-control'}),
+    )
@@ -0,0 +1,252 @@
+"""Impor aktivitas massal dari file CSV atau iCalendar (.ics).
+
+File diparse menjadi baris (tanggal awal week, hari, nama, waktu, selesai),
+setiap baris divalidasi dengan aturan ``ActivityForm``, lalu baris yang valid
+disisipkan dengan satu ``bulk_create`` per week di dalam satu transaksi.
+Baris yang tidak valid dilaporkan per nomor baris tanpa membatalkan baris lain.
+
+CSV memakai header seperti hasil ekspor: ``name`` wajib, lalu ``date``
+(YYYY-MM-DD) atau ``day`` (senin..minggu) dengan ``week_offset`` opsional;
+``time`` dan ``completed`` opsional. Event .ics dipetakan lewat DTSTART,
+termasuk event berulang mingguan (RRULE FREQ=WEEKLY) seperti jadwal kuliah.
+"""
+import csv
+import io
+from collections import namedtuple
+from datetime import date, datetime, timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .forms import ActivityForm
+from .models import Week, Activity, SyncClock, TEMPLATE_BATCH_SIZE
+
+IMPORT_MAX_BYTES = 1024 * 1024
+IMPORT_MAX_ROWS = 2000
+# Batas kejadian per event berulang tanpa COUNT/UNTIL (satu semester)
+IMPORT_MAX_OCCURRENCES = 26
+
+ImportRow = namedtuple('ImportRow', ['line', 'start_date', 'day', 'name', 'time', 'completed'])
+
+DAY_KEYS = [day for day, _ in Activity.DAYS_CHOICES]
+ICS_WEEKDAYS = {'MO': 0, 'TU': 1, 'WE': 2, 'TH': 3, 'FR': 4, 'SA': 5, 'SU': 6}
+TRUE_VALUES = {'1', 'true', 'ya', 'yes', 'y'}
+
+
+class ImportFileError(ValueError):
+    """File tidak bisa dibaca sama sekali (format, encoding atau ukuran)"""
+
+
+def _decode(data):
+    if len(data) > IMPORT_MAX_BYTES:
+        raise ImportFileError(f'File lebih dari {IMPORT_MAX_BYTES // 1024} KB')
+    try:
+        return data.decode('utf-8-sig')
+    except UnicodeDecodeError:
+        raise ImportFileError('File harus berencoding UTF-8')
+
+
+def _row_for_date(line, day_date, name, time, completed=False):
+    start_date = day_date - timedelta(days=day_date.weekday())
+    return ImportRow(line, start_date, DAY_KEYS[day_date.weekday()], name, time, completed)
+
+
+def parse_csv(data, week_offset=0):
+    """Mengembalikan (baris, error) dari isi file CSV; error berupa (nomor baris, pesan)"""
+    reader = csv.DictReader(io.StringIO(_decode(data)))
+    if not reader.fieldnames or 'name' not in [field.strip().lower() for field in reader.fieldnames]:
+        raise ImportFileError('Header CSV wajib memuat kolom name')
+
+    rows, errors = [], []
+    for record in reader:
+        line = reader.line_num
+        # Kolom berlebih dikumpulkan DictReader sebagai list di bawah kunci None
+        if None in record:
+            errors.append((line, 'Jumlah kolom melebihi header'))
+            continue
+        record = {key.strip().lower(): (value or '').strip() for key, value in record.items()}
+        completed = record.get('completed', '').lower() in TRUE_VALUES
+        try:
+            if record.get('date'):
+                rows.append(_row_for_date(
+                    line, date.fromisoformat(record['date']), record['name'], record.get('time', ''), completed,
+                ))
+            else:
+                offset = int(record['week_offset']) if record.get('week_offset') else week_offset
+                rows.append(ImportRow(
+                    line, Week.start_date_for_offset(offset), record.get('day', '').lower(),
+                    record['name'], record.get('time', ''), completed,
+                ))
+        except ValueError:
+            errors.append((line, 'date harus berformat YYYY-MM-DD dan week_offset harus angka'))
+    return rows, errors
+
+
+def _unfold(text):
+    """Baris iCalendar yang dilipat (diawali spasi/tab) disambung ke baris sebelumnya"""
+    lines = []
+    for number, raw in enumerate(text.splitlines(), start=1):
+        if raw[:1] in (' ', '\t') and lines:
+            lines[-1] = (lines[-1][0], lines[-1][1] + raw[1:])
+        else:
+            lines.append((number, raw))
+    return lines
+
+
+def _ics_value(value):
+    """Tanggal (event seharian) atau datetime lokal dari nilai DTSTART/DTEND/UNTIL/EXDATE"""
+    if 'T' not in value:
+        return datetime.strptime(value[:8], '%Y%m%d').date()
+    moment = datetime.strptime(value.rstrip('Z')[:15], '%Y%m%dT%H%M%S')
+    if value.endswith('Z'):
+        moment = timezone.localtime(moment.replace(tzinfo=timezone.utc)).replace(tzinfo=None)
+    return moment
+
+
+def _unescape(text):
+    return text.replace('\\n', ' ').replace('\\N', ' ').replace('\\,', ',').replace('\\;', ';').replace('\\\\', '\\')
+
+
+def _occurrences(start, rule, excluded):
+    """Tanggal kejadian event; hanya RRULE FREQ=WEEKLY (INTERVAL, BYDAY, COUNT, UNTIL) yang didukung"""
+    first = start.date() if isinstance(start, datetime) else start
+    if not rule:
+        return [first]
+    parts = dict(part.split('=', 1) for part in rule.split(';') if '=' in part)
+    if parts.get('FREQ') != 'WEEKLY':
+        raise ValueError(f"RRULE FREQ={parts.get('FREQ')} tidak didukung, hanya WEEKLY")
+    try:
+        interval = int(parts.get('INTERVAL', 1))
+        count = int(parts['COUNT']) if 'COUNT' in parts else None
+    except ValueError:
+        raise ImportFileError('RRULE INTERVAL dan COUNT harus berupa angka')
+    # INTERVAL 0 atau negatif membuat perulangan tidak pernah maju
+    if interval < 1:
+        raise ImportFileError('RRULE INTERVAL minimal 1')
+    if count is not None and count < 1:
+        raise ImportFileError('RRULE COUNT minimal 1')
+    if count is not None:
+        count = min(count, IMPORT_MAX_ROWS)
+    until = _ics_value(parts['UNTIL']) if 'UNTIL' in parts else None
+    until = until.date() if isinstance(until, datetime) else until
+    weekdays = sorted(ICS_WEEKDAYS[day[-2:]] for day in parts.get('BYDAY', '').split(',') if day[-2:] in ICS_WEEKDAYS)
+    weekdays = weekdays or [first.weekday()]
+
+    dates = []
+    week_start = first - timedelta(days=first.weekday())
+    limit = count or IMPORT_MAX_OCCURRENCES
+    while len(dates) < limit:
+        for weekday in weekdays:
+            day_date = week_start + timedelta(days=weekday)
+            if day_date < first:
+                continue
+            if until and day_date > until or len(dates) >= limit:
+                break
+            dates.append(day_date)
+        if until and week_start + timedelta(days=6) >= until:
+            break
+        try:
+            week_start += timedelta(weeks=interval)
+        except OverflowError:
+            # INTERVAL sangat besar melewati batas tanggal: tidak ada kejadian berikutnya
+            break
+    return [day_date for day_date in dates if day_date not in excluded]
+
+
+def parse_ics(data):
+    """Mengembalikan (baris, error) dari isi file iCalendar; satu baris per kejadian event"""
+    text = _decode(data)
+    if 'BEGIN:VCALENDAR' not in text:
+        raise ImportFileError('File .ics tidak memuat BEGIN:VCALENDAR')
+
+    rows, errors, event = [], [], None
+    for line, raw in _unfold(text):
+        name, _, value = raw.partition(':')
+        key = name.split(';', 1)[0].upper()
+        if key == 'BEGIN' and value.upper() == 'VEVENT':
+            event = {'line': line, 'EXDATE': []}
+        elif event is None:
+            continue
+        elif key == 'END' and value.upper() == 'VEVENT':
+            try:
+                start = _ics_value(event['DTSTART'])
+                end = _ics_value(event['DTEND']) if 'DTEND' in event else None
+                excluded = {
+                    moment.date() if isinstance(moment, datetime) else moment
+                    for moment in map(_ics_value, event['EXDATE'])
+                }
+                time = ''
+                if isinstance(start, datetime):
+                    time = f'{start:%H:%M} - {end:%H:%M}' if isinstance(end, datetime) else f'{start:%H:%M}'
+                for day_date in _occurrences(start, event.get('RRULE'), excluded):
+                    rows.append(_row_for_date(event['line'], day_date, _unescape(event.get('SUMMARY', '')), time))
+            except ImportFileError:
+                raise
+            except (KeyError, ValueError) as e:
+                message = 'DTSTART wajib diisi' if isinstance(e, KeyError) else str(e)
+                errors.append((event['line'], message))
+            event = None
+        elif key == 'EXDATE':
+            event['EXDATE'].extend(value.split(','))
+        elif key in ('SUMMARY', 'DTSTART', 'DTEND', 'RRULE'):
+            event[key] = value.strip()
+    return rows, errors
+
+
+def import_rows(user, rows):
+    """Memvalidasi dan menyisipkan baris hasil parse untuk user, mengembalikan (jumlah dibuat, error).
+
+    Semua baris divalidasi dulu dengan ``ActivityForm`` dan terhadap aktivitas
+    yang sudah ada, termasuk item template week tujuan, lalu disisipkan dengan satu ``bulk_create`` per
+    week; counter, rollup dan cache week yang terdampak dihitung ulang sekali.
+    """
+    if len(rows) > IMPORT_MAX_ROWS:
+        raise ImportFileError(f'Maksimal {IMPORT_MAX_ROWS} aktivitas per file')
+
+    errors, valid = [], []
+    for row in rows:
+        form = ActivityForm(data={'day': row.day, 'name': row.name, 'time': row.time})
+        if form.is_valid():
+            valid.append((row, form.cleaned_data))
+        else:
+            errors.append((row.line, ' '.join(message for messages in form.errors.values() for message in messages)))
+
+    with transaction.atomic():
+        # Clock dinaikkan lebih dulu agar SQLite mengambil write lock di awal transaksi
+        seq = SyncClock.advance([user.pk])[user.pk] if valid else 0
+        weeks = {}
+        for start_date in sorted({row.start_date for row, _ in valid}):
+            weeks[start_date], _ = Week.objects.get_or_create(
+                user=user, start_date=start_date, defaults={'end_date': Week.end_date_for(start_date)}
+            )
+            # Template diisi sekarang, bukan saat week pertama kali dibuka, agar item
+            # template (mis. dari file ekspor yang diimpor ulang) tidak tersalin jadi baris custom
+            weeks[start_date].ensure_template()
+        existing = set(
+            Activity.objects.filter(week__in=weeks.values()).values_list('week_id', 'day', 'name')
+        )
+        for week in weeks.values():
+            existing.update((week.pk, item.day, item.name) for item in week.template_items())
+
+        per_week = {}
+        for row, cleaned in valid:
+            week = weeks[row.start_date]
+            key = (week.pk, cleaned['day'], cleaned['name'])
+            if week.is_archived:
+                errors.append((row.line, f'Week {week.start_date:%d/%m/%Y} sudah diarsipkan'))
+            elif key in existing:
+                errors.append((row.line, f"{cleaned['name']} sudah ada pada {cleaned['day']} week {week.start_date:%d/%m/%Y}"))
+            else:
+                existing.add(key)
+                per_week.setdefault(week.pk, []).append(Activity(
+                    week=week, day=cleaned['day'], name=cleaned['name'], time=cleaned['time'],
+                    completed=row.completed, sync_seq=seq,
+                ))
+
+        for activities in per_week.values():
+            Activity.objects.bulk_create(activities, batch_size=TEMPLATE_BATCH_SIZE)
+        if per_week:
+            Week.rebuild_summaries([week for week in weeks.values() if week.pk in per_week])
+
+    errors.sort(key=lambda error: error[0])
+    return sum(len(activities) for activities in per_week.values()), errors
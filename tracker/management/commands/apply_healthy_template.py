@@ -1,7 +1,64 @@
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
 from django.core.management.base import BaseCommand
 from django.contrib.auth.models import User
+from django.db import connection, connections, transaction
 from tracker.models import Week, Activity
 
+
+def apply_template_to_users(user_ids, clear_existing, current_week_only, chunk_size):
+    """Menerapkan template untuk sekumpulan user; dipanggil langsung atau di worker process.
+
+    Mengembalikan (jumlah week, aktivitas template dipasang, aktivitas custom dihapus).
+    """
+    start_date = Week.start_date_for_offset(0)
+    if current_week_only:
+        users_without_week = user_ids
+    else:
+        # User tanpa week sama sekali mendapat week untuk minggu ini
+        users_with_weeks = set(Week.objects.filter(user_id__in=user_ids).values_list('user_id', flat=True).distinct())
+        users_without_week = [user_id for user_id in user_ids if user_id not in users_with_weeks]
+    Week.objects.bulk_create(
+        [
+            Week(user_id=user_id, start_date=start_date, end_date=Week.end_date_for(start_date))
+            for user_id in users_without_week
+        ],
+        ignore_conflicts=True,
+    )
+
+    # Week arsip hanya bisa dibaca, templatenya tidak diganti
+    weeks = Week.objects.filter(user_id__in=user_ids, archived_at__isnull=True)
+    if current_week_only:
+        weeks = weeks.filter(start_date=start_date)
+    weeks = weeks.order_by('pk').only('pk', 'user_id', 'start_date')
+    total_weeks = total_created = total_cleared = 0
+    last_pk = 0
+
+    while True:
+        chunk = list(weeks.filter(pk__gt=last_pk)[:chunk_size])
+        if not chunk:
+            break
+        last_pk = chunk[-1].pk
+        week_ids = [week.pk for week in chunk]
+
+        # Satu transaksi per chunk: hapus massal, sisipkan massal, hitung ulang ringkasan
+        with transaction.atomic():
+            # Tombstone dicatat agar perangkat lain ikut menghapus aktivitas lama saat delta-sync
+            if clear_existing:
+                total_cleared += Activity.delete_with_tombstones(
+                    Activity.objects.filter(week__in=week_ids, is_default=False)
+                )
+            # Salinan default lama (sebelum template dirujuk) diganti rujukan ke versi template terbaru
+            Activity.delete_with_tombstones(Activity.objects.filter(week__in=week_ids, is_default=True))
+            Activity.materialize_template(chunk, reset=True)
+            total_created += sum(Week.objects.filter(pk__in=week_ids).values_list('template_total', flat=True))
+        total_weeks += len(chunk)
+
+    return total_weeks, total_created, total_cleared
+
+
 class Command(BaseCommand):
     help = 'Menerapkan template pola hidup sehat untuk user tertentu atau semua user'
 
@@ -21,6 +78,18 @@ class Command(BaseCommand):
             action='store_true',
             help='Hanya terapkan template untuk minggu ini saja',
         )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=200,
+            help='Jumlah week per transaksi (default: 200)',
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=1,
+            help='Jumlah worker process; user dibagi rata ke setiap worker (default: 1)',
+        )
 
     def handle(self, *args, **options):
         self.stdout.write(
@@ -30,7 +99,7 @@ class Command(BaseCommand):
         # Determine users to process
         if options['user']:
             try:
-                users = [User.objects.get(username=options['user'])]
+                user_ids = [User.objects.get(username=options['user']).pk]
                 self.stdout.write(f"👤 Target user: {options['user']}")
             except User.DoesNotExist:
                 self.stdout.write(
@@ -38,69 +107,47 @@ class Command(BaseCommand):
                 )
                 return
         else:
-            users = User.objects.all()
-            self.stdout.write(f"👥 Target: Semua user ({users.count()} user)")
-
-        total_created = 0
-        total_users_processed = 0
-
-        for user in users:
-            self.stdout.write(f"\n👤 Processing user: {user.username}")
-            
-            if options['current_week_only']:
-                # Hanya untuk minggu ini
-                week = Week.get_or_create_current_week(user)
-                weeks = [week]
-                self.stdout.write(f"📅 Menerapkan template untuk minggu ini: {week}")
-            else:
-                # Untuk semua minggu user ini
-                weeks = Week.objects.filter(user=user)
-                if not weeks.exists():
-                    # Jika belum ada minggu, buat minggu ini
-                    week = Week.get_or_create_current_week(user)
-                    weeks = [week]
-                self.stdout.write(f"📅 Menerapkan template untuk {weeks.count()} minggu")
-
-            user_activities_created = 0
-
-            for week in weeks:
-                self.stdout.write(f"  📍 Processing Week: {week.start_date} - {week.end_date}")
-                
-                if options['clear_existing']:
-                    # Hapus aktivitas non-default
-                    deleted_count = Activity.objects.filter(
-                        week=week, 
-                        is_default=False
-                    ).delete()[0]
-                    if deleted_count > 0:
-                        self.stdout.write(f"    🗑️  Dihapus {deleted_count} aktivitas custom")
-
-                # Hapus aktivitas default lama untuk diganti dengan template baru
-                old_defaults = Activity.objects.filter(week=week, is_default=True)
-                old_count = old_defaults.count()
-                if old_count > 0:
-                    old_defaults.delete()
-                    self.stdout.write(f"    🔄 Dihapus {old_count} aktivitas default lama")
-
-                # Terapkan template baru
-                Activity.create_default_activities(week)
-                
-                # Hitung aktivitas yang dibuat
-                new_activities = Activity.objects.filter(week=week, is_default=True)
-                created_count = new_activities.count()
-                user_activities_created += created_count
-                
-                self.stdout.write(f"    ✅ Dibuat {created_count} aktivitas template")
-
-            total_created += user_activities_created
-            total_users_processed += 1
-            self.stdout.write(f"  📊 Total untuk {user.username}: {user_activities_created} aktivitas")
+            user_ids = list(User.objects.order_by('pk').values_list('pk', flat=True))
+            self.stdout.write(f"👥 Target: Semua user ({len(user_ids)} user)")
+
+        workers = max(1, min(options['workers'], len(user_ids)))
+        if workers > 1 and connection.vendor == 'sqlite':
+            # Transaksi chunk membaca lalu menulis; di SQLite upgrade lock antar proses gagal
+            # dengan "database is locked" dan meninggalkan user setengah termigrasi
+            self.stdout.write(
+                self.style.WARNING('⚠️  SQLite hanya mengizinkan satu penulis; --workers diabaikan, memakai 1 worker')
+            )
+            workers = 1
+        job_args = (options['clear_existing'], options['current_week_only'], options['chunk_size'])
+        started = time.perf_counter()
+
+        if workers == 1:
+            results = [apply_template_to_users(user_ids, *job_args)]
+        else:
+            # Koneksi milik parent tidak boleh diwarisi oleh proses hasil fork
+            connections.close_all()
+            partitions = [user_ids[i::workers] for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers, mp_context=get_context('fork')) as pool:
+                futures = [pool.submit(apply_template_to_users, partition, *job_args) for partition in partitions]
+                results = [future.result() for future in futures]
+            self.stdout.write(f"⚙️  {workers} worker process selesai")
+
+        elapsed = time.perf_counter() - started
+        total_weeks = sum(result[0] for result in results)
+        total_created = sum(result[1] for result in results)
+        total_cleared = sum(result[2] for result in results)
+
+        if total_cleared:
+            self.stdout.write(f"🗑️  Dihapus {total_cleared} aktivitas custom")
 
         self.stdout.write(
             self.style.SUCCESS(
                 f'\n🎉 Template berhasil diterapkan!'
-                f'\n👥 Users processed: {total_users_processed}'
-                f'\n📊 Total: {total_created} aktivitas template dibuat'
+                f'\n👥 Users processed: {len(user_ids)}'
+                f'\n📅 Weeks processed: {total_weeks}'
+                f'\n📊 Total: {total_created} aktivitas template dipasang'
+                f'\n⏱️  {elapsed:.2f} detik ({total_weeks / elapsed if elapsed else 0:.1f} week/detik, '
+                f'{total_created / elapsed if elapsed else 0:.0f} aktivitas/detik)'
                 f'\n📱 Buka http://127.0.0.1:8000/ untuk melihat hasilnya'
             )
         )
@@ -118,4 +165,4 @@ class Command(BaseCommand):
                 f'\n😴 Tidur teratur (22:00-22:30)'
                 f'\n🍽️ Pola makan sehat 3x sehari'
             )
-        )
\ No newline at end of file
+        )
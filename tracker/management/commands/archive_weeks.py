@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from tracker.models import Week, WeekArchive
+
+
+class Command(BaseCommand):
+    help = (
+        'Memadatkan week lama ke ringkasan WeekArchive lalu menghapus baris aktivitasnya per batch '
+        '(statistik tidak berubah, week arsip tetap bisa dibuka read-only)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--older-than',
+            type=int,
+            default=26,
+            help='Arsipkan week yang dimulai lebih dari N week sebelum minggu ini (default: 26)',
+        )
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username yang diarsipkan (default: semua user)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=200,
+            help='Jumlah week per transaksi (default: 200)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Hanya hitung week yang akan diarsipkan',
+        )
+
+    def handle(self, *args, **options):
+        if options['older_than'] < 1:
+            raise CommandError('--older-than minimal 1 agar minggu ini tidak pernah diarsipkan')
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size minimal 1')
+
+        cutoff = Week.start_date_for_offset(-options['older_than'])
+        weeks = Week.objects.filter(
+            start_date__lt=cutoff, archived_at__isnull=True, template_applied=True
+        ).order_by('pk')
+        if options['user']:
+            weeks = weeks.filter(user__username=options['user'])
+
+        if options['dry_run']:
+            self.stdout.write(f'🔍 {weeks.count()} week dimulai sebelum {cutoff} dan belum diarsipkan')
+            return
+
+        started = time.perf_counter()
+        archived_weeks = deleted_rows = 0
+        last_pk = 0
+
+        while True:
+            batch = list(weeks.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            # Satu transaksi per batch: ringkasan disimpan dan baris dihapus bersamaan
+            deleted_rows += WeekArchive.archive_weeks(batch)
+            archived_weeks += len(batch)
+            self.stdout.write(f'  🗄️  {archived_weeks} week diarsipkan, {deleted_rows} baris aktivitas dihapus')
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {archived_weeks} week sebelum {cutoff} diarsipkan dalam {elapsed:.2f} detik'
+                f'\n🗑️  {deleted_rows} baris aktivitas dihapus dari tabel aktif'
+            )
+        )
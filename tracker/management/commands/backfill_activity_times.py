@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand, CommandError
+from tracker.caching import bump_version, dashboard_day_version_key
+from tracker.models import Activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Mengisi posisi hari dan jam mulai/selesai terstruktur dari teks waktu aktivitas lama, per batch '
+        '(aman dihentikan dan dijalankan ulang: hanya baris yang belum terisi yang diproses)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jumlah aktivitas per batch (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError('--batch-size minimal 1')
+
+        pending = Activity.objects.filter(day_order__isnull=True).order_by('pk').only('pk', 'week_id', 'day', 'time')
+        processed = parsed = 0
+        last_pk = 0
+
+        while True:
+            batch = list(pending.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            for activity in batch:
+                activity.fill_schedule_fields()
+            # bulk_update tidak menyentuh updated_at/sync_seq: isi aktivitas bagi user tidak berubah
+            Activity.objects.bulk_update(batch, ['day_order', 'start_time', 'end_time'])
+            # Urutan kronologis di dashboard bisa berubah, jadi fragmen hari yang terdampak diganti
+            for week_id, day in {(activity.week_id, activity.day) for activity in batch}:
+                bump_version(dashboard_day_version_key(week_id, day))
+            processed += len(batch)
+            parsed += sum(activity.start_time is not None for activity in batch)
+            self.stdout.write(f"  📍 {processed} aktivitas diproses")
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {processed} aktivitas di-backfill, {parsed} punya jam terstruktur')
+        )
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tracker.models import Week, DailyRollup
+
+
+class Command(BaseCommand):
+    help = 'Membangun ulang rollup harian per user dari data aktivitas, per batch week'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username yang dibangun ulang (default: semua user)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jumlah week per batch/transaksi (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        weeks = Week.objects.order_by('pk').only('pk', 'user_id', 'start_date')
+        if options['user']:
+            weeks = weeks.filter(user__username=options['user'])
+
+        batch_size = options['batch_size']
+        processed = 0
+        last_pk = 0
+
+        while True:
+            batch = list(weeks.filter(pk__gt=last_pk)[:batch_size])
+            if not batch:
+                break
+            last_pk = batch[-1].pk
+            with transaction.atomic():
+                DailyRollup.rebuild_for_weeks(batch)
+            processed += len(batch)
+            self.stdout.write(f"  📍 {processed} week diproses")
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ Rollup harian dibangun ulang untuk {processed} week ({processed * 7} tanggal)')
+        )
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection, models, transaction
+from django.test.utils import CaptureQueriesContext
+from tracker.models import Week, Activity, DEFAULT_ACTIVITY_TEMPLATE
+
+
+def legacy_create_default_activities(week):
+    """Implementasi lama: satu get_or_create per item template.
+
+    Direproduksi apa adanya (SELECT lalu INSERT di savepoint per item) tanpa
+    hook ``Activity.save`` yang sekarang (sync clock, counter, rollup per baris):
+    hook itu belum ada di implementasi lama dan akan membesar-besarkan selisihnya.
+    """
+    for day, name, time_range in DEFAULT_ACTIVITY_TEMPLATE:
+        if Activity.objects.filter(week=week, day=day, name=name).first() is not None:
+            continue
+        activity = Activity(week=week, day=day, name=name, time=time_range, is_default=True, completed=False)
+        activity.fill_schedule_fields()
+        with transaction.atomic():
+            models.Model.save(activity)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pengisian template mingguan (salinan per baris vs rujukan versi template) di database test sementara'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--weeks',
+            type=int,
+            default=20,
+            help='Jumlah week yang dimaterialisasi per strategi (default: 20)',
+        )
+
+    def handle(self, *args, **options):
+        weeks = options['weeks']
+        old_name = connection.settings_dict['NAME']
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            user = User.objects.create_user('benchmark_template')
+            results = [
+                ('get_or_create (lama)', self._measure(user, weeks, 0, legacy_create_default_activities)),
+                ('rujukan template (baru)', self._measure(user, weeks, weeks, Activity.create_default_activities)),
+            ]
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"📋 Template: {len(DEFAULT_ACTIVITY_TEMPLATE)} aktivitas, {weeks} week per strategi")
+        for label, (queries, seconds, rows) in results:
+            self.stdout.write(
+                f"  {label:<24} {queries / weeks:8.1f} query/week  {seconds / weeks * 1000:8.2f} ms/week"
+                f"  {rows / weeks:8.1f} baris Activity/week"
+            )
+
+    def _measure(self, user, weeks, first_offset, materialize):
+        """Mengembalikan total query, waktu dan baris Activity baru untuk mengisi ``weeks`` week baru"""
+        base = Week.get_or_create_current_week(user).start_date
+        targets = [
+            Week.objects.create(
+                user=user,
+                start_date=base + timedelta(weeks=first_offset + i + 1),
+                end_date=base + timedelta(weeks=first_offset + i + 1, days=6),
+            )
+            for i in range(weeks)
+        ]
+        with CaptureQueriesContext(connection) as ctx:
+            started = time.perf_counter()
+            for week in targets:
+                materialize(week)
+            elapsed = time.perf_counter() - started
+        rows = Activity.objects.filter(week__in=targets).count()
+        return len(ctx.captured_queries), elapsed, rows
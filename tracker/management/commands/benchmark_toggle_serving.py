@@ -0,0 +1,232 @@
+import asyncio
+import json
+import os
+import random
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import ThreadSensitiveContext, sync_to_async
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from django.db.backends.signals import connection_created
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from tracker.management.commands.benchmark_views import git_revision, percentile
+from tracker.models import Week, Activity
+from tracker.seeding import custom_items, seed_users
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark throughput toggle_activity: handler WSGI dengan sejumlah worker sync '
+        'dibandingkan handler ASGI dengan banyak koneksi bersamaan dalam satu event loop. '
+        'Seperti ASGIHandler, setiap request ASGI mendapat ThreadSensitiveContext sendiri '
+        'sehingga akses ORM lewat sync_to_async berjalan paralel per request'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--wsgi-workers',
+            type=int,
+            default=3,
+            help='Jumlah worker sync yang melayani request bersamaan, seperti gunicorn --workers (default: 3)',
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=50,
+            help='Jumlah koneksi bersamaan yang dikirim klien (default: 50)',
+        )
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=20,
+            help='Jumlah toggle per koneksi (default: 20)',
+        )
+        parser.add_argument(
+            '--db-latency-ms',
+            type=float,
+            default=0.0,
+            help='Jeda tambahan per query untuk mensimulasikan round trip ke server database (default: 0)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed random generator (default: 42)')
+        parser.add_argument('--output', help='File JSON hasil benchmark (opsional)')
+
+    def handle(self, *args, **options):
+        if min(options['wsgi_workers'], options['connections'], options['requests']) < 1:
+            raise CommandError('--wsgi-workers, --connections dan --requests minimal 1')
+
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                tempfile.gettempdir(), f'benchmark_toggle_{os.getpid()}.sqlite3'
+            )
+            self.stdout.write(
+                self.style.WARNING('⚠️  SQLite hanya mengizinkan satu penulis; jalankan dengan PostgreSQL untuk angka produksi')
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+
+        latency = options['db_latency_ms'] / 1000
+
+        def add_latency(execute, sql, params, many, context):
+            time.sleep(latency)
+            return execute(sql, params, many, context)
+
+        def install_latency(sender, connection, **kwargs):
+            connection.execute_wrappers.append(add_latency)
+
+        if latency:
+            connection_created.connect(install_latency)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                plan = self._seed(options)
+                results = {
+                    'wsgi': self._run_wsgi(plan, options['wsgi_workers'], options['connections']),
+                    'asgi': self._run_asgi(plan, options['connections']),
+                }
+        finally:
+            connection_created.disconnect(install_latency)
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(
+            f"\n🔁 {options['connections']} koneksi × {options['requests']} toggle, "
+            f"jeda database {options['db_latency_ms']:g} ms/query"
+        )
+        self.stdout.write(f"{'mode':<30}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'error':>7}")
+        labels = {
+            'wsgi': f"WSGI ({options['wsgi_workers']} worker sync)",
+            'asgi': 'ASGI (1 event loop)',
+        }
+        for mode, result in results.items():
+            self.stdout.write(
+                f"{labels[mode]:<30}{result['rps']:>10.1f}{result['p50_ms']:>10.2f}"
+                f"{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['errors']:>7}"
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump({
+                    'meta': {
+                        'revision': git_revision(),
+                        'database': connection.vendor,
+                        'wsgi_workers': options['wsgi_workers'],
+                        'connections': options['connections'],
+                        'requests_per_connection': options['requests'],
+                        'db_latency_ms': options['db_latency_ms'],
+                        'seed': options['seed'],
+                    },
+                    'modes': results,
+                }, f, indent=2)
+            self.stdout.write(self.style.SUCCESS(f"💾 Hasil ditulis ke {options['output']}"))
+
+    def _seed(self, options):
+        """Satu user per koneksi; urutan aktivitas yang di-toggle ditentukan di muka agar kedua mode identik"""
+        rng = random.Random(options['seed'])
+        users, _, _ = seed_users(
+            rng,
+            [f'toggle_user_{i}' for i in range(options['connections'])],
+            1,
+            # Beberapa aktivitas custom di samping item template, agar kedua jalur toggle ikut terukur
+            custom_items(len(Activity.DAY_INDEX)),
+            full_history=True,
+        )
+        activity_ids = {
+            week.user_id: [activity.id for activity in week.get_activities()]
+            for week in Week.objects.filter(user__in=users, start_date=Week.start_date_for_offset(0))
+        }
+        return [
+            (user, [rng.choice(activity_ids[user.pk]) for _ in range(options['requests'])])
+            for user in users
+        ]
+
+    def _summarize(self, samples, wall):
+        latencies = sorted(sample[0] * 1000 for sample in samples)
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if not sample[1]),
+            'rps': round(len(samples) / wall, 1),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+        }
+
+    def _run_wsgi(self, plan, workers, connections):
+        """Setiap koneksi menunggu giliran worker sync, seperti antrean di depan gunicorn"""
+        url = reverse('tracker:toggle_activity')
+        clients = []
+        for user, _ in plan:
+            client = Client()
+            client.force_login(user)
+            clients.append(client)
+
+        def serve(client, activity_id):
+            try:
+                response = client.post(url, json.dumps({'activity_id': activity_id}), content_type='application/json')
+                return response.json().get('success', False)
+            finally:
+                connection.close()
+
+        with ThreadPoolExecutor(max_workers=workers) as worker_pool:
+
+            def drive(index):
+                # Latency diukur dari request dikirim, termasuk waktu antre menunggu worker kosong
+                client, (_, activity_ids) = clients[index], plan[index]
+                samples = []
+                for activity_id in activity_ids:
+                    started = time.perf_counter()
+                    success = worker_pool.submit(serve, client, activity_id).result()
+                    samples.append((time.perf_counter() - started, success))
+                return samples
+
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=connections) as client_pool:
+                per_connection = list(client_pool.map(drive, range(connections)))
+            wall = time.perf_counter() - started
+        return self._summarize([sample for samples in per_connection for sample in samples], wall)
+
+    def _run_asgi(self, plan, connection_count):
+        """Semua koneksi dilayani bersamaan oleh satu event loop.
+
+        AsyncClient memanggil handler langsung tanpa lapisan ``ASGIHandler``, yang
+        membungkus setiap request dengan ``ThreadSensitiveContext``. Tanpa itu semua
+        ``sync_to_async`` (thread_sensitive) antre di satu thread; di sini konteks
+        dipasang per request agar akses ORM berjalan paralel seperti di server ASGI.
+        """
+        url = reverse('tracker:toggle_activity')
+        clients = []
+        for user, _ in plan:
+            client = AsyncClient()
+            client.force_login(user)
+            clients.append(client)
+
+        async def serve(client, activity_id):
+            async with ThreadSensitiveContext():
+                try:
+                    response = await client.post(
+                        url, json.dumps({'activity_id': activity_id}), content_type='application/json'
+                    )
+                    return response.json().get('success', False)
+                finally:
+                    # Koneksi milik thread konteks ini; ditutup seperti di akhir request
+                    await sync_to_async(connections.close_all)()
+
+        async def drive(index):
+            client, (_, activity_ids) = clients[index], plan[index]
+            samples = []
+            for activity_id in activity_ids:
+                started = time.perf_counter()
+                success = await serve(client, activity_id)
+                samples.append((time.perf_counter() - started, success))
+            return samples
+
+        async def run_all():
+            return await asyncio.gather(*(drive(index) for index in range(connection_count)))
+
+        started = time.perf_counter()
+        per_connection = asyncio.run(run_all())
+        wall = time.perf_counter() - started
+        return self._summarize([sample for samples in per_connection for sample in samples], wall)
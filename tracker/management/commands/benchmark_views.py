@@ -0,0 +1,271 @@
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from tracker.models import Week, Activity, DEFAULT_ACTIVITY_TEMPLATE
+from tracker.seeding import custom_items, seed_users
+
+SCENARIOS = ('dashboard', 'toggle_activity', 'stats', 'profile', 'add_activity')
+
+
+def percentile(sorted_values, pct):
+    """Persentil nearest-rank dari daftar yang sudah terurut"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def git_revision():
+    """Commit yang sedang di-checkout, agar hasil bisa dibandingkan antar commit"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            capture_output=True, text=True, check=True, cwd=settings.BASE_DIR,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Session:
+    """Satu pengguna yang login dengan client dan random generator sendiri"""
+
+    def __init__(self, index, user, activity_ids, weeks, seed):
+        self.index = index
+        self.client = Client()
+        self.client.force_login(user)
+        self.activity_ids = activity_ids
+        self.weeks = weeks
+        self.rng = random.Random(seed * 1000 + index)
+        self.added = 0
+
+    def build_request(self, scenario):
+        """Mengembalikan (method, url, kwargs) untuk satu request skenario"""
+        if scenario == 'dashboard':
+            return 'get', f"{reverse('tracker:dashboard')}?week={-self.rng.randrange(self.weeks)}", {}
+        if scenario == 'toggle_activity':
+            return 'post', reverse('tracker:toggle_activity'), {
+                'data': json.dumps({'activity_id': self.rng.choice(self.activity_ids)}),
+                'content_type': 'application/json',
+            }
+        if scenario == 'stats':
+            return 'get', reverse('tracker:stats'), {}
+        if scenario == 'profile':
+            return 'get', reverse('tracker:profile'), {}
+        self.added += 1
+        return 'post', reverse('tracker:add_activity'), {
+            'data': {
+                'day': self.rng.choice(list(Activity.DAY_INDEX)),
+                'name': f'Benchmark {self.index}-{self.added}',
+                'time': '',
+                'week_offset': 0,
+            },
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Benchmark latency view tracker (dashboard, toggle, stats, profile, tambah aktivitas) '
+        'dengan sesi paralel di database test sementara; hasil ditulis sebagai JSON'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=20, help='Jumlah user yang di-seed (default: 20)')
+        parser.add_argument('--weeks', type=int, default=12, help='Jumlah week per user (default: 12)')
+        parser.add_argument(
+            '--custom-activities',
+            type=int,
+            default=3,
+            help=f'Jumlah aktivitas custom per week, di luar {len(DEFAULT_ACTIVITY_TEMPLATE)} item template (default: 3)',
+        )
+        parser.add_argument('--sessions', type=int, default=4, help='Jumlah sesi paralel (default: 4)')
+        parser.add_argument(
+            '--requests',
+            type=int,
+            default=50,
+            help='Jumlah request terukur per sesi per skenario (default: 50)',
+        )
+        parser.add_argument(
+            '--warmup',
+            type=int,
+            default=1,
+            help='Request pemanasan per sesi per skenario yang tidak diukur (default: 1)',
+        )
+        parser.add_argument(
+            '--scenario',
+            action='append',
+            choices=SCENARIOS,
+            help='Jalankan skenario tertentu saja (boleh diulang; default: semua)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed random generator (default: 42)')
+        parser.add_argument(
+            '--output',
+            default='benchmark_views.json',
+            help='File JSON hasil benchmark (default: benchmark_views.json)',
+        )
+        parser.add_argument('--compare', help='File JSON hasil sebelumnya untuk dibandingkan')
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['weeks'], options['sessions'], options['requests']) < 1:
+            raise CommandError('--users, --weeks, --sessions dan --requests minimal 1')
+        if options['custom_activities'] < 0:
+            raise CommandError('--custom-activities tidak boleh negatif')
+        baseline = None
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+
+        old_name = connection.settings_dict['NAME']
+        if connection.vendor == 'sqlite' and not connection.settings_dict['TEST'].get('NAME'):
+            # Database test in-memory tidak bisa dipakai bersama oleh banyak thread penulis; pakai file sementara
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                tempfile.gettempdir(), f'benchmark_views_{os.getpid()}.sqlite3'
+            )
+        connection.creation.create_test_db(verbosity=0, autoclobber=True)
+        try:
+            with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+                started = time.perf_counter()
+                sessions = self._seed(options)
+                seed_seconds = time.perf_counter() - started
+                self.stdout.write(
+                    f"🌱 Seed: {options['users']} user × {options['weeks']} week × "
+                    f"({len(DEFAULT_ACTIVITY_TEMPLATE)} item template + {options['custom_activities']} custom) "
+                    f"dalam {seed_seconds:.1f} detik"
+                )
+                cache.clear()
+                results = {
+                    scenario: self._run_scenario(scenario, sessions, options['requests'], options['warmup'])
+                    for scenario in options['scenario'] or SCENARIOS
+                }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': timezone.now().isoformat(),
+                'database': connection.vendor,
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'users': options['users'],
+                'weeks': options['weeks'],
+                'custom_activities_per_week': options['custom_activities'],
+                'sessions': options['sessions'],
+                'requests_per_session': options['requests'],
+                'seed': options['seed'],
+            },
+            'scenarios': results,
+        }
+        with open(options['output'], 'w') as f:
+            json.dump(report, f, indent=2)
+
+        self._print_report(results, baseline)
+        self.stdout.write(self.style.SUCCESS(f"💾 Hasil ditulis ke {options['output']}"))
+
+    def _seed(self, options):
+        """Membuat data lewat generator seed lalu menyiapkan satu sesi per slot paralel"""
+        users, _, _ = seed_users(
+            random.Random(options['seed']),
+            [f'bench_user_{i}' for i in range(options['users'])],
+            options['weeks'],
+            custom_items(options['custom_activities']),
+            # Offset dashboard diambil acak dari seluruh riwayat, jadi setiap user harus lengkap
+            full_history=True,
+        )
+        current_start = Week.start_date_for_offset(0)
+
+        # Id aktivitas week ini per user: item template (t<week>-<posisi>) dan baris custom
+        current_activity_ids = {
+            week.user_id: [activity.id for activity in week.get_activities()]
+            for week in Week.objects.filter(user__in=users, start_date=current_start)
+        }
+
+        return [
+            Session(
+                index,
+                users[index % len(users)],
+                current_activity_ids[users[index % len(users)].pk],
+                options['weeks'],
+                options['seed'],
+            )
+            for index in range(options['sessions'])
+        ]
+
+    def _run_scenario(self, scenario, sessions, requests, warmup):
+        """Menjalankan satu skenario di semua sesi secara paralel dan meringkas hasilnya"""
+
+        def drive(session):
+            samples = []
+            try:
+                for i in range(warmup + requests):
+                    method, url, kwargs = session.build_request(scenario)
+                    with CaptureQueriesContext(connection) as ctx:
+                        started = time.perf_counter()
+                        response = getattr(session.client, method)(url, **kwargs)
+                        elapsed = time.perf_counter() - started
+                    if i >= warmup:
+                        samples.append((elapsed, len(ctx.captured_queries), response.status_code < 400))
+            finally:
+                # Setiap thread membuka koneksinya sendiri
+                connection.close()
+            return samples
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=len(sessions)) as pool:
+            per_session = list(pool.map(drive, sessions))
+        wall = time.perf_counter() - started
+
+        samples = [sample for session_samples in per_session for sample in session_samples]
+        latencies = sorted(sample[0] * 1000 for sample in samples)
+        return {
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if not sample[2]),
+            'p50_ms': round(percentile(latencies, 50), 3),
+            'p95_ms': round(percentile(latencies, 95), 3),
+            'p99_ms': round(percentile(latencies, 99), 3),
+            'mean_ms': round(sum(latencies) / len(latencies), 3),
+            'queries_per_request': round(sum(sample[1] for sample in samples) / len(samples), 2),
+            # Wall time mencakup pemanasan; throughput dihitung dari semua request yang dikirim
+            'rps': round(len(sessions) * (warmup + requests) / wall, 1),
+        }
+
+    def _print_report(self, results, baseline):
+        self.stdout.write(
+            f"\n{'skenario':<16}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'query/req':>11}{'req/s':>10}{'error':>7}"
+        )
+        for scenario, result in results.items():
+            self.stdout.write(
+                f"{scenario:<16}{result['p50_ms']:>10.2f}{result['p95_ms']:>10.2f}{result['p99_ms']:>10.2f}"
+                f"{result['queries_per_request']:>11.1f}{result['rps']:>10.1f}{result['errors']:>7}"
+            )
+
+        if baseline is None:
+            return
+        self.stdout.write(f"\n📊 Dibandingkan dengan {baseline['meta'].get('revision') or 'baseline'}:")
+        for scenario, result in results.items():
+            previous = baseline['scenarios'].get(scenario)
+            if not previous:
+                continue
+            p95_change = (result['p95_ms'] - previous['p95_ms']) / previous['p95_ms'] * 100
+            rps_change = (result['rps'] - previous['rps']) / previous['rps'] * 100
+            line = (
+                f"  {scenario:<16} p95 {p95_change:+6.1f}%  req/s {rps_change:+6.1f}%  "
+                f"query/req {previous['queries_per_request']:.1f} → {result['queries_per_request']:.1f}"
+            )
+            # Latency p95 naik lebih dari 10% ditandai sebagai regresi
+            self.stdout.write(self.style.ERROR(line) if p95_change > 10 else line)
@@ -0,0 +1,45 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from tracker.achievements import evaluate
+
+
+class Command(BaseCommand):
+    help = (
+        'Mengevaluasi semua rule pencapaian untuk user yang sudah ada (backfill setelah deploy atau rule baru); '
+        'perubahan aktivitas berikutnya dievaluasi otomatis'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username yang dievaluasi (default: semua user)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jumlah user per batch (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        users = User.objects.order_by('pk').values_list('pk', flat=True)
+        if options['user']:
+            users = users.filter(username=options['user'])
+
+        processed = unlocked = 0
+        last_pk = 0
+
+        while True:
+            batch = list(users.filter(pk__gt=last_pk)[:options['batch_size']])
+            if not batch:
+                break
+            last_pk = batch[-1]
+            for user_id in batch:
+                unlocked += len(evaluate(user_id))
+            processed += len(batch)
+            self.stdout.write(f"  📍 {processed} user dievaluasi")
+
+        self.stdout.write(
+            self.style.SUCCESS(f'✅ {unlocked} pencapaian baru terbuka untuk {processed} user')
+        )
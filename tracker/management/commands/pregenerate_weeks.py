@@ -0,0 +1,75 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from tracker.models import Week, Activity
+
+
+class Command(BaseCommand):
+    help = (
+        'Membuat week mendatang beserta aktivitas template untuk semua user aktif '
+        '(aman dijalankan berulang dari cron)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--weeks-ahead',
+            type=int,
+            default=1,
+            help='Jumlah week ke depan yang disiapkan, selain minggu ini (default: 1)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=500,
+            help='Jumlah user per batch/transaksi (default: 500)',
+        )
+
+    def handle(self, *args, **options):
+        start_dates = [Week.start_date_for_offset(offset) for offset in range(options['weeks_ahead'] + 1)]
+        batch_size = options['batch_size']
+        users = User.objects.filter(is_active=True).order_by('pk').values_list('pk', flat=True)
+
+        started = time.perf_counter()
+        processed_users = created_weeks = materialized_weeks = 0
+        last_pk = 0
+
+        while True:
+            user_ids = list(users.filter(pk__gt=last_pk)[:batch_size])
+            if not user_ids:
+                break
+            last_pk = user_ids[-1]
+
+            with transaction.atomic():
+                existing = Week.objects.filter(user_id__in=user_ids, start_date__in=start_dates).count()
+                Week.objects.bulk_create(
+                    [
+                        Week(user_id=user_id, start_date=start_date, end_date=Week.end_date_for(start_date))
+                        for user_id in user_ids
+                        for start_date in start_dates
+                    ],
+                    ignore_conflicts=True,
+                )
+                created_weeks += len(user_ids) * len(start_dates) - existing
+
+                # Week yang sedang diklaim request dashboard (row lock) dilewati, bukan ditunggu
+                pending_weeks = list(
+                    Week.objects.filter(user_id__in=user_ids, start_date__in=start_dates, template_applied=False)
+                    .select_for_update(skip_locked=True)
+                    .only('pk', 'user_id', 'start_date')
+                )
+                if pending_weeks:
+                    Activity.materialize_template(pending_weeks)
+                materialized_weeks += len(pending_weeks)
+
+            processed_users += len(user_ids)
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'✅ {processed_users} user aktif diproses dalam {elapsed:.2f} detik'
+                f'\n📅 Week baru: {created_weeks}, diisi template: {materialized_weeks}'
+                f' ({", ".join(str(start_date) for start_date in start_dates)})'
+            )
+        )
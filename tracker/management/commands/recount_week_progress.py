@@ -0,0 +1,59 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import F, Q
+from tracker.models import Week
+
+
+class Command(BaseCommand):
+    help = 'Mendeteksi dan memperbaiki drift counter progress week secara massal'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user',
+            type=str,
+            help='Username yang diperiksa (default: semua user)',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Hanya laporkan week yang drift tanpa memperbaikinya',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=1000,
+            help='Jumlah week per UPDATE (default: 1000)',
+        )
+
+    def handle(self, *args, **options):
+        weeks = Week.objects.order_by('pk')
+        if options['user']:
+            weeks = weeks.filter(user__username=options['user'])
+
+        batch_size = options['batch_size']
+        checked = drifted = 0
+        last_pk = 0
+
+        while True:
+            batch_ids = list(weeks.filter(pk__gt=last_pk).values_list('pk', flat=True)[:batch_size])
+            if not batch_ids:
+                break
+            last_pk = batch_ids[-1]
+            checked += len(batch_ids)
+
+            drifted_ids = list(
+                Week.objects.filter(pk__in=batch_ids)
+                .annotate(**Week.counted_activities())
+                .filter(~Q(total_activities=F('actual_total')) | ~Q(completed_activities=F('actual_completed')))
+                .values_list('pk', flat=True)
+            )
+            drifted += len(drifted_ids)
+            if drifted_ids and not options['check']:
+                with transaction.atomic():
+                    Week.recount_progress(Week.objects.filter(pk__in=drifted_ids))
+
+        if options['check']:
+            style = self.style.WARNING if drifted else self.style.SUCCESS
+            self.stdout.write(style(f'🔍 {drifted} dari {checked} week memiliki counter yang drift'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'✅ {drifted} dari {checked} week diperbaiki'))
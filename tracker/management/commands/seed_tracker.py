@@ -0,0 +1,104 @@
+import random
+import time
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from tracker.models import DEFAULT_ACTIVITY_TEMPLATE
+from tracker.seeding import custom_items, seed_users
+
+
+class Command(BaseCommand):
+    help = 'Membuat data sintetis dalam jumlah besar (user, riwayat week, aktivitas) untuk uji skala'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000, help='Jumlah user yang dibuat (default: 1000)')
+        parser.add_argument(
+            '--weeks',
+            type=int,
+            default=52,
+            help='Riwayat maksimal per user dalam week (default: 52)',
+        )
+        parser.add_argument(
+            '--custom-activities',
+            type=int,
+            default=3,
+            help=(
+                f'Jumlah aktivitas custom per week, di luar {len(DEFAULT_ACTIVITY_TEMPLATE)} item template '
+                f'yang dirujuk (default: 3)'
+            ),
+        )
+        parser.add_argument('--prefix', default='seed_user', help='Awalan username (default: seed_user)')
+        parser.add_argument(
+            '--start',
+            type=int,
+            default=0,
+            help='Nomor username pertama, untuk menambah data ke seed sebelumnya (default: 0)',
+        )
+        parser.add_argument(
+            '--password',
+            help='Password semua user hasil seed (default: tanpa password yang bisa dipakai login)',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=100,
+            help='Jumlah user per transaksi (default: 100)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=5000,
+            help='Jumlah baris per INSERT (default: 5000)',
+        )
+        parser.add_argument('--seed', type=int, default=42, help='Seed random generator (default: 42)')
+
+    def handle(self, *args, **options):
+        if min(options['users'], options['weeks'], options['chunk_size']) < 1:
+            raise CommandError('--users, --weeks dan --chunk-size minimal 1')
+        if options['custom_activities'] < 0:
+            raise CommandError('--custom-activities tidak boleh negatif')
+
+        usernames = [f"{options['prefix']}_{i}" for i in range(options['start'], options['start'] + options['users'])]
+        if User.objects.filter(username__in=[usernames[0], usernames[-1]]).exists():
+            raise CommandError(
+                f"❌ Username {options['prefix']}_* sudah ada; pakai --prefix atau --start yang lain"
+            )
+
+        # Hash dihitung sekali lalu dipakai semua user, bukan satu PBKDF2 per user
+        password_hash = make_password(options['password']) if options['password'] else None
+        items = custom_items(options['custom_activities'])
+        rng = random.Random(options['seed'])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"🌱 Seed {options['users']} user, riwayat hingga {options['weeks']} week, "
+                f"{len(DEFAULT_ACTIVITY_TEMPLATE)} item template + {options['custom_activities']} aktivitas custom "
+                f"per week (seed {options['seed']})"
+            )
+        )
+        started = time.perf_counter()
+        total_weeks = total_activities = 0
+
+        for offset in range(0, len(usernames), options['chunk_size']):
+            chunk = usernames[offset:offset + options['chunk_size']]
+            _, weeks, activities = seed_users(
+                rng, chunk, options['weeks'], items, password_hash=password_hash, batch_size=options['batch_size'],
+            )
+            total_weeks += weeks
+            total_activities += activities
+            elapsed = time.perf_counter() - started
+            self.stdout.write(
+                f"  👥 {offset + len(chunk)}/{len(usernames)} user, {total_activities} aktivitas "
+                f"({total_activities / elapsed if elapsed else 0:.0f} aktivitas/detik)"
+            )
+
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(
+                f'\n✅ Selesai dalam {elapsed:.1f} detik'
+                f'\n👥 User: {len(usernames)}'
+                f'\n📅 Week: {total_weeks}'
+                f'\n📊 Aktivitas: {total_activities}'
+            )
+        )
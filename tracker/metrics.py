@@ -0,0 +1,212 @@
+"""Metrik per request (waktu total, jumlah & waktu SQL, cache hit/miss) dalam format Prometheus.
+
+Middleware mencatat setiap request ke histogram di memori proses. Karena
+gunicorn menjalankan beberapa worker, setiap proses menyalin snapshot
+kumulatifnya ke cache bersama (Redis di production) paling sering sekali per
+``FLUSH_INTERVAL`` detik; endpoint metrik menjumlahkan snapshot semua worker.
+Jalur per request hanya berupa beberapa operasi dict di bawah lock, tanpa I/O.
+"""
+import os
+import socket
+import threading
+import time
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from django.db import connections
+
+FLUSH_INTERVAL = 10
+# Snapshot worker yang sudah mati ikut hilang setelah timeout ini
+SNAPSHOT_TIMEOUT = 300
+WORKERS_KEY = 'tracker:metrics:workers'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+HISTOGRAMS = {
+    'tracker_request_duration_seconds': ('Total waktu request per view', DURATION_BUCKETS),
+    'tracker_request_db_duration_seconds': ('Total waktu SQL per request per view', DURATION_BUCKETS),
+    'tracker_request_queries': ('Jumlah query SQL per request per view', QUERY_BUCKETS),
+}
+COUNTERS = {
+    'tracker_requests_total': 'Jumlah request per view dan kelas status',
+    'tracker_cache_hits_total': 'Jumlah cache hit per view',
+    'tracker_cache_misses_total': 'Jumlah cache miss per view',
+}
+
+# Penghitung cache untuk request yang sedang berjalan: [hits, misses]
+_cache_lookups = ContextVar('tracker_cache_lookups', default=None)
+
+
+def record_cache_lookup(hits, misses):
+    """Dipanggil oleh kode yang membaca cache; diabaikan di luar request yang diukur"""
+    lookups = _cache_lookups.get()
+    if lookups is not None:
+        lookups[0] += hits
+        lookups[1] += misses
+
+
+class RequestStats:
+    """Pengukuran satu request; SQL direkam lewat execute_wrapper di semua koneksi"""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.cache_lookups = [0, 0]
+        self._stack = ExitStack()
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def start(self):
+        self.started = time.perf_counter()
+        self._token = _cache_lookups.set(self.cache_lookups)
+
+    def finish(self):
+        _cache_lookups.reset(self._token)
+        self.duration = time.perf_counter() - self.started
+
+    def attach_connections(self):
+        # Koneksi bersifat per thread: di jalur async ini harus dipanggil di thread tempat ORM berjalan
+        for connection in connections.all():
+            self._stack.enter_context(connection.execute_wrapper(self))
+
+    def detach_connections(self):
+        self._stack.close()
+
+    def __enter__(self):
+        self.start()
+        self.attach_connections()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.detach_connections()
+        self.finish()
+
+    def server_timing(self):
+        """Nilai header Server-Timing (durasi dalam milidetik)"""
+        hits, misses = self.cache_lookups
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.queries} queries", '
+            f'cache;desc="{hits} hit {misses} miss", '
+            f'total;dur={self.duration * 1000:.1f}'
+        )
+
+
+class MetricsRegistry:
+    """Histogram dan counter kumulatif milik satu proses"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._last_flush = 0.0
+
+    def _observe(self, name, labels, value):
+        buckets = HISTOGRAMS[name][1]
+        histogram = self._histograms.get((name, labels))
+        if histogram is None:
+            histogram = self._histograms[(name, labels)] = [[0] * len(buckets), 0.0, 0]
+        for i, bound in enumerate(buckets):
+            if value <= bound:
+                histogram[0][i] += 1
+        histogram[1] += value
+        histogram[2] += 1
+
+    def _inc(self, name, labels, value=1):
+        self._counters[(name, labels)] = self._counters.get((name, labels), 0) + value
+
+    def record(self, view, status, stats):
+        labels = (('view', view),)
+        hits, misses = stats.cache_lookups
+        with self._lock:
+            self._observe('tracker_request_duration_seconds', labels, stats.duration)
+            self._observe('tracker_request_db_duration_seconds', labels, stats.db_time)
+            self._observe('tracker_request_queries', labels, stats.queries)
+            self._inc('tracker_requests_total', labels + (('status', f'{status // 100}xx'),))
+            if hits:
+                self._inc('tracker_cache_hits_total', labels, hits)
+            if misses:
+                self._inc('tracker_cache_misses_total', labels, misses)
+            due = time.monotonic() - self._last_flush >= FLUSH_INTERVAL
+        if due:
+            self.flush()
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                'histograms': {key: [list(value[0]), value[1], value[2]] for key, value in self._histograms.items()},
+                'counters': dict(self._counters),
+            }
+
+    def flush(self):
+        """Menyalin snapshot proses ini ke cache bersama dan mendaftarkan worker-nya"""
+        self._last_flush = time.monotonic()
+        # Dihitung saat flush, bukan saat import, agar proses hasil fork punya id sendiri
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+        try:
+            cache.set(f'tracker:metrics:worker:{worker_id}', self.snapshot(), SNAPSHOT_TIMEOUT)
+            # Dicek ulang setiap flush: pendaftaran bersamaan dari dua worker bisa saling menimpa
+            workers = cache.get(WORKERS_KEY) or []
+            if worker_id not in workers:
+                cache.set(WORKERS_KEY, [*workers, worker_id][-64:], None)
+        except Exception:
+            # Metrik tidak boleh menggagalkan request jika cache sedang tidak tersedia
+            pass
+
+
+registry = MetricsRegistry()
+
+
+def collect():
+    """Menjumlahkan snapshot semua worker yang masih hidup"""
+    registry.flush()
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many([f'tracker:metrics:worker:{worker_id}' for worker_id in workers])
+    alive = [worker_id for worker_id in workers if f'tracker:metrics:worker:{worker_id}' in snapshots]
+    if alive != workers:
+        cache.set(WORKERS_KEY, alive, None)
+
+    histograms, counters = {}, {}
+    for snapshot in snapshots.values():
+        for key, (counts, total, count) in snapshot['histograms'].items():
+            merged = histograms.setdefault(key, [[0] * len(counts), 0.0, 0])
+            merged[0] = [a + b for a, b in zip(merged[0], counts)]
+            merged[1] += total
+            merged[2] += count
+        for key, value in snapshot['counters'].items():
+            counters[key] = counters.get(key, 0) + value
+    return histograms, counters
+
+
+def _format_labels(labels):
+    return ','.join(f'{name}="{value}"' for name, value in labels)
+
+
+def render_prometheus():
+    """Teks exposition format Prometheus dari metrik gabungan semua worker"""
+    histograms, counters = collect()
+    lines = []
+    for name, (description, buckets) in HISTOGRAMS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} histogram']
+        for (metric, labels), (counts, total, count) in sorted(histograms.items()):
+            if metric != name:
+                continue
+            label_text = _format_labels(labels)
+            for bound, bucket_count in zip(buckets, counts):
+                lines.append(f'{name}_bucket{{{label_text},le="{bound}"}} {bucket_count}')
+            lines.append(f'{name}_bucket{{{label_text},le="+Inf"}} {count}')
+            lines.append(f'{name}_sum{{{label_text}}} {total}')
+            lines.append(f'{name}_count{{{label_text}}} {count}')
+    for name, description in COUNTERS.items():
+        lines += [f'# HELP {name} {description}', f'# TYPE {name} counter']
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{{{_format_labels(labels)}}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,52 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+
+from .metrics import RequestStats, registry
+
+
+class RequestMetricsMiddleware:
+    """Mengukur setiap request (waktu total, SQL, cache) dan mengirimkannya lewat header Server-Timing.
+
+    Letakkan paling atas di MIDDLEWARE agar waktu middleware lain ikut terukur.
+    Mendukung WSGI dan ASGI; di bawah ASGI rantai middleware tetap async
+    sehingga view async tidak dipaksa pindah ke thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with RequestStats() as stats:
+            response = self.get_response(request)
+        return self.finalize(request, response, stats)
+
+    async def __acall__(self, request):
+        stats = RequestStats()
+        stats.start()
+        # Query ORM async dijalankan di thread sync_to_async milik request ini, wrapper dipasang di sana
+        await sync_to_async(stats.attach_connections)()
+        try:
+            response = await self.get_response(request)
+        except BaseException:
+            await sync_to_async(stats.detach_connections)()
+            raise
+        finally:
+            stats.finish()
+        # Flush periodik ke cache adalah I/O blocking, jadi tidak dijalankan di event loop
+        return await sync_to_async(self.detach_and_finalize)(request, response, stats)
+
+    def detach_and_finalize(self, request, response, stats):
+        stats.detach_connections()
+        return self.finalize(request, response, stats)
+
+    def finalize(self, request, response, stats):
+        match = request.resolver_match
+        view = match.view_name if match else '<unresolved>'
+        response['Server-Timing'] = stats.server_timing()
+        registry.record(view, response.status_code, stats)
+        return response
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:55
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Q
+
+
+def remove_duplicate_activities(apps, schema_editor):
+    """Hapus duplikat (week, day, name) sebelum constraint unik dipasang"""
+    Activity = apps.get_model('tracker', 'Activity')
+
+    duplicates = (
+        Activity.objects.values('week_id', 'day', 'name')
+        .annotate(keep_id=Min('id'), completed_copies=Count('id', filter=Q(completed=True)), copies=Count('id'))
+        .filter(copies__gt=1)
+    )
+    for group in list(duplicates):
+        rows = Activity.objects.filter(week_id=group['week_id'], day=group['day'], name=group['name'])
+        # Pertahankan baris tertua, tapi jangan sampai status selesai hilang
+        if group['completed_copies']:
+            Activity.objects.filter(id=group['keep_id']).update(completed=True)
+        rows.exclude(id=group['keep_id']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0003_restore_multi_user_support'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_activities, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='activity',
+            constraint=models.UniqueConstraint(fields=('week', 'day', 'name'), name='unique_activity_per_week_day_name'),
+        ),
+    ]
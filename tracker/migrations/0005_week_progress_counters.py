@@ -0,0 +1,40 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:56
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_week_counters(apps, schema_editor):
+    """Isi counter progress dari data aktivitas yang sudah ada"""
+    Week = apps.get_model('tracker', 'Week')
+    Activity = apps.get_model('tracker', 'Activity')
+
+    activities = Activity.objects.filter(week=OuterRef('pk')).order_by().values('week')
+    total = activities.annotate(count=Count('id')).values('count')
+    completed = activities.filter(completed=True).annotate(count=Count('id')).values('count')
+    Week.objects.update(
+        total_activities=Coalesce(Subquery(total), 0),
+        completed_activities=Coalesce(Subquery(completed), 0),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0004_activity_unique_week_day_name'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='week',
+            name='completed_activities',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='total_activities',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_week_counters, migrations.RunPython.noop),
+    ]
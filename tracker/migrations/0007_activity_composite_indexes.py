@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0006_daily_rollup'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['week', 'created_at'], name='activity_week_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['week', 'completed'], name='activity_week_completed_idx'),
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:04
+
+from django.db import migrations, models
+from django.db.models import Exists, OuterRef
+
+
+def mark_initialized_weeks(apps, schema_editor):
+    """Week yang sudah punya aktivitas dianggap sudah diisi template"""
+    Week = apps.get_model('tracker', 'Week')
+    Activity = apps.get_model('tracker', 'Activity')
+    Week.objects.filter(Exists(Activity.objects.filter(week=OuterRef('pk')))).update(template_applied=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0007_activity_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='week',
+            name='template_applied',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_initialized_weeks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0008_week_template_applied'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='week',
+            name='revision',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0010_activity_delta_sync'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScheduleTemplate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('version', models.PositiveIntegerField(unique=True)),
+                ('digest', models.CharField(max_length=64, unique=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'ordering': ['-version'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ScheduleTemplateItem',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveSmallIntegerField()),
+                ('day', models.CharField(max_length=10)),
+                ('name', models.CharField(max_length=200)),
+                ('time', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+            options={
+                'ordering': ['template', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='template_completed',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='template_state',
+            field=models.BinaryField(default=b''),
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='template_sync_seq',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='template_total',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='template',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='weeks', to='tracker.scheduletemplate'),
+        ),
+        migrations.AddIndex(
+            model_name='week',
+            index=models.Index(fields=['user', 'template_sync_seq', 'id'], name='week_user_template_sync_idx'),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplateitem',
+            name='template',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='items', to='tracker.scheduletemplate'),
+        ),
+        migrations.AddConstraint(
+            model_name='scheduletemplateitem',
+            constraint=models.UniqueConstraint(fields=('template', 'position'), name='unique_template_item_position'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:30
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0011_schedule_template'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WeekArchive',
+            fields=[
+                ('week', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='archive', serialize=False, to='tracker.week')),
+                ('total', models.IntegerField(default=0)),
+                ('completed', models.IntegerField(default=0)),
+                ('per_day', models.JSONField(default=dict)),
+                ('per_name', models.JSONField(default=dict)),
+                ('detail', models.BinaryField()),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='week',
+            name='archived_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
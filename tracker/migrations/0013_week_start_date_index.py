@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:36
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0012_week_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='week',
+            index=models.Index(fields=['start_date'], name='week_start_date_idx'),
+        ),
+    ]
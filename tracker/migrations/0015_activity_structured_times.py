@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 15:41
+
+import re
+from datetime import time
+
+from django.db import migrations, models
+
+# Salinan parser dari tracker.models saat migrasi ini dibuat; migrasi tidak boleh mengimpor
+# kode aplikasi yang bisa berubah atau hilang di kemudian hari
+TIME_RANGE_PATTERN = re.compile(r'^\s*(\d{1,2})[:.](\d{2})\s*(?:[-–]\s*(\d{1,2})[:.](\d{2}))?\s*$')
+
+
+def parse_time_range(text):
+    match = TIME_RANGE_PATTERN.match(text or '')
+    if match is None:
+        return None, None
+    start_hour, start_minute, end_hour, end_minute = match.groups()
+    try:
+        start = time(int(start_hour), int(start_minute))
+        end = time(int(end_hour), int(end_minute)) if end_hour is not None else None
+    except ValueError:
+        return None, None
+    return start, end
+
+
+def backfill_template_item_times(apps, schema_editor):
+    """Isi jam terstruktur item template (tabel kecil); baris Activity di-backfill per batch lewat backfill_activity_times"""
+    ScheduleTemplateItem = apps.get_model('tracker', 'ScheduleTemplateItem')
+    items = list(ScheduleTemplateItem.objects.all())
+    for item in items:
+        item.start_time, item.end_time = parse_time_range(item.time)
+    ScheduleTemplateItem.objects.bulk_update(items, ['start_time', 'end_time'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tracker', '0014_achievement'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='activity',
+            options={'ordering': ['day_order', 'start_time', 'created_at']},
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='day_order',
+            field=models.PositiveSmallIntegerField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='end_time',
+            field=models.TimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='activity',
+            name='start_time',
+            field=models.TimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplateitem',
+            name='end_time',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='scheduletemplateitem',
+            name='start_time',
+            field=models.TimeField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='activity',
+            index=models.Index(fields=['week', 'day_order', 'start_time'], name='activity_week_day_start_idx'),
+        ),
+        migrations.RunPython(backfill_template_item_times, migrations.RunPython.noop),
+    ]
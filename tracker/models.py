@@ -1,20 +1,296 @@
-from django.db import models
+from django.db import IntegrityError, models, transaction
+from django.db.models import Count, F, Max, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.contrib.auth.models import User
 from django.utils import timezone
-from datetime import datetime, timedelta
+from datetime import datetime, time as day_time, timedelta
 import calendar
+import hashlib
+import json
+import re
+import zlib
+
+from .caching import bump_version_on_commit, dashboard_day_version_key, stats_version_key
+from .signals import activity_changed
+
+# Template pola hidup sehat berdasarkan jurnal kesehatan: (day, name, time).
+# Disusun sekali per proses dan dipakai ulang oleh setiap materialisasi week.
+DEFAULT_ACTIVITY_TEMPLATE = (
+    # SENIN - Hari Produktif & Fresh Start
+    ('senin', 'Bangun Pagi & Doa Syukur', '05:30 - 05:35'),
+    ('senin', 'Baca Alkitab & Renungan', '05:35 - 05:45'),
+    ('senin', 'Olahraga Ringan/Stretching', '05:45 - 06:15'),
+    ('senin', 'Mandi & Persiapan', '06:15 - 06:45'),
+    ('senin', 'Sarapan Sehat', '06:45 - 07:15'),
+    ('senin', 'Waktu Belajar Fokus', '08:00 - 10:00'),
+    ('senin', 'Istirahat & Snack', '10:00 - 10:15'),
+    ('senin', 'Mengerjakan Tugas', '10:15 - 12:00'),
+    ('senin', 'Makan Siang', '12:00 - 13:00'),
+    ('senin', 'Istirahat Siang', '13:00 - 13:30'),
+    ('senin', 'Aktivitas Produktif', '13:30 - 17:00'),
+    ('senin', 'Olahraga Sore', '17:00 - 17:30'),
+    ('senin', 'Makan Malam', '18:30 - 19:30'),
+    ('senin', 'Family Time/Relaksasi', '19:30 - 21:00'),
+    ('senin', 'Doa Malam & Evaluasi Hari', '21:30 - 21:40'),
+    ('senin', 'Tidur', '22:00'),
+
+    # SELASA - Hari Kuliah Penuh
+    ('selasa', 'Bangun Pagi & Doa Syukur', '05:00 - 05:05'),
+    ('selasa', 'Baca Alkitab & Renungan', '05:05 - 05:15'),
+    ('selasa', 'Persiapan Kuliah', '05:15 - 06:30'),
+    ('selasa', 'Sarapan Sehat', '06:30 - 07:00'),
+    ('selasa', 'Kuliah', '07:30 - 15:30'),
+    ('selasa', 'Istirahat & Snack', '15:30 - 16:00'),
+    ('selasa', 'Review Materi Kuliah', '16:00 - 17:00'),
+    ('selasa', 'Olahraga/Jalan Santai', '17:00 - 17:30'),
+    ('selasa', 'Makan Malam', '18:30 - 19:30'),
+    ('selasa', 'Waktu Belajar Mandiri', '19:30 - 21:30'),
+    ('selasa', 'Doa Malam & Refleksi', '21:30 - 21:40'),
+    ('selasa', 'Tidur', '22:00'),
+
+    # RABU - Hari Recovery & Pengembangan Diri
+    ('rabu', 'Bangun Pagi & Doa Syukur', '05:30 - 05:35'),
+    ('rabu', 'Baca Alkitab & Renungan', '05:35 - 05:45'),
+    ('rabu', 'Olahraga Pagi', '05:45 - 06:30'),
+    ('rabu', 'Mandi & Persiapan', '06:30 - 07:00'),
+    ('rabu', 'Sarapan Sehat', '07:00 - 07:30'),
+    ('rabu', 'Waktu Belajar Fokus', '08:00 - 10:00'),
+    ('rabu', 'Istirahat & Snack', '10:00 - 10:15'),
+    ('rabu', 'Skill Development/Hobi', '10:15 - 12:00'),
+    ('rabu', 'Makan Siang', '12:00 - 13:00'),
+    ('rabu', 'Power Nap/Istirahat', '13:00 - 13:30'),
+    ('rabu', 'Proyek Personal', '13:30 - 16:00'),
+    ('rabu', 'Olahraga Sore', '16:00 - 16:30'),
+    ('rabu', 'Sosialisasi/Me Time', '16:30 - 18:00'),
+    ('rabu', 'Makan Malam', '18:30 - 19:30'),
+    ('rabu', 'Reading/Learning', '19:30 - 21:00'),
+    ('rabu', 'Doa Malam & Gratitude', '21:30 - 21:40'),
+    ('rabu', 'Tidur', '22:00'),
+
+    # KAMIS - Hari Kuliah
+    ('kamis', 'Bangun Pagi & Doa Syukur', '05:00 - 05:05'),
+    ('kamis', 'Baca Alkitab & Renungan', '05:05 - 05:15'),
+    ('kamis', 'Persiapan Kuliah', '05:15 - 06:30'),
+    ('kamis', 'Sarapan Sehat', '06:30 - 07:00'),
+    ('kamis', 'Kuliah', '07:30 - 12:00'),
+    ('kamis', 'Makan Siang', '12:00 - 13:00'),
+    ('kamis', 'Istirahat', '13:00 - 13:30'),
+    ('kamis', 'Waktu Belajar Fokus', '13:30 - 15:30'),
+    ('kamis', 'Istirahat & Snack', '15:30 - 16:00'),
+    ('kamis', 'Aktivitas Fisik', '16:00 - 17:00'),
+    ('kamis', 'Relaksasi/Hobi', '17:00 - 18:30'),
+    ('kamis', 'Makan Malam', '18:30 - 19:30'),
+    ('kamis', 'Persiapan Weekend', '19:30 - 21:00'),
+    ('kamis', 'Doa Malam & Refleksi', '21:30 - 21:40'),
+    ('kamis', 'Tidur', '22:00'),
+
+    # JUMAT - Hari Persiapan Weekend
+    ('jumat', 'Bangun Pagi & Doa Syukur', '05:30 - 05:35'),
+    ('jumat', 'Baca Alkitab & Renungan', '05:35 - 05:45'),
+    ('jumat', 'Olahraga Pagi', '05:45 - 06:30'),
+    ('jumat', 'Mandi & Persiapan', '06:30 - 07:00'),
+    ('jumat', 'Sarapan Sehat', '07:00 - 07:30'),
+    ('jumat', 'Waktu Belajar Intensif', '08:00 - 10:00'),
+    ('jumat', 'Istirahat & Snack', '10:00 - 10:15'),
+    ('jumat', 'Menyelesaikan Tugas', '10:15 - 12:00'),
+    ('jumat', 'Makan Siang', '12:00 - 13:00'),
+    ('jumat', 'Istirahat Siang', '13:00 - 13:30'),
+    ('jumat', 'Review & Planning', '13:30 - 15:00'),
+    ('jumat', 'Cleaning & Organizing', '15:00 - 16:00'),
+    ('jumat', 'Aktivitas Sosial', '16:00 - 18:00'),
+    ('jumat', 'Makan Malam', '18:30 - 19:30'),
+    ('jumat', 'Family/Friend Time', '19:30 - 21:30'),
+    ('jumat', 'Doa Malam & Syukur', '21:30 - 21:40'),
+    ('jumat', 'Tidur', '22:30'),
+
+    # SABTU - Hari Ibadah & Pelayanan
+    ('sabtu', 'Bangun Pagi & Doa Syukur', '06:00 - 06:05'),
+    ('sabtu', 'Baca Alkitab & Renungan', '06:05 - 06:20'),
+    ('sabtu', 'Olahraga Pagi', '06:20 - 07:00'),
+    ('sabtu', 'Persiapan Ibadah', '07:00 - 08:00'),
+    ('sabtu', 'Sarapan Sehat', '08:00 - 08:30'),
+    ('sabtu', 'Latihan Ibadah Naposo', '09:00 - 12:00'),
+    ('sabtu', 'Makan Siang Bersama', '12:00 - 13:30'),
+    ('sabtu', 'Fellowship & Sharing', '13:30 - 15:00'),
+    ('sabtu', 'Personal Time/Istirahat', '15:00 - 16:30'),
+    ('sabtu', 'Aktivitas Rekreasi', '16:30 - 18:00'),
+    ('sabtu', 'Makan Malam', '18:30 - 19:30'),
+    ('sabtu', 'Prepare for Sunday', '19:30 - 20:30'),
+    ('sabtu', 'Relaksasi & Hiburan', '20:30 - 21:30'),
+    ('sabtu', 'Doa Malam & Gratitude', '21:30 - 21:40'),
+    ('sabtu', 'Tidur', '22:30'),
+
+    # MINGGU - Hari Ibadah & Rest
+    ('minggu', 'Bangun Pagi & Doa Syukur', '06:00 - 06:05'),
+    ('minggu', 'Baca Alkitab & Meditasi', '06:05 - 06:25'),
+    ('minggu', 'Persiapan Ibadah', '06:25 - 07:30'),
+    ('minggu', 'Sarapan Ringan', '07:30 - 08:00'),
+    ('minggu', 'Ibadah Gereja Pagi', '08:30 - 11:30'),
+    ('minggu', 'Fellowship & Komunitas', '11:30 - 12:30'),
+    ('minggu', 'Makan Siang Keluarga', '12:30 - 14:00'),
+    ('minggu', 'Quality Time Keluarga', '14:00 - 16:00'),
+    ('minggu', 'Mengerjakan Tugas Mingguan', '16:00 - 18:00'),
+    ('minggu', 'Makan Malam', '18:30 - 19:30'),
+    ('minggu', 'Planning Minggu Depan', '19:30 - 20:30'),
+    ('minggu', 'Relaksasi & Prepare', '20:30 - 21:30'),
+    ('minggu', 'Doa Malam & Refleksi', '21:30 - 21:45'),
+    ('minggu', 'Tidur', '22:00'),
+)
+
+# Batas baris per INSERT agar aman untuk batas parameter SQLite
+TEMPLATE_BATCH_SIZE = 500
+# Percobaan ulang saat status template week diubah bersamaan oleh request lain
+TEMPLATE_STATE_RETRIES = 5
+
+
+def _state_to_int(state):
+    """Bitmap status template week (bit ke-n = item posisi n selesai) sebagai integer"""
+    return int.from_bytes(bytes(state or b''), 'little')
+
+
+def _int_to_state(value, size):
+    return value.to_bytes((size + 7) // 8, 'little')
+
+
+# "05:30 - 05:35", "08.00-10.00", "22:00"; teks lain seperti "2 jam" tidak punya jam terstruktur
+TIME_RANGE_PATTERN = re.compile(r'^\s*(\d{1,2})[:.](\d{2})\s*(?:[-–]\s*(\d{1,2})[:.](\d{2}))?\s*$')
+
+
+def parse_time_range(text):
+    """(jam mulai, jam selesai) dari teks waktu aktivitas; None untuk bagian yang tidak dikenali"""
+    match = TIME_RANGE_PATTERN.match(text or '')
+    if match is None:
+        return None, None
+    start_hour, start_minute, end_hour, end_minute = match.groups()
+    try:
+        start = day_time(int(start_hour), int(start_minute))
+        end = day_time(int(end_hour), int(end_minute)) if end_hour is not None else None
+    except ValueError:
+        return None, None
+    return start, end
+
+
+class ScheduleTemplate(models.Model):
+    """Satu versi template jadwal default yang dirujuk week, bukan disalin ke setiap week.
+
+    Versi tidak pernah diubah setelah dibuat: mengubah ``DEFAULT_ACTIVITY_TEMPLATE``
+    menghasilkan versi baru, sementara week lama tetap menunjuk versi yang
+    dipakainya sehingga riwayat tidak berubah.
+    """
+    version = models.PositiveIntegerField(unique=True)
+    # Sidik isi template untuk menemukan versi yang cocok dengan DEFAULT_ACTIVITY_TEMPLATE
+    digest = models.CharField(max_length=64, unique=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    # {template_id: tuple item}; aman di-cache per proses karena isi versi tidak pernah berubah
+    _items_cache = {}
+
+    class Meta:
+        ordering = ['-version']
+
+    def __str__(self):
+        return f"Template v{self.version}"
+
+    @staticmethod
+    def digest_for(items):
+        return hashlib.sha256(json.dumps(list(items)).encode()).hexdigest()
+
+    @classmethod
+    def current(cls):
+        """Versi yang isinya sama dengan DEFAULT_ACTIVITY_TEMPLATE, dibuat saat pertama kali dibutuhkan"""
+        digest = cls.digest_for(DEFAULT_ACTIVITY_TEMPLATE)
+        template = cls.objects.filter(digest=digest).first()
+        if template is not None:
+            return template
+        try:
+            with transaction.atomic():
+                version = (cls.objects.aggregate(latest=Max('version'))['latest'] or 0) + 1
+                template = cls.objects.create(version=version, digest=digest)
+                ScheduleTemplateItem.objects.bulk_create([
+                    ScheduleTemplateItem(
+                        template=template, position=position, day=day, name=name, time=time,
+                        start_time=start_time, end_time=end_time,
+                    )
+                    for position, (day, name, time) in enumerate(DEFAULT_ACTIVITY_TEMPLATE)
+                    for start_time, end_time in [parse_time_range(time)]
+                ])
+        except IntegrityError:
+            # Proses lain membuat versi yang sama lebih dulu
+            template = cls.objects.get(digest=digest)
+        return template
+
+    @classmethod
+    def items_for(cls, template_id):
+        """Item template urut posisi, dibaca dari database sekali per proses"""
+        if template_id is None:
+            return ()
+        items = cls._items_cache.get(template_id)
+        if items is None:
+            items = cls._items_cache[template_id] = tuple(
+                ScheduleTemplateItem.objects.filter(template_id=template_id).order_by('position')
+            )
+        return items
+
+
+class ScheduleTemplateItem(models.Model):
+    """Satu aktivitas dalam versi template; posisinya adalah nomor bit pada status week"""
+    template = models.ForeignKey(ScheduleTemplate, on_delete=models.CASCADE, related_name='items')
+    position = models.PositiveSmallIntegerField()
+    day = models.CharField(max_length=10)
+    name = models.CharField(max_length=200)
+    time = models.CharField(max_length=50, blank=True, null=True)
+    # Jam terstruktur hasil parse ``time`` (lihat ``parse_time_range``)
+    start_time = models.TimeField(null=True, blank=True)
+    end_time = models.TimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['template', 'position']
+        constraints = [
+            models.UniqueConstraint(fields=['template', 'position'], name='unique_template_item_position'),
+        ]
+
+    def __str__(self):
+        return f"v{self.template_id} #{self.position}: {self.name}"
+
 
 class Week(models.Model):
     """Model untuk menyimpan data mingguan per user"""
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='weeks')
     start_date = models.DateField()  # Tanggal Senin
     end_date = models.DateField()    # Tanggal Minggu
+    # Counter progress yang dijaga atomik (F-expression) oleh setiap perubahan aktivitas
+    total_activities = models.IntegerField(default=0)
+    completed_activities = models.IntegerField(default=0)
+    # Ditandai saat template diklaim/diisi, agar template hanya disisipkan sekali per week
+    template_applied = models.BooleanField(default=False)
+    # Penanda perubahan untuk ETag: naik setiap kali aktivitas week ini berubah (bersama updated_at)
+    revision = models.PositiveIntegerField(default=0)
+    # Aktivitas default dirujuk dari versi template; per week hanya disimpan status selesainya.
+    # Week lama tanpa template menyimpan aktivitas default sebagai baris Activity biasa.
+    template = models.ForeignKey(
+        ScheduleTemplate, on_delete=models.PROTECT, null=True, blank=True, related_name='weeks'
+    )
+    # Bitmap item template yang selesai (bit ke-n = item posisi n)
+    template_state = models.BinaryField(default=b'', editable=False)
+    # Jumlah item template dan yang selesai, agar recount tetap satu UPDATE SQL
+    template_total = models.IntegerField(default=0)
+    template_completed = models.IntegerField(default=0)
+    # Nilai SyncClock saat status template week ini terakhir berubah (delta-sync)
+    template_sync_seq = models.PositiveBigIntegerField(default=0)
+    # Diisi saat aktivitas week dipadatkan ke WeekArchive; week arsip hanya bisa dibaca
+    archived_at = models.DateTimeField(null=True, blank=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
         ordering = ['-start_date']
         unique_together = ['user', 'start_date']  # User bisa punya satu week per start_date
+        indexes = [
+            # Delta-sync: week yang status templatenya berubah sejak cursor
+            models.Index(fields=['user', 'template_sync_seq', 'id'], name='week_user_template_sync_idx'),
+            # Lintas user: urutan dan filter tanggal di admin, cutoff archive_weeks
+            models.Index(fields=['start_date'], name='week_start_date_idx'),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - Week {self.start_date} - {self.end_date}"
@@ -35,14 +311,24 @@ class Week(models.Model):
         )
         return week
 
-    @classmethod
-    def get_week_by_offset(cls, user, offset=0):
-        """Mendapatkan week berdasarkan offset dari minggu ini untuk user tertentu"""
+    @staticmethod
+    def start_date_for_offset(offset=0):
+        """Tanggal Senin dari week dengan offset tertentu terhadap minggu ini"""
         today = timezone.now().date()
         days_since_monday = today.weekday()
         base_start_date = today - timedelta(days=days_since_monday)
-        start_date = base_start_date + timedelta(weeks=offset)
-        end_date = start_date + timedelta(days=6)
+        return base_start_date + timedelta(weeks=offset)
+
+    @staticmethod
+    def end_date_for(start_date):
+        """Tanggal Minggu dari week yang dimulai pada start_date"""
+        return start_date + timedelta(days=6)
+
+    @classmethod
+    def get_week_by_offset(cls, user, offset=0):
+        """Mendapatkan week berdasarkan offset dari minggu ini untuk user tertentu"""
+        start_date = cls.start_date_for_offset(offset)
+        end_date = cls.end_date_for(start_date)
         
         week, created = cls.objects.get_or_create(
             user=user,
@@ -64,14 +350,239 @@ class Week(models.Model):
             })
         return days
 
-    def get_progress_percentage(self):
-        """Menghitung persentase progress untuk minggu ini"""
-        total_activities = Activity.objects.filter(week=self).count()
+    @staticmethod
+    def date_for_day(start_date, day):
+        """Tanggal kalender untuk kode hari (senin..minggu) dalam week yang dimulai start_date"""
+        return start_date + timedelta(days=Activity.DAY_INDEX[day])
+
+    def ensure_template(self):
+        """Mengisi template default tepat sekali untuk week ini, aman dipanggil paralel.
+
+        Klaim dilakukan dengan UPDATE bersyarat pada baris week: di PostgreSQL
+        request kedua menunggu row lock sampai klaim pertama commit, di SQLite
+        penulis sudah diserialisasi oleh lock database. Setelah fungsi kembali,
+        template week ini dijamin sudah ter-commit oleh salah satu pemanggil.
+        Mengembalikan True jika pemanggil ini yang mengisi template.
+        """
+        if self.template_applied:
+            return False
+        with transaction.atomic():
+            claimed = Week.objects.filter(pk=self.pk, template_applied=False).update(template_applied=True)
+            if claimed:
+                Activity.materialize_template([self])
+        # Counter, revisi dan rujukan template baru saja diisi, oleh pemanggil ini atau request lain
+        self.refresh_from_db(fields=[
+            'total_activities', 'completed_activities', 'revision', 'updated_at',
+            'template', 'template_state', 'template_total', 'template_completed', 'template_sync_seq',
+        ])
+        self.template_applied = True
+        return bool(claimed)
+
+    @property
+    def is_archived(self):
+        return self.archived_at is not None
+
+    def get_activities(self):
+        """Aktivitas template (dari versi yang dirujuk) dan baris Activity week ini, urut kronologis per hari.
+
+        Aktivitas tanpa jam terstruktur berada di akhir harinya, urut waktu dibuat.
+        Week arsip direhidrasi dari ringkasan WeekArchive sebagai aktivitas read-only.
+        """
+        if self.is_archived:
+            return self.archive.activities()
+        activities = self.template_activities() + list(
+            self.activities.order_by('day_order', 'start_time', 'created_at', 'id')
+        )
+        # Gabungan item template dan baris Activity; sort stabil menjaga urutan posisi/waktu dibuat
+        return sorted(activities, key=Activity.chronological_key)
+
+    def template_items(self):
+        return ScheduleTemplate.items_for(self.template_id)
+
+    def template_positions(self, day=None):
+        """Posisi item template week ini, opsional hanya untuk satu hari"""
+        return [item.position for item in self.template_items() if day is None or item.day == day]
+
+    def template_activities(self):
+        """Item template week ini digabung dengan status selesainya, tanpa query selain cache item"""
+        state = _state_to_int(self.template_state)
+        return [TemplateActivity(self, item, bool(state >> item.position & 1)) for item in self.template_items()]
+
+    def get_template_activity(self, position):
+        items = self.template_items()
+        if not 0 <= position < len(items):
+            raise Activity.DoesNotExist('Aktivitas template tidak ditemukan')
+        state = _state_to_int(self.template_state)
+        return TemplateActivity(self, items[position], bool(state >> position & 1))
+
+    def set_template_completed(self, positions, completed):
+        """Menyetel status item template week ini, mengembalikan posisi yang benar-benar berubah.
+
+        Bitmap diubah dengan UPDATE bersyarat pada nilai lamanya; jika request lain
+        mengubahnya lebih dulu, status dibaca ulang lalu dicoba lagi sehingga tidak
+        ada perubahan yang hilang dan counter tetap cocok dengan bitmap.
+        """
+        if self.is_archived:
+            raise ValueError('Week sudah diarsipkan dan hanya bisa dibaca')
+        items = self.template_items()
+        positions = {position for position in positions if 0 <= position < len(items)}
+        for _ in range(TEMPLATE_STATE_RETRIES):
+            with transaction.atomic():
+                # Clock dinaikkan lebih dulu: di SQLite transaksi langsung memegang lock tulis
+                # sebelum membaca bitmap, di PostgreSQL baris clock user ikut menyerialisasi penulis
+                seq = SyncClock.advance([self.user_id])[self.user_id]
+                old_state = Week.objects.filter(pk=self.pk).values_list('template_state', flat=True).get()
+                state = _state_to_int(old_state)
+                changed = sorted(position for position in positions if bool(state >> position & 1) != completed)
+                if not changed:
+                    self.template_state = old_state
+                    return []
+                for position in changed:
+                    state ^= 1 << position
+                new_state = _int_to_state(state, len(items))
+                sign = 1 if completed else -1
+                updated = Week.objects.filter(pk=self.pk, template_state=old_state).update(
+                    template_state=new_state,
+                    template_completed=F('template_completed') + sign * len(changed),
+                    template_sync_seq=seq,
+                )
+                if not updated:
+                    continue
+                Week.adjust_counters(self.pk, completed=sign * len(changed))
+                per_day = {}
+                for position in changed:
+                    per_day[items[position].day] = per_day.get(items[position].day, 0) + sign
+                for day, delta in per_day.items():
+                    Activity._record_day_change(self, day, completed=delta)
+            self.template_state = new_state
+            return changed
+        raise IntegrityError('Status template week terus berubah bersamaan, coba lagi')
+
+    def set_completed(self, activities, positions, completed):
+        """Batch toggle week ini dalam satu transaksi: queryset Activity dan posisi item template.
+
+        Mengembalikan id yang berubah (angka untuk Activity, ``t<week>-<posisi>`` untuk item template).
+        """
+        with transaction.atomic():
+            changed_ids = Activity.set_completed(activities, completed)
+            changed_ids += [
+                TemplateActivity.make_id(self.pk, position)
+                for position in self.set_template_completed(positions, completed)
+            ]
+        return changed_ids
+
+    @staticmethod
+    def calculate_progress(total_activities, completed_activities):
+        """Menghitung persentase progress dari jumlah aktivitas total dan selesai"""
         if total_activities == 0:
             return 0
-        completed_activities = Activity.objects.filter(week=self, completed=True).count()
         return round((completed_activities / total_activities) * 100)
 
+    def get_progress_percentage(self):
+        """Menghitung persentase progress untuk minggu ini dari counter tersimpan"""
+        return self.calculate_progress(self.total_activities, self.completed_activities)
+
+    def refresh_progress(self):
+        """Memuat ulang counter dari database lalu mengembalikan persentase progress"""
+        self.refresh_from_db(fields=['total_activities', 'completed_activities'])
+        return self.get_progress_percentage()
+
+    async def arefresh_progress(self):
+        """Versi async ``refresh_progress`` untuk view async"""
+        await self.arefresh_from_db(fields=['total_activities', 'completed_activities'])
+        return self.get_progress_percentage()
+
+    @classmethod
+    def adjust_counters(cls, week_id, total=0, completed=0):
+        """Menggeser counter progress week secara atomik di database"""
+        if total or completed:
+            cls.objects.filter(pk=week_id).update(
+                total_activities=F('total_activities') + total,
+                completed_activities=F('completed_activities') + completed,
+                revision=F('revision') + 1,
+                updated_at=timezone.now(),
+            )
+
+    @classmethod
+    def touch(cls, week_ids):
+        """Menaikkan penanda perubahan week tanpa menyentuh counter (misalnya nama aktivitas diedit)"""
+        cls.objects.filter(pk__in=week_ids).update(revision=F('revision') + 1, updated_at=timezone.now())
+
+    def etag(self):
+        """ETag data week (JSON); berubah setiap kali revisi naik"""
+        return f'"week-{self.pk}-{self.revision}"'
+
+    @classmethod
+    def rebuild_summaries(cls, weeks):
+        """Menghitung ulang counter, rollup harian dan versi cache untuk daftar week setelah perubahan massal"""
+        cls.recount_progress(cls.objects.filter(pk__in=[week.pk for week in weeks]))
+        DailyRollup.rebuild_for_weeks(weeks)
+        for user_id in {week.user_id for week in weeks}:
+            bump_version_on_commit(stats_version_key(user_id))
+            activity_changed.send(sender=cls, user_id=user_id, rebuild=True)
+        for week in weeks:
+            for day, _ in Activity.DAYS_CHOICES:
+                bump_version_on_commit(dashboard_day_version_key(week.pk, day))
+
+    @classmethod
+    def delete_weeks(cls, weeks):
+        """Menghapus week beserta aktivitasnya; tombstone delta-sync, rollup ketujuh tanggalnya dan cache ikut dibersihkan.
+
+        Tanggal week tidak pernah tumpang tindih untuk satu user, jadi rollup
+        pada rentang tanggal week hanya berasal dari week itu.
+        """
+        weeks = list(weeks)
+        if not weeks:
+            return 0
+        with transaction.atomic():
+            Activity.delete_with_tombstones(Activity.objects.filter(week__in=[week.pk for week in weeks]))
+            dates = Q()
+            for week in weeks:
+                dates |= Q(user_id=week.user_id, date__range=(week.start_date, week.end_date))
+            DailyRollup.objects.filter(dates).delete()
+            for user_id in {week.user_id for week in weeks}:
+                bump_version_on_commit(stats_version_key(user_id))
+                activity_changed.send(sender=cls, user_id=user_id, rebuild=True)
+            return cls.objects.filter(pk__in=[week.pk for week in weeks]).delete()[0]
+
+    @classmethod
+    def counted_activities(cls):
+        """Jumlah aktivitas (total, selesai) per week dari baris Activity, item template dan arsip, untuk UPDATE/annotate massal"""
+        activities = Activity.objects.filter(week=OuterRef('pk')).order_by().values('week')
+        total = activities.annotate(count=Count('id')).values('count')
+        completed = activities.filter(completed=True).annotate(count=Count('id')).values('count')
+        archive = WeekArchive.objects.filter(week=OuterRef('pk'))
+        return {
+            'actual_total': (
+                Coalesce(Subquery(total), 0) + F('template_total')
+                + Coalesce(Subquery(archive.values('total')), 0)
+            ),
+            'actual_completed': (
+                Coalesce(Subquery(completed), 0) + F('template_completed')
+                + Coalesce(Subquery(archive.values('completed')), 0)
+            ),
+        }
+
+    @classmethod
+    def recount_progress(cls, weeks):
+        """Menghitung ulang counter untuk queryset week dengan satu UPDATE (sekaligus menaikkan revisi)"""
+        counts = cls.counted_activities()
+        return weeks.update(
+            total_activities=counts['actual_total'],
+            completed_activities=counts['actual_completed'],
+            revision=F('revision') + 1,
+            updated_at=timezone.now(),
+        )
+
+
+class ActivityQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create melewati save(): kolom hari/jam terstruktur diisi di sini
+        objs = list(objs)
+        for activity in objs:
+            activity.fill_schedule_fields()
+        return super().bulk_create(objs, *args, **kwargs)
+
 
 class Activity(models.Model):
     """Model untuk aktivitas harian"""
@@ -84,6 +595,8 @@ class Activity(models.Model):
         ('sabtu', 'Sabtu'),
         ('minggu', 'Minggu'),
     ]
+    # Posisi hari dalam week (senin=0 .. minggu=6)
+    DAY_INDEX = {day: index for index, (day, _) in enumerate(DAYS_CHOICES)}
 
     week = models.ForeignKey(Week, on_delete=models.CASCADE, related_name='activities')
     day = models.CharField(max_length=10, choices=DAYS_CHOICES)
@@ -91,151 +604,479 @@ class Activity(models.Model):
     time = models.CharField(max_length=50, blank=True, null=True)
     completed = models.BooleanField(default=False)
     is_default = models.BooleanField(default=False)  # Untuk aktivitas default seperti kuliah
+    # Posisi hari (senin=0 .. minggu=6) dan jam hasil parse ``time``, diisi otomatis saat disimpan.
+    # day_order NULL menandai baris lama yang belum di-backfill (backfill_activity_times).
+    day_order = models.PositiveSmallIntegerField(null=True, editable=False)
+    start_time = models.TimeField(null=True, blank=True, editable=False)
+    end_time = models.TimeField(null=True, blank=True, editable=False)
+    # Nilai SyncClock milik user saat aktivitas terakhir berubah; dasar delta-sync antar perangkat
+    sync_seq = models.PositiveBigIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = ActivityQuerySet.as_manager()
+
     class Meta:
-        ordering = ['day', 'created_at']
+        ordering = ['day_order', 'start_time', 'created_at']
+        constraints = [
+            models.UniqueConstraint(fields=['week', 'day', 'name'], name='unique_activity_per_week_day_name'),
+        ]
+        indexes = [
+            # Dashboard: semua aktivitas satu week, urut waktu dibuat
+            models.Index(fields=['week', 'created_at'], name='activity_week_created_idx'),
+            # Progress, recount dan batch toggle: aktivitas selesai/belum per week
+            models.Index(fields=['week', 'completed'], name='activity_week_completed_idx'),
+            # Delta-sync: perubahan sejak cursor, per week milik user
+            models.Index(fields=['week', 'sync_seq', 'id'], name='activity_week_sync_idx'),
+            # Urutan kronologis per hari dan "aktivitas berikutnya" dalam satu week
+            models.Index(fields=['week', 'day_order', 'start_time'], name='activity_week_day_start_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_day_display()}: {self.name}"
 
+    def as_dict(self):
+        """Representasi JSON aktivitas untuk API"""
+        return {
+            'id': self.id,
+            'day': self.day,
+            'name': self.name,
+            'time': self.time,
+            'start_time': self.start_time.strftime('%H:%M') if self.start_time else None,
+            'end_time': self.end_time.strftime('%H:%M') if self.end_time else None,
+            'completed': self.completed,
+            'is_default': self.is_default,
+        }
+
+    def fill_schedule_fields(self):
+        """Mengisi posisi hari dan jam terstruktur dari ``day`` dan teks ``time``"""
+        self.day_order = self.DAY_INDEX.get(self.day)
+        self.start_time, self.end_time = parse_time_range(self.time)
+
+    @classmethod
+    def chronological_key(cls, activity):
+        """Kunci urut per hari lalu jam mulai; aktivitas tanpa jam di akhir harinya"""
+        return (
+            cls.DAY_INDEX.get(activity.day, len(cls.DAYS_CHOICES)),
+            activity.start_time is None,
+            activity.start_time or day_time.min,
+        )
+
+    # Jenis entri delta-sync; urutan (sync_seq, jenis, id) menentukan posisi cursor
+    SYNC_TEMPLATE = 0
+    SYNC_ACTIVITY = 1
+
+    @staticmethod
+    def _after_cursor(cursor, kind, seq_field, id_field):
+        """Filter entri jenis ``kind`` yang kuncinya (seq, kind, id) lebih besar dari cursor"""
+        seq, cursor_kind, last_id = cursor
+        if kind > cursor_kind:
+            return Q(**{f'{seq_field}__gte': seq})
+        if kind < cursor_kind:
+            return Q(**{f'{seq_field}__gt': seq})
+        return Q(**{f'{seq_field}__gt': seq}) | Q(**{seq_field: seq, f'{id_field}__gt': last_id})
+
+    @classmethod
+    def changes_since(cls, user, cursor, limit=500):
+        """Aktivitas yang dibuat/diubah/dihapus setelah ``cursor`` (tripel (sync_seq, jenis, id)).
+
+        Perubahan baris Activity, tombstone dan status template per week diurutkan
+        bersama menurut (sync_seq, jenis, id) sehingga halaman bisa dipotong di mana
+        saja, termasuk di tengah kelompok entri yang berbagi sync_seq yang sama.
+        Perubahan template dikirim sebagai satu entri per week berisi posisi item
+        yang selesai. Mengembalikan (daftar perubahan, cursor baru, has_more).
+        """
+        updated = list(
+            cls.objects.filter(cls._after_cursor(cursor, cls.SYNC_ACTIVITY, 'sync_seq', 'id'), week__user=user)
+            .select_related('week')
+            .order_by('sync_seq', 'id')[:limit + 1]
+        )
+        deleted = list(
+            ActivityTombstone.objects.filter(
+                cls._after_cursor(cursor, cls.SYNC_ACTIVITY, 'sync_seq', 'activity_id'), user=user
+            ).order_by('sync_seq', 'activity_id')[:limit + 1]
+        )
+        templated = list(
+            Week.objects.filter(
+                cls._after_cursor(cursor, cls.SYNC_TEMPLATE, 'template_sync_seq', 'id'),
+                user=user,
+                template__isnull=False,
+            ).order_by('template_sync_seq', 'id')[:limit + 1]
+        )
+
+        changes = [
+            ((activity.sync_seq, cls.SYNC_ACTIVITY, activity.id), {
+                **activity.as_dict(),
+                'week_id': activity.week_id,
+                'week_start': activity.week.start_date.isoformat(),
+                'deleted': False,
+            })
+            for activity in updated
+        ] + [
+            ((tombstone.sync_seq, cls.SYNC_ACTIVITY, tombstone.activity_id), {
+                'id': tombstone.activity_id,
+                'week_id': tombstone.week_id,
+                'deleted': True,
+            })
+            for tombstone in deleted
+        ] + [
+            ((week.template_sync_seq, cls.SYNC_TEMPLATE, week.id), {
+                'week_id': week.id,
+                'week_start': week.start_date.isoformat(),
+                'deleted': False,
+                'template': {
+                    'id': week.template_id,
+                    'size': week.template_total,
+                    'completed': [activity.position for activity in week.template_activities() if activity.completed],
+                },
+            })
+            for week in templated
+        ]
+        changes.sort(key=lambda change: change[0])
+        has_more = len(changes) > limit
+        changes = changes[:limit]
+        new_cursor = changes[-1][0] if changes else cursor
+        return [change for _, change in changes], new_cursor, has_more
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._saved_day = instance.__dict__.get('day')
+        instance._saved_completed = instance.__dict__.get('completed')
+        return instance
+
+    @staticmethod
+    def _record_day_change(week, day, total=0, completed=0):
+        """Meneruskan perubahan satu (week, hari) ke rollup harian, cache statistik dan fragmen dashboard"""
+        DailyRollup.adjust(
+            week.user_id,
+            Week.date_for_day(week.start_date, day),
+            total=total,
+            completed=completed,
+        )
+        bump_version_on_commit(stats_version_key(week.user_id))
+        bump_version_on_commit(dashboard_day_version_key(week.pk, day))
+        activity_changed.send(sender=Activity, user_id=week.user_id, total=total, completed=completed)
+
+    def _record_change(self, day, total=0, completed=0):
+        """Meneruskan perubahan aktivitas ke counter week dan semua turunan per hari"""
+        Week.adjust_counters(self.week_id, total=total, completed=completed)
+        self._record_day_change(self.week, day, total=total, completed=completed)
+
+    def save(self, *args, **kwargs):
+        """Menyimpan aktivitas sekaligus menjaga counter progress week, rollup harian dan sync_seq"""
+        adding = self._state.adding
+        previous_day = getattr(self, '_saved_day', None)
+        previous_completed = getattr(self, '_saved_completed', None)
+        self.fill_schedule_fields()
+        if kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = {*kwargs['update_fields'], 'sync_seq', 'day_order', 'start_time', 'end_time'}
+        with transaction.atomic():
+            self.sync_seq = SyncClock.advance([self.week.user_id])[self.week.user_id]
+            super().save(*args, **kwargs)
+            if adding:
+                self._record_change(self.day, total=1, completed=int(self.completed))
+            elif previous_day is not None and previous_day != self.day:
+                # Pindah hari: keluarkan dari tanggal lama, masukkan ke tanggal baru
+                self._record_change(previous_day, total=-1, completed=-int(previous_completed))
+                self._record_change(self.day, total=1, completed=int(self.completed))
+            elif previous_completed is not None and previous_completed != self.completed:
+                self._record_change(self.day, completed=1 if self.completed else -1)
+            else:
+                # Hanya nama/waktu berubah: jumlah tetap, tapi fragmen hari ini dan ETag week harus berganti
+                Week.touch([self.week_id])
+                bump_version_on_commit(dashboard_day_version_key(self.week_id, self.day))
+        self._saved_day = self.day
+        self._saved_completed = self.completed
+
+    def delete(self, *args, **kwargs):
+        """Menghapus aktivitas sekaligus mengurangi counter progress week dan rollup harian"""
+        completed = self.completed
+        with transaction.atomic():
+            ActivityTombstone.record(self.week.user_id, [(self.pk, self.week_id)])
+            result = super().delete(*args, **kwargs)
+            self._record_change(self.day, total=-1, completed=-int(completed))
+        return result
+
+    @classmethod
+    def delete_with_tombstones(cls, activities):
+        """Menghapus queryset aktivitas secara massal sambil mencatat tombstone untuk delta-sync.
+
+        Counter dan rollup tidak disentuh; pemanggil bertanggung jawab memanggil
+        ``Week.rebuild_summaries`` untuk week yang terdampak.
+        """
+        with transaction.atomic():
+            rows = list(activities.select_for_update(of=('self',)).values_list('id', 'week_id', 'week__user_id'))
+            per_user = {}
+            for activity_id, week_id, user_id in rows:
+                per_user.setdefault(user_id, []).append((activity_id, week_id))
+            for user_id, user_rows in per_user.items():
+                ActivityTombstone.record(user_id, user_rows)
+            return cls.objects.filter(pk__in=[row[0] for row in rows]).delete()[0]
+
+    def toggle(self):
+        """Membalik status completed dengan UPDATE bersyarat agar toggle paralel tidak menggeser counter"""
+        new_state = not self.completed
+        with transaction.atomic():
+            seq = SyncClock.advance([self.week.user_id])[self.week.user_id]
+            changed = Activity.objects.filter(pk=self.pk, completed=self.completed).update(
+                completed=new_state,
+                updated_at=timezone.now(),
+                sync_seq=seq,
+            )
+            if changed:
+                self.sync_seq = seq
+                self._record_change(self.day, completed=1 if new_state else -1)
+        # Jika tidak ada baris berubah, request lain sudah lebih dulu menyetel status yang sama
+        self.completed = self._saved_completed = new_state
+        return new_state
+
+    @classmethod
+    def set_completed(cls, activities, completed):
+        """Menyetel status completed banyak aktivitas dengan satu UPDATE.
+
+        ``activities`` adalah queryset yang sudah difilter kepemilikannya.
+        Mengembalikan id aktivitas yang benar-benar berubah.
+        """
+        with transaction.atomic():
+            # Kunci baris yang akan berubah agar delta counter cocok dengan hasil UPDATE
+            rows = list(
+                activities.exclude(completed=completed)
+                .select_for_update(of=('self',))
+                .values_list('id', 'week_id', 'day')
+            )
+            if not rows:
+                return []
+            changed_ids = [activity_id for activity_id, _, _ in rows]
+            weeks = Week.objects.in_bulk({week_id for _, week_id, _ in rows})
+            seqs = SyncClock.advance([week.user_id for week in weeks.values()])
+            updated = 0
+            for user_id, seq in seqs.items():
+                # Satu UPDATE per pemilik (praktis selalu satu user) karena sync_seq milik clock user
+                user_week_ids = [week_id for week_id, week in weeks.items() if week.user_id == user_id]
+                updated += cls.objects.filter(
+                    pk__in=changed_ids, week_id__in=user_week_ids, completed=not completed
+                ).update(completed=completed, updated_at=timezone.now(), sync_seq=seq)
+
+            if updated != len(rows):
+                # Sebagian baris sudah diubah request lain (mis. di SQLite tanpa row lock): hitung ulang persis
+                Week.rebuild_summaries(list(weeks.values()))
+                return changed_ids
+
+            sign = 1 if completed else -1
+            per_week, per_day = {}, {}
+            for _, week_id, day in rows:
+                per_week[week_id] = per_week.get(week_id, 0) + sign
+                per_day[(week_id, day)] = per_day.get((week_id, day), 0) + sign
+            for week_id, delta in per_week.items():
+                Week.adjust_counters(week_id, completed=delta)
+            for (week_id, day), delta in per_day.items():
+                cls._record_day_change(weeks[week_id], day, completed=delta)
+        return changed_ids
+
+    @classmethod
+    def group_by_day(cls, activities):
+        """Mengelompokkan aktivitas yang sudah diambil ke list per hari (tanpa query tambahan)"""
+        activities_by_day = {day_key: [] for day_key, _ in cls.DAYS_CHOICES}
+        for activity in activities:
+            activities_by_day[activity.day].append(activity)
+        return activities_by_day
+
     @classmethod
     def create_default_activities(cls, week):
         """Membuat aktivitas default pola hidup sehat berdasarkan jurnal kesehatan"""
-        default_activities = [
-            # SENIN - Hari Produktif & Fresh Start
-            {'day': 'senin', 'name': 'Bangun Pagi & Doa Syukur', 'time': '05:30 - 05:35', 'is_default': True},
-            {'day': 'senin', 'name': 'Baca Alkitab & Renungan', 'time': '05:35 - 05:45', 'is_default': True},
-            {'day': 'senin', 'name': 'Olahraga Ringan/Stretching', 'time': '05:45 - 06:15', 'is_default': True},
-            {'day': 'senin', 'name': 'Mandi & Persiapan', 'time': '06:15 - 06:45', 'is_default': True},
-            {'day': 'senin', 'name': 'Sarapan Sehat', 'time': '06:45 - 07:15', 'is_default': True},
-            {'day': 'senin', 'name': 'Waktu Belajar Fokus', 'time': '08:00 - 10:00', 'is_default': True},
-            {'day': 'senin', 'name': 'Istirahat & Snack', 'time': '10:00 - 10:15', 'is_default': True},
-            {'day': 'senin', 'name': 'Mengerjakan Tugas', 'time': '10:15 - 12:00', 'is_default': True},
-            {'day': 'senin', 'name': 'Makan Siang', 'time': '12:00 - 13:00', 'is_default': True},
-            {'day': 'senin', 'name': 'Istirahat Siang', 'time': '13:00 - 13:30', 'is_default': True},
-            {'day': 'senin', 'name': 'Aktivitas Produktif', 'time': '13:30 - 17:00', 'is_default': True},
-            {'day': 'senin', 'name': 'Olahraga Sore', 'time': '17:00 - 17:30', 'is_default': True},
-            {'day': 'senin', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'senin', 'name': 'Family Time/Relaksasi', 'time': '19:30 - 21:00', 'is_default': True},
-            {'day': 'senin', 'name': 'Doa Malam & Evaluasi Hari', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'senin', 'name': 'Tidur', 'time': '22:00', 'is_default': True},
-
-            # SELASA - Hari Kuliah Penuh
-            {'day': 'selasa', 'name': 'Bangun Pagi & Doa Syukur', 'time': '05:00 - 05:05', 'is_default': True},
-            {'day': 'selasa', 'name': 'Baca Alkitab & Renungan', 'time': '05:05 - 05:15', 'is_default': True},
-            {'day': 'selasa', 'name': 'Persiapan Kuliah', 'time': '05:15 - 06:30', 'is_default': True},
-            {'day': 'selasa', 'name': 'Sarapan Sehat', 'time': '06:30 - 07:00', 'is_default': True},
-            {'day': 'selasa', 'name': 'Kuliah', 'time': '07:30 - 15:30', 'is_default': True},
-            {'day': 'selasa', 'name': 'Istirahat & Snack', 'time': '15:30 - 16:00', 'is_default': True},
-            {'day': 'selasa', 'name': 'Review Materi Kuliah', 'time': '16:00 - 17:00', 'is_default': True},
-            {'day': 'selasa', 'name': 'Olahraga/Jalan Santai', 'time': '17:00 - 17:30', 'is_default': True},
-            {'day': 'selasa', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'selasa', 'name': 'Waktu Belajar Mandiri', 'time': '19:30 - 21:30', 'is_default': True},
-            {'day': 'selasa', 'name': 'Doa Malam & Refleksi', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'selasa', 'name': 'Tidur', 'time': '22:00', 'is_default': True},
-
-            # RABU - Hari Recovery & Pengembangan Diri
-            {'day': 'rabu', 'name': 'Bangun Pagi & Doa Syukur', 'time': '05:30 - 05:35', 'is_default': True},
-            {'day': 'rabu', 'name': 'Baca Alkitab & Renungan', 'time': '05:35 - 05:45', 'is_default': True},
-            {'day': 'rabu', 'name': 'Olahraga Pagi', 'time': '05:45 - 06:30', 'is_default': True},
-            {'day': 'rabu', 'name': 'Mandi & Persiapan', 'time': '06:30 - 07:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Sarapan Sehat', 'time': '07:00 - 07:30', 'is_default': True},
-            {'day': 'rabu', 'name': 'Waktu Belajar Fokus', 'time': '08:00 - 10:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Istirahat & Snack', 'time': '10:00 - 10:15', 'is_default': True},
-            {'day': 'rabu', 'name': 'Skill Development/Hobi', 'time': '10:15 - 12:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Makan Siang', 'time': '12:00 - 13:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Power Nap/Istirahat', 'time': '13:00 - 13:30', 'is_default': True},
-            {'day': 'rabu', 'name': 'Proyek Personal', 'time': '13:30 - 16:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Olahraga Sore', 'time': '16:00 - 16:30', 'is_default': True},
-            {'day': 'rabu', 'name': 'Sosialisasi/Me Time', 'time': '16:30 - 18:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'rabu', 'name': 'Reading/Learning', 'time': '19:30 - 21:00', 'is_default': True},
-            {'day': 'rabu', 'name': 'Doa Malam & Gratitude', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'rabu', 'name': 'Tidur', 'time': '22:00', 'is_default': True},
-
-            # KAMIS - Hari Kuliah
-            {'day': 'kamis', 'name': 'Bangun Pagi & Doa Syukur', 'time': '05:00 - 05:05', 'is_default': True},
-            {'day': 'kamis', 'name': 'Baca Alkitab & Renungan', 'time': '05:05 - 05:15', 'is_default': True},
-            {'day': 'kamis', 'name': 'Persiapan Kuliah', 'time': '05:15 - 06:30', 'is_default': True},
-            {'day': 'kamis', 'name': 'Sarapan Sehat', 'time': '06:30 - 07:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Kuliah', 'time': '07:30 - 12:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Makan Siang', 'time': '12:00 - 13:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Istirahat', 'time': '13:00 - 13:30', 'is_default': True},
-            {'day': 'kamis', 'name': 'Waktu Belajar Fokus', 'time': '13:30 - 15:30', 'is_default': True},
-            {'day': 'kamis', 'name': 'Istirahat & Snack', 'time': '15:30 - 16:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Aktivitas Fisik', 'time': '16:00 - 17:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Relaksasi/Hobi', 'time': '17:00 - 18:30', 'is_default': True},
-            {'day': 'kamis', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'kamis', 'name': 'Persiapan Weekend', 'time': '19:30 - 21:00', 'is_default': True},
-            {'day': 'kamis', 'name': 'Doa Malam & Refleksi', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'kamis', 'name': 'Tidur', 'time': '22:00', 'is_default': True},
-
-            # JUMAT - Hari Persiapan Weekend
-            {'day': 'jumat', 'name': 'Bangun Pagi & Doa Syukur', 'time': '05:30 - 05:35', 'is_default': True},
-            {'day': 'jumat', 'name': 'Baca Alkitab & Renungan', 'time': '05:35 - 05:45', 'is_default': True},
-            {'day': 'jumat', 'name': 'Olahraga Pagi', 'time': '05:45 - 06:30', 'is_default': True},
-            {'day': 'jumat', 'name': 'Mandi & Persiapan', 'time': '06:30 - 07:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Sarapan Sehat', 'time': '07:00 - 07:30', 'is_default': True},
-            {'day': 'jumat', 'name': 'Waktu Belajar Intensif', 'time': '08:00 - 10:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Istirahat & Snack', 'time': '10:00 - 10:15', 'is_default': True},
-            {'day': 'jumat', 'name': 'Menyelesaikan Tugas', 'time': '10:15 - 12:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Makan Siang', 'time': '12:00 - 13:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Istirahat Siang', 'time': '13:00 - 13:30', 'is_default': True},
-            {'day': 'jumat', 'name': 'Review & Planning', 'time': '13:30 - 15:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Cleaning & Organizing', 'time': '15:00 - 16:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Aktivitas Sosial', 'time': '16:00 - 18:00', 'is_default': True},
-            {'day': 'jumat', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'jumat', 'name': 'Family/Friend Time', 'time': '19:30 - 21:30', 'is_default': True},
-            {'day': 'jumat', 'name': 'Doa Malam & Syukur', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'jumat', 'name': 'Tidur', 'time': '22:30', 'is_default': True},
-
-            # SABTU - Hari Ibadah & Pelayanan
-            {'day': 'sabtu', 'name': 'Bangun Pagi & Doa Syukur', 'time': '06:00 - 06:05', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Baca Alkitab & Renungan', 'time': '06:05 - 06:20', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Olahraga Pagi', 'time': '06:20 - 07:00', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Persiapan Ibadah', 'time': '07:00 - 08:00', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Sarapan Sehat', 'time': '08:00 - 08:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Latihan Ibadah Naposo', 'time': '09:00 - 12:00', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Makan Siang Bersama', 'time': '12:00 - 13:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Fellowship & Sharing', 'time': '13:30 - 15:00', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Personal Time/Istirahat', 'time': '15:00 - 16:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Aktivitas Rekreasi', 'time': '16:30 - 18:00', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Prepare for Sunday', 'time': '19:30 - 20:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Relaksasi & Hiburan', 'time': '20:30 - 21:30', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Doa Malam & Gratitude', 'time': '21:30 - 21:40', 'is_default': True},
-            {'day': 'sabtu', 'name': 'Tidur', 'time': '22:30', 'is_default': True},
-
-            # MINGGU - Hari Ibadah & Rest
-            {'day': 'minggu', 'name': 'Bangun Pagi & Doa Syukur', 'time': '06:00 - 06:05', 'is_default': True},
-            {'day': 'minggu', 'name': 'Baca Alkitab & Meditasi', 'time': '06:05 - 06:25', 'is_default': True},
-            {'day': 'minggu', 'name': 'Persiapan Ibadah', 'time': '06:25 - 07:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Sarapan Ringan', 'time': '07:30 - 08:00', 'is_default': True},
-            {'day': 'minggu', 'name': 'Ibadah Gereja Pagi', 'time': '08:30 - 11:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Fellowship & Komunitas', 'time': '11:30 - 12:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Makan Siang Keluarga', 'time': '12:30 - 14:00', 'is_default': True},
-            {'day': 'minggu', 'name': 'Quality Time Keluarga', 'time': '14:00 - 16:00', 'is_default': True},
-            {'day': 'minggu', 'name': 'Mengerjakan Tugas Mingguan', 'time': '16:00 - 18:00', 'is_default': True},
-            {'day': 'minggu', 'name': 'Makan Malam', 'time': '18:30 - 19:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Planning Minggu Depan', 'time': '19:30 - 20:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Relaksasi & Prepare', 'time': '20:30 - 21:30', 'is_default': True},
-            {'day': 'minggu', 'name': 'Doa Malam & Refleksi', 'time': '21:30 - 21:45', 'is_default': True},
-            {'day': 'minggu', 'name': 'Tidur', 'time': '22:00', 'is_default': True},
-        ]
-        
-        for activity_data in default_activities:
-            cls.objects.get_or_create(
-                week=week,
-                day=activity_data['day'],
-                name=activity_data['name'],
-                defaults={
-                    'time': activity_data['time'],
-                    'is_default': activity_data['is_default'],
-                    'completed': False
-                }
+        return cls.materialize_template([week])
+
+    @classmethod
+    def materialize_template(cls, weeks, reset=False):
+        """Menghubungkan banyak week ke versi template saat ini, tanpa menyalin baris aktivitas.
+
+        Per week hanya ditulis rujukan versi dan bitmap kosong, satu UPDATE per
+        user. Week yang sudah punya template dilewati sehingga operasi ini
+        idempotent; ``reset=True`` memasang ulang versi terbaru dan mengosongkan
+        status selesainya.
+        """
+        template = ScheduleTemplate.current()
+        size = len(ScheduleTemplate.items_for(template.pk))
+        with transaction.atomic():
+            seqs = SyncClock.advance([week.user_id for week in weeks])
+            for user_id, seq in seqs.items():
+                targets = Week.objects.filter(
+                    pk__in=[week.pk for week in weeks if week.user_id == user_id], archived_at__isnull=True
+                )
+                if not reset:
+                    targets = targets.filter(template__isnull=True)
+                targets.update(
+                    template=template,
+                    template_state=_int_to_state(0, size),
+                    template_total=size,
+                    template_completed=0,
+                    template_sync_seq=seq,
+                    template_applied=True,
+                )
+            Week.rebuild_summaries(weeks)
+
+
+class TemplateActivity:
+    """Item template milik satu week, dengan antarmuka yang sama seperti Activity untuk template dan API.
+
+    Tidak punya baris sendiri: nama dan waktu dibaca dari versi template,
+    status selesai dari bitmap week. Id-nya berbentuk ``t<week_id>-<posisi>``.
+    """
+    is_default = True
+
+    def __init__(self, week, item, completed):
+        self.week = week
+        self.week_id = week.pk
+        self.position = item.position
+        self.day = item.day
+        self.name = item.name
+        self.time = item.time
+        self.start_time = item.start_time
+        self.end_time = item.end_time
+        self.completed = completed
+        self.id = self.make_id(week.pk, item.position)
+
+    def __str__(self):
+        return f"{self.get_day_display()}: {self.name}"
+
+    @staticmethod
+    def make_id(week_id, position):
+        return f't{week_id}-{position}'
+
+    @staticmethod
+    def parse_id(value):
+        """(week_id, posisi) dari id item template, atau None jika bukan id item template"""
+        if not isinstance(value, str) or not value.startswith('t'):
+            return None
+        try:
+            week_id, position = (int(part) for part in value[1:].split('-'))
+        except ValueError:
+            return None
+        return week_id, position
+
+    def get_day_display(self):
+        return dict(Activity.DAYS_CHOICES).get(self.day, self.day)
+
+    def as_dict(self):
+        return Activity.as_dict(self)
+
+    def toggle(self):
+        """Membalik status item ini di bitmap week (lihat ``Week.set_template_completed``)"""
+        new_state = not self.completed
+        self.week.set_template_completed([self.position], new_state)
+        self.completed = new_state
+        return new_state
+
+
+class WeekArchive(models.Model):
+    """Ringkasan padat week lama yang baris aktivitasnya sudah dihapus dari tabel Activity.
+
+    Menyimpan jumlah per hari dan per nama aktivitas (cukup untuk statistik
+    dan rollup) serta ``detail``: JSON terkompresi zlib berisi rujukan
+    template + bitmap statusnya dan daftar aktivitas custom, cukup untuk
+    merehidrasi week secara read-only.
+    """
+    week = models.OneToOneField(Week, on_delete=models.CASCADE, primary_key=True, related_name='archive')
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+    # {day: [total, completed]} dan {name: [total, completed]}
+    per_day = models.JSONField(default=dict)
+    per_name = models.JSONField(default=dict)
+    detail = models.BinaryField()
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Arsip {self.week_id}: {self.completed}/{self.total}"
+
+    @classmethod
+    def summarize(cls, week, rows):
+        """Ringkasan (belum disimpan) dari week beserta baris Activity-nya, urut waktu dibuat"""
+        archive = cls(week=week, per_day={}, per_name={})
+        for activity in week.template_activities() + rows:
+            archive.total += 1
+            archive.completed += activity.completed
+            for counts in (
+                archive.per_day.setdefault(activity.day, [0, 0]),
+                archive.per_name.setdefault(activity.name, [0, 0]),
+            ):
+                counts[0] += 1
+                counts[1] += activity.completed
+        archive.detail = zlib.compress(json.dumps({
+            'template': week.template_id,
+            'state': bytes(week.template_state or b'').hex(),
+            'rows': [[row.day, row.name, row.time, row.completed, row.is_default] for row in rows],
+        }, separators=(',', ':')).encode())
+        return archive
+
+    @classmethod
+    def archive_weeks(cls, weeks):
+        """Memadatkan daftar week (sudah ber-template, belum diarsip) lalu menghapus baris Activity-nya.
+
+        Counter week dan rollup harian tidak berubah: jumlahnya kini dibaca dari
+        arsip. Baris dihapus tanpa tombstone karena aktivitasnya tidak dihapus
+        user, hanya dipindahkan. Mengembalikan jumlah baris Activity yang dihapus.
+        """
+        week_ids = [week.pk for week in weeks]
+        with transaction.atomic():
+            rows = {}
+            for activity in Activity.objects.filter(week__in=week_ids).order_by('created_at', 'id'):
+                rows.setdefault(activity.week_id, []).append(activity)
+            cls.objects.bulk_create(
+                [cls.summarize(week, rows.get(week.pk, [])) for week in weeks],
+                batch_size=TEMPLATE_BATCH_SIZE,
             )
+            # Rujukan template pindah ke detail arsip, sehingga jalur template week aktif melewati week ini
+            Week.objects.filter(pk__in=week_ids).update(
+                archived_at=timezone.now(),
+                template=None,
+                template_state=b'',
+                template_total=0,
+                template_completed=0,
+                revision=F('revision') + 1,
+                updated_at=timezone.now(),
+            )
+            deleted = Activity.objects.filter(week__in=week_ids).delete()[0]
+            # Kolom hari dirender ulang sebagai read-only
+            for week_id in week_ids:
+                for day, _ in Activity.DAYS_CHOICES:
+                    bump_version_on_commit(dashboard_day_version_key(week_id, day))
+        return deleted
+
+    def activities(self):
+        """Aktivitas week ini direhidrasi dari ``detail`` sebagai objek read-only"""
+        detail = json.loads(zlib.decompress(bytes(self.detail)))
+        state = _state_to_int(bytes.fromhex(detail['state']))
+        entries = [
+            (item.day, item.name, item.time, bool(state >> item.position & 1), True)
+            for item in ScheduleTemplate.items_for(detail['template'])
+        ] + [tuple(row) for row in detail['rows']]
+        return [ArchivedActivity(self.week, index, *entry) for index, entry in enumerate(entries)]
+
+
+class ArchivedActivity:
+    """Aktivitas week arsip hasil rehidrasi; hanya untuk ditampilkan, tidak bisa diubah"""
+    read_only = True
+
+    def __init__(self, week, index, day, name, time, completed, is_default):
+        self.week = week
+        self.week_id = week.pk
+        self.id = f'a{week.pk}-{index}'
+        self.day = day
+        self.name = name
+        self.time = time
+        self.start_time, self.end_time = parse_time_range(time)
+        self.completed = completed
+        self.is_default = is_default
+
+    def __str__(self):
+        return f"{self.get_day_display()}: {self.name}"
+
+    def get_day_display(self):
+        return dict(Activity.DAYS_CHOICES).get(self.day, self.day)
+
+    def as_dict(self):
+        return Activity.as_dict(self)
 
 
 class UserProfile(models.Model):
@@ -258,45 +1099,199 @@ class UserProfile(models.Model):
     @property
     def total_activities(self):
         """Total aktivitas yang sudah dibuat"""
-        return Activity.objects.filter(week__user=self.user).count()
+        return DailyRollup.totals_for_user(self.user)['total']
     
     @property
     def completion_rate(self):
         """Persentase completion rate keseluruhan"""
-        total = Activity.objects.filter(week__user=self.user).count()
-        if total == 0:
+        totals = DailyRollup.totals_for_user(self.user)
+        if totals['total'] == 0:
             return 0
-        completed = Activity.objects.filter(week__user=self.user, completed=True).count()
-        return round((completed / total) * 100, 1)
+        return round((totals['completed'] / totals['total']) * 100, 1)
     
     @property
     def current_streak(self):
-        """Streak hari berturut-turut melakukan aktivitas"""
-        # Implementasi sederhana - bisa dikembangkan lebih lanjut
+        """Streak hari berturut-turut melakukan aktivitas (minimal 50% selesai per hari)"""
+        return DailyRollup.streak_for_user(self.user_id)
+
+
+class DailyRollup(models.Model):
+    """Ringkasan harian per user (total & selesai), dijaga inkremental oleh setiap perubahan aktivitas"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_rollups')
+    date = models.DateField()
+    total = models.IntegerField(default=0)
+    completed = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-date']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_rollup_per_user_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}: {self.completed}/{self.total}"
+
+    @classmethod
+    def adjust(cls, user_id, date, total=0, completed=0):
+        """Menggeser rollup (user, date) secara atomik, membuat barisnya jika belum ada"""
+        if not (total or completed):
+            return
+        rollups = cls.objects.filter(user_id=user_id, date=date)
+        deltas = {'total': F('total') + total, 'completed': F('completed') + completed}
+        if rollups.update(**deltas):
+            return
+        try:
+            with transaction.atomic():
+                cls.objects.create(user_id=user_id, date=date, total=total, completed=completed)
+        except IntegrityError:
+            # Request lain membuat baris yang sama lebih dulu
+            rollups.update(**deltas)
+
+    @classmethod
+    def rebuild_for_weeks(cls, weeks):
+        """Menghitung ulang rollup ketujuh tanggal dari setiap week dengan satu agregat, bitmap template dan satu upsert"""
+        per_day = (
+            Activity.objects.filter(week__in=[week.pk for week in weeks])
+            .values('week_id', 'day')
+            .annotate(total=Count('id'), completed=Count('id', filter=Q(completed=True)))
+        )
+        counts = {(row['week_id'], row['day']): [row['total'], row['completed']] for row in per_day}
+        # Item template tidak punya baris Activity: dihitung dari bitmap terbaru setiap week
+        templated = Week.objects.filter(pk__in=[week.pk for week in weeks], template__isnull=False).only(
+            'id', 'template_id', 'template_state'
+        )
+        for week in templated:
+            for activity in week.template_activities():
+                count = counts.setdefault((week.pk, activity.day), [0, 0])
+                count[0] += 1
+                count[1] += activity.completed
+        # Week arsip tidak punya baris lagi: jumlah per hari dibaca dari ringkasannya
+        archives = WeekArchive.objects.filter(week__in=[week.pk for week in weeks]).values_list('week_id', 'per_day')
+        for week_id, per_day in archives:
+            for day, (total, completed) in per_day.items():
+                count = counts.setdefault((week_id, day), [0, 0])
+                count[0] += total
+                count[1] += completed
+
+        rollups = []
+        for week in weeks:
+            for day, _ in Activity.DAYS_CHOICES:
+                total, completed = counts.get((week.pk, day), (0, 0))
+                rollups.append(cls(
+                    user_id=week.user_id,
+                    date=Week.date_for_day(week.start_date, day),
+                    total=total,
+                    completed=completed,
+                ))
+        cls.objects.bulk_create(
+            rollups,
+            batch_size=TEMPLATE_BATCH_SIZE,
+            update_conflicts=True,
+            unique_fields=['user', 'date'],
+            update_fields=['total', 'completed'],
+        )
+
+    @classmethod
+    def streak_for_user(cls, user_id):
+        """Streak hari berturut-turut sampai hari ini dengan minimal 50% aktivitas selesai"""
         today = timezone.now().date()
+        # Rollup dibaca mundur dari hari ini dan berhenti di hari pertama yang putus
+        rollups = (
+            cls.objects.filter(user_id=user_id, date__lte=today)
+            .order_by('-date')
+            .values_list('date', 'total', 'completed')
+        )
+
         streak = 0
         check_date = today
-        
-        while True:
-            day_activities = Activity.objects.filter(
-                week__user=self.user,
-                week__start_date__lte=check_date,
-                week__end_date__gte=check_date
-            )
-            
-            if not day_activities.exists():
+        for date, total_today, completed_today in rollups.iterator(chunk_size=64):
+            if date != check_date or total_today == 0:
                 break
-                
-            completed_today = day_activities.filter(completed=True).count()
-            total_today = day_activities.count()
-            
-            if total_today == 0 or completed_today / total_today < 0.5:  # 50% completion threshold
+            if completed_today / total_today < 0.5:  # 50% completion threshold
                 break
-                
             streak += 1
             check_date -= timedelta(days=1)
-            
-            if streak > 30:  # Prevent infinite loop
-                break
-                
+
         return streak
+
+    @classmethod
+    def totals_for_user(cls, user):
+        """Jumlah aktivitas total dan selesai sepanjang riwayat user"""
+        return cls.objects.filter(user=user).aggregate(
+            total=Coalesce(Sum('total'), 0),
+            completed=Coalesce(Sum('completed'), 0),
+        )
+
+
+class SyncClock(models.Model):
+    """Clock perubahan per user untuk delta-sync; nilainya ditulis ke Activity.sync_seq"""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='sync_clock')
+    seq = models.PositiveBigIntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user_id}: {self.seq}"
+
+    @classmethod
+    def current(cls, user_id):
+        """Nilai clock user saat ini (0 jika user belum pernah mengubah apa pun)"""
+        return cls.objects.filter(user_id=user_id).values_list('seq', flat=True).first() or 0
+
+    @classmethod
+    def advance(cls, user_ids):
+        """Menaikkan clock setiap user, mengembalikan {user_id: seq baru}.
+
+        Harus dipanggil di dalam transaksi yang menulis perubahannya: baris clock
+        tetap terkunci sampai commit, sehingga urutan seq per user sama dengan
+        urutan commit dan cursor klien tidak pernah melompati perubahan yang
+        belum terlihat. Celah nomor tidak masalah.
+        """
+        user_ids = sorted(set(user_ids))
+        if not user_ids:
+            return {}
+        clocks = cls.objects.filter(user_id__in=user_ids)
+        if clocks.update(seq=F('seq') + 1) < len(user_ids):
+            cls.objects.bulk_create([cls(user_id=user_id) for user_id in user_ids], ignore_conflicts=True)
+            clocks.update(seq=F('seq') + 1)
+        return dict(clocks.values_list('user_id', 'seq'))
+
+
+class ActivityTombstone(models.Model):
+    """Jejak aktivitas yang dihapus, agar perangkat lain ikut menghapusnya saat sync"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='activity_tombstones')
+    activity_id = models.BigIntegerField()
+    week_id = models.BigIntegerField()
+    sync_seq = models.PositiveBigIntegerField()
+    deleted_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'sync_seq', 'activity_id'], name='tombstone_user_sync_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: aktivitas {self.activity_id} dihapus (seq {self.sync_seq})"
+
+    @classmethod
+    def record(cls, user_id, rows):
+        """Mencatat tombstone untuk daftar (activity_id, week_id) milik satu user"""
+        seq = SyncClock.advance([user_id])[user_id]
+        cls.objects.bulk_create([
+            cls(user_id=user_id, activity_id=activity_id, week_id=week_id, sync_seq=seq)
+            for activity_id, week_id in rows
+        ])
+
+
+class Achievement(models.Model):
+    """Pencapaian yang sudah terbuka untuk user, dicatat sekali oleh rule engine di ``achievements.py``"""
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='achievements')
+    code = models.CharField(max_length=50)
+    unlocked_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['unlocked_at']
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'code'], name='unique_achievement_per_user_code'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.code}"
@@ -0,0 +1,110 @@
+"""Generator data sintetis (user, week, status template, aktivitas custom, rollup) untuk uji skala dan benchmark"""
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.utils import timezone
+
+from .models import Week, Activity, UserProfile, DailyRollup, ScheduleTemplate, DEFAULT_ACTIVITY_TEMPLATE
+
+WEEKEND_DAYS = ('sabtu', 'minggu')
+
+
+def custom_items(count):
+    """``count`` aktivitas custom per week, bergiliran mengikuti hari dan jam template default"""
+    items = []
+    for i in range(count):
+        day, name, time_range = DEFAULT_ACTIVITY_TEMPLATE[i % len(DEFAULT_ACTIVITY_TEMPLATE)]
+        cycle = i // len(DEFAULT_ACTIVITY_TEMPLATE)
+        items.append((day, f'{name} (ekstra #{cycle + 1})', time_range))
+    return items
+
+
+def completion_chance(discipline, habit, weekly_mood, day):
+    """Peluang satu aktivitas diselesaikan: disiplin user, kebiasaan yang menguat, mood mingguan, akhir pekan"""
+    chance = discipline + habit + weekly_mood
+    if day in WEEKEND_DAYS:
+        chance -= 0.15
+    return min(max(chance, 0.02), 0.98)
+
+
+def seed_users(rng, usernames, weeks, items=(), password_hash=None, full_history=False, batch_size=5000):
+    """Membuat user beserta riwayat week, aktivitas dan rollup harian dalam satu transaksi.
+
+    Setiap week merujuk versi template saat ini dengan bitmap status acak;
+    ``items`` adalah aktivitas custom per week yang disimpan sebagai baris
+    Activity. Setiap user punya tingkat disiplin sendiri, mulai memakai tracker
+    pada week acak (maksimal ``weeks`` ke belakang, atau tepat ``weeks`` jika
+    ``full_history``), makin konsisten seiring waktu dan lebih sering bolong
+    di akhir pekan. Hari yang belum lewat pada minggu ini selalu belum selesai.
+    Counter week dan rollup dihitung langsung di Python, jadi tidak perlu
+    recount setelahnya. Mengembalikan (users, jumlah week, jumlah aktivitas).
+    """
+    today = timezone.now().date()
+    current_start = Week.start_date_for_offset(0)
+    template = ScheduleTemplate.current()
+    template_items = ScheduleTemplate.items_for(template.pk)
+    state_bytes = (len(template_items) + 7) // 8
+    users = []
+    for username in usernames:
+        user = User(username=username, password=password_hash or '')
+        if password_hash is None:
+            user.set_unusable_password()
+        users.append(user)
+
+    with transaction.atomic():
+        users = User.objects.bulk_create(users)
+        UserProfile.objects.bulk_create([UserProfile(user=user) for user in users])
+
+        week_objects = []
+        activities = []
+        rollups = {}
+        for user in users:
+            discipline = rng.betavariate(5, 3)
+            history = weeks if full_history else rng.randint(1, weeks)
+            for weeks_ago in range(history):
+                start_date = current_start - timedelta(weeks=weeks_ago)
+                week = Week(
+                    user=user,
+                    start_date=start_date,
+                    end_date=Week.end_date_for(start_date),
+                    template_applied=True,
+                    template=template,
+                    template_total=len(template_items),
+                    total_activities=len(template_items) + len(items),
+                )
+                # Kebiasaan menguat hingga +0.15 sejak week pertama user
+                habit = 0.15 * (history - weeks_ago) / history
+                weekly_mood = rng.gauss(0, 0.08)
+
+                def roll(day):
+                    date = Week.date_for_day(start_date, day)
+                    completed = date <= today and rng.random() < completion_chance(discipline, habit, weekly_mood, day)
+                    rollup = rollups.setdefault((user.pk, date), [0, 0])
+                    rollup[0] += 1
+                    rollup[1] += completed
+                    week.completed_activities += completed
+                    return completed
+
+                state = 0
+                for item in template_items:
+                    if roll(item.day):
+                        state |= 1 << item.position
+                        week.template_completed += 1
+                week.template_state = state.to_bytes(state_bytes, 'little')
+                for day, name, time_range in items:
+                    activities.append(Activity(week=week, day=day, name=name, time=time_range, completed=roll(day)))
+                week_objects.append(week)
+
+        # Aktivitas mendapat week_id dari objek week yang baru disimpan
+        Week.objects.bulk_create(week_objects, batch_size=batch_size)
+        Activity.objects.bulk_create(activities, batch_size=batch_size)
+        DailyRollup.objects.bulk_create(
+            [
+                DailyRollup(user_id=user_id, date=date, total=total, completed=completed)
+                for (user_id, date), (total, completed) in rollups.items()
+            ],
+            batch_size=batch_size,
+        )
+
+    return users, len(week_objects), len(week_objects) * len(template_items) + len(activities)
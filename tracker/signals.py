@@ -0,0 +1,9 @@
+"""Signal perubahan aktivitas untuk pendengar di luar model (mis. rule engine pencapaian).
+
+``activity_changed`` dikirim di dalam transaksi yang menulis perubahan,
+dengan argumen ``user_id``, ``total`` dan ``completed`` (delta jumlah aktivitas),
+atau ``rebuild=True`` setelah hitung ulang massal yang deltanya tidak diketahui.
+"""
+from django.dispatch import Signal
+
+activity_changed = Signal()
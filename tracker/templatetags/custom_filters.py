@@ -4,5 +4,5 @@ register = template.Library()
 
 @register.filter
 def dict_key(dictionary, key):
-    """Get value from dictionary by key"""
+    """Get value from dictionary by key (e.g. the per-day activity lists)"""
     return dictionary.get(key, [])
\ No newline at end of file
@@ -1,3 +1,1268 @@
-from django.test import TestCase
+import io
+import json
+import re
+import threading
+import time
+from contextlib import contextmanager
+from datetime import time as day_time, timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import OperationalError, connection, transaction
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from .analytics import build_user_statistics, completion_by_activity, completion_by_week, completion_by_weekday
+from .importing import IMPORT_MAX_ROWS, ImportFileError, parse_ics
+from .metrics import registry
+from .models import (
+    DEFAULT_ACTIVITY_TEMPLATE, Week, Activity, Achievement, ActivityTombstone, DailyRollup, TemplateActivity,
+    SyncClock, UserProfile, WeekArchive, parse_time_range,
+)
+from .views import get_day_fragment_keys
+
+# Tabel yang tidak boleh dibaca dengan full scan oleh request biasa
+TRACKER_TABLES = ('tracker_week', 'tracker_activity', 'tracker_dailyrollup', 'tracker_weekarchive')
+
+
+@contextmanager
+def capture_statements():
+    """Merekam SQL (beserta parameter) yang benar-benar dieksekusi selama blok berjalan"""
+    statements = []
+
+    def wrapper(execute, sql, params, many, context):
+        statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    with connection.execute_wrapper(wrapper):
+        yield statements
+
+
+class SummaryAssertions:
+    """Membandingkan counter week dan rollup harian tersimpan dengan hasil hitung ulang dari data mentah"""
+
+    def snapshot_rollups(self, user):
+        return {
+            date: (total, completed)
+            for date, total, completed in DailyRollup.objects.filter(user=user).values_list('date', 'total', 'completed')
+            if total or completed
+        }
+
+    def assertSummariesConsistent(self, user):
+        weeks = list(Week.objects.filter(user=user).annotate(**Week.counted_activities()))
+        for week in weeks:
+            self.assertEqual(
+                (week.total_activities, week.completed_activities), (week.actual_total, week.actual_completed), week
+            )
+        stored = self.snapshot_rollups(user)
+        with transaction.atomic():
+            DailyRollup.rebuild_for_weeks(weeks)
+            rebuilt = self.snapshot_rollups(user)
+            transaction.set_rollback(True)
+        self.assertEqual(stored, rebuilt)
+        # Tidak ada rollup tersisa untuk tanggal di luar week yang masih ada
+        for date in stored:
+            self.assertTrue(any(week.start_date <= date <= week.end_date for week in weeks), date)
+
+
+async def read_streaming_content(response):
+    return b''.join([chunk async for chunk in response.streaming_content])
+
+
+def explain(sql, params):
+    """Mengembalikan daftar (tabel, detail) untuk setiap full scan pada rencana query"""
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            # Tanpa seq scan, planner hanya memakainya jika memang tidak ada index yang bisa dipakai
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            nodes, scans = [plan[0]['Plan']], []
+            while nodes:
+                node = nodes.pop()
+                nodes.extend(node.get('Plans', []))
+                if node['Node Type'] == 'Seq Scan':
+                    scans.append((node['Relation Name'], node['Node Type']))
+            return scans
+
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+        scans = []
+        for row in cursor.fetchall():
+            detail = row[-1]
+            # SQLite: "SEARCH t USING INDEX ..." memakai index, "SCAN t" membaca seluruh tabel/index
+            if detail.startswith('SCAN '):
+                scans.append((detail.split()[1], detail))
+        return scans
+
+
+class QueryPlanTests(TestCase):
+    """Query dashboard, toggle, stats dan profile harus memakai index pada dataset besar"""
+    USERS = 8
+    WEEKS_PER_USER = 26
+
+    @classmethod
+    def setUpTestData(cls):
+        users = [User.objects.create_user(f'plan_user_{i}', password='password') for i in range(cls.USERS)]
+        current_start = Week.start_date_for_offset(0)
+        for user in users:
+            weeks = Week.objects.bulk_create([
+                Week(
+                    user=user,
+                    start_date=current_start - timedelta(weeks=offset),
+                    end_date=current_start - timedelta(weeks=offset, days=-6),
+                )
+                for offset in range(cls.WEEKS_PER_USER)
+            ])
+            Activity.materialize_template(weeks)
+            Activity.objects.bulk_create([
+                Activity(week=week, day=day, name=f'Custom {day}', completed=day in ('senin', 'rabu', 'jumat'))
+                for week in weeks
+                for day in Activity.DAY_INDEX
+            ])
+            # Sebagian item template selesai agar distribusi status realistis
+            for week in Week.objects.filter(user=user):
+                week.set_template_completed(
+                    [position for day in ('senin', 'rabu', 'jumat') for position in week.template_positions(day)],
+                    True,
+                )
+            # Week lama dipadatkan ke arsip seperti oleh archive_weeks
+            old_weeks = Week.objects.filter(user=user, start_date__lt=current_start - timedelta(weeks=20))
+            WeekArchive.archive_weeks(list(old_weeks))
+        for user in users:
+            UserProfile.objects.create(user=user)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        cls.user = users[0]
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def assertRequestUsesIndexes(self, method, url, **kwargs):
+        with capture_statements() as statements:
+            response = getattr(self.client, method)(url, **kwargs)
+            if response.streaming and response.is_async:
+                # Query respons streaming baru berjalan saat isinya dibaca
+                async_to_sync(read_streaming_content)(response)
+        self.assertEqual(response.status_code, 200)
+
+        checked = 0
+        for sql, params in statements:
+            if not sql.lstrip().upper().startswith(('SELECT', 'UPDATE', 'DELETE')):
+                continue
+            if not any(table in sql for table in TRACKER_TABLES):
+                continue
+            checked += 1
+            scans = [scan for scan in explain(sql, params) if scan[0] in TRACKER_TABLES]
+            self.assertFalse(scans, f'Full scan pada {url}: {scans}\n{sql}')
+        self.assertGreater(checked, 0, f'Tidak ada query tracker yang diperiksa untuk {url}')
+        return response
+
+    def test_dashboard_queries_use_indexes(self):
+        self.assertRequestUsesIndexes('get', reverse('tracker:dashboard'))
+        self.assertRequestUsesIndexes('get', reverse('tracker:dashboard') + '?week=-3')
+        self.assertRequestUsesIndexes('get', reverse('tracker:dashboard') + '?week=-22')
+
+    def test_toggle_queries_use_indexes(self):
+        activity = Activity.objects.filter(week__user=self.user).first()
+        template_activity = Week.objects.filter(user=self.user).first().template_activities()[0]
+        for activity_id in (activity.id, template_activity.id):
+            self.assertRequestUsesIndexes(
+                'post',
+                reverse('tracker:toggle_activity'),
+                data=json.dumps({'activity_id': activity_id}),
+                content_type='application/json',
+            )
+
+    def test_batch_toggle_queries_use_indexes(self):
+        self.assertRequestUsesIndexes(
+            'post',
+            reverse('tracker:toggle_activities'),
+            data=json.dumps({'week_offset': 0, 'day': 'selasa', 'completed': True}),
+            content_type='application/json',
+        )
+
+    def test_sync_queries_use_indexes(self):
+        activity = Activity.objects.filter(week__user=self.user).first()
+        activity.toggle()
+        self.assertRequestUsesIndexes('get', reverse('tracker:sync_activities') + f'?cursor={activity.sync_seq - 1}-0-0')
+
+    def test_export_queries_use_indexes(self):
+        self.assertRequestUsesIndexes('get', reverse('tracker:export_activities') + '?format=ndjson')
+
+    def test_stats_queries_use_indexes(self):
+        self.assertRequestUsesIndexes('get', reverse('tracker:stats'))
+
+    def test_profile_queries_use_indexes(self):
+        self.assertRequestUsesIndexes('get', reverse('tracker:profile'))
+
+
+class ConcurrentWeekInitializationTests(TransactionTestCase):
+    """Banyak request paralel yang membuka week baru hanya boleh mengisi template sekali"""
+    THREADS = 8
+
+    def retry_locked(self, func):
+        # SQLite in-memory (shared cache) langsung menolak penulis kedua alih-alih menunggu
+        for _ in range(200):
+            try:
+                return func()
+            except OperationalError as e:
+                if 'locked' not in str(e):
+                    raise
+                time.sleep(0.01)
+        self.fail('Database terus terkunci')
+
+    def test_parallel_dashboard_requests_apply_template_once(self):
+        user = User.objects.create_user('race_user', password='password')
+        barrier = threading.Barrier(self.THREADS)
+        claims, seen_counts, errors = [], [], []
+
+        def open_fresh_week():
+            try:
+                barrier.wait()
+                week = self.retry_locked(lambda: Week.get_week_by_offset(user, 2))
+                claims.append(self.retry_locked(week.ensure_template))
+                seen_counts.append(self.retry_locked(lambda: len(Week.objects.get(pk=week.pk).get_activities())))
+            except Exception as e:
+                errors.append(e)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=open_fresh_week) for _ in range(self.THREADS)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertFalse(errors, errors)
+        self.assertEqual(claims.count(True), 1)
+        self.assertEqual(Week.objects.filter(user=user).count(), 1)
+        week = Week.objects.get(user=user)
+        self.assertTrue(week.template_applied)
+        # Item template dirujuk dari versinya, bukan disalin sebagai baris Activity
+        self.assertEqual(week.activities.count(), 0)
+        self.assertEqual(len(week.get_activities()), len(DEFAULT_ACTIVITY_TEMPLATE))
+        self.assertEqual(week.total_activities, len(DEFAULT_ACTIVITY_TEMPLATE))
+        # Setiap request yang selesai melihat template lengkap, tidak pernah setengah jadi
+        self.assertEqual(seen_counts, [len(DEFAULT_ACTIVITY_TEMPLATE)] * self.THREADS)
+
+
+class WeekArchiveTests(TestCase):
+    """Mengarsipkan week lama tidak boleh mengubah statistik, dan week arsip tetap bisa dibuka"""
+
+    def test_archiving_keeps_statistics(self):
+        user = User.objects.create_user('archive_user', password='password')
+        week = Week.get_week_by_offset(user, -30)
+        week.ensure_template()
+        week.set_template_completed(week.template_positions('senin'), True)
+        Activity.objects.create(week=week, day='selasa', name='Custom', completed=True)
+        before = build_user_statistics(user)
+
+        self.assertGreater(WeekArchive.archive_weeks([Week.objects.get(pk=week.pk)]), 0)
+        self.assertFalse(Activity.objects.filter(week=week).exists())
+        self.assertEqual(build_user_statistics(user), before)
+
+        # Rebuild ringkasan (mis. dari recount) menghasilkan angka yang sama dari arsip
+        week = Week.get_week_by_offset(user, -30)
+        Week.rebuild_summaries([week])
+        self.assertEqual(build_user_statistics(user), before)
+
+        self.assertTrue(week.is_archived)
+        activities = week.get_activities()
+        self.assertEqual(len(activities), before['total_activities'])
+        self.assertEqual(sum(activity.completed for activity in activities), before['completed_activities'])
+        with self.assertRaises(ValueError):
+            week.set_template_completed([0], True)
+
+
+class ImportTests(TestCase):
+    """Impor CSV/.ics memvalidasi setiap baris, melaporkan yang gagal dan tetap menyisipkan sisanya"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('import_user', password='password')
+        self.client.force_login(self.user)
+
+    def test_csv_rows_are_validated_per_row(self):
+        start = Week.start_date_for_offset(-1)
+        data = (
+            'date,day,name,time,completed\n'
+            f'{start.isoformat()},,Renang,06:00 - 07:00,true\n'
+            ',selasa,Membaca,,\n'
+            ',libur,Tidak Valid,,\n'
+            ',rabu,,,\n'
+            'bukan-tanggal,,Rusak,,\n'
+            ',selasa,Membaca,,\n'
+        ).encode()
+        response = self.client.post(reverse('tracker:import_activities'), {
+            'file': SimpleUploadedFile('aktivitas.csv', data, content_type='text/csv'),
+            'week_offset': 0,
+        })
+        self.assertEqual(response.context['created'], 2)
+        self.assertEqual([line for line, _ in response.context['errors']], [4, 5, 6, 7])
+
+        last_week = Week.objects.get(user=self.user, start_date=start)
+        # Week baru dari impor langsung mendapat template, ditambah satu baris impor
+        self.assertEqual(last_week.total_activities, last_week.template_total + 1)
+        self.assertEqual(last_week.completed_activities, 1)
+        self.assertTrue(Activity.objects.filter(
+            week__user=self.user, week__start_date=Week.start_date_for_offset(0), day='selasa', name='Membaca'
+        ).exists())
+
+    def test_reimporting_an_export_creates_nothing(self):
+        week = Week.get_week_by_offset(self.user, 0)
+        week.ensure_template()
+        Activity.objects.create(week=week, day='senin', name='Custom', completed=True)
+        week.refresh_from_db()
+        counters = (week.total_activities, week.completed_activities)
+
+        export = self.client.get(reverse('tracker:export_activities'), {'format': 'csv'})
+        data = async_to_sync(read_streaming_content)(export)
+        response = self.client.post(reverse('tracker:import_activities'), {
+            'file': SimpleUploadedFile('ekspor.csv', data, content_type='text/csv'),
+            'week_offset': 0,
+        })
+        self.assertEqual(response.context['created'], 0)
+        self.assertEqual(len(response.context['errors']), counters[0])
+        week.refresh_from_db()
+        self.assertEqual((week.total_activities, week.completed_activities), counters)
+
+    def test_ics_weekly_events_are_expanded(self):
+        start = Week.start_date_for_offset(0)
+        data = (
+            'BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\n'
+            'SUMMARY:Kuliah Basis\r\n  Data\r\n'
+            f'DTSTART;TZID=Asia/Jakarta:{start:%Y%m%d}T080000\r\n'
+            f'DTEND;TZID=Asia/Jakarta:{start:%Y%m%d}T100000\r\n'
+            'RRULE:FREQ=WEEKLY;COUNT=4;BYDAY=MO,TH\r\n'
+            f'EXDATE;TZID=Asia/Jakarta:{start + timedelta(days=3):%Y%m%d}T080000\r\n'
+            'END:VEVENT\r\nBEGIN:VEVENT\r\nSUMMARY:Tanpa Tanggal\r\nEND:VEVENT\r\n'
+            'END:VCALENDAR\r\n'
+        ).encode()
+        response = self.client.post(reverse('tracker:import_activities'), {
+            'file': SimpleUploadedFile('jadwal.ics', data, content_type='text/calendar'),
+            'week_offset': 0,
+        })
+        self.assertEqual(response.context['created'], 3)
+        self.assertEqual(response.context['errors'], [(10, 'DTSTART wajib diisi')])
+        activities = Activity.objects.filter(week__user=self.user).order_by('week__start_date', 'day')
+        self.assertEqual(
+            [(activity.week.start_date, activity.day) for activity in activities],
+            [(start, 'senin'), (start + timedelta(weeks=1), 'kamis'), (start + timedelta(weeks=1), 'senin')],
+        )
+        self.assertEqual({activity.name for activity in activities}, {'Kuliah Basis Data'})
+        self.assertEqual({activity.time for activity in activities}, {'08:00 - 10:00'})
+
+    def ics_event(self, rule):
+        # DTSTART hari Rabu, agar BYDAY=MO tidak pernah cocok di week pertama
+        start = Week.start_date_for_offset(0) + timedelta(days=2)
+        return (
+            'BEGIN:VCALENDAR\r\nBEGIN:VEVENT\r\nSUMMARY:Kuliah\r\n'
+            f'DTSTART:{start:%Y%m%d}T080000\r\nRRULE:FREQ=WEEKLY;{rule}\r\n'
+            'END:VEVENT\r\nEND:VCALENDAR\r\n'
+        ).encode()
+
+    def test_invalid_rrule_rejects_the_file(self):
+        for rule in ('INTERVAL=0;BYDAY=MO', 'INTERVAL=-1;BYDAY=MO', 'INTERVAL=dua', 'COUNT=x', 'COUNT=0'):
+            with self.subTest(rule=rule), self.assertRaises(ImportFileError):
+                parse_ics(self.ics_event(rule))
+
+        data = self.ics_event('INTERVAL=0;BYDAY=MO')
+        response = self.client.post(reverse('tracker:import_activities'), {
+            'file': SimpleUploadedFile('jadwal.ics', data, content_type='text/calendar'),
+            'week_offset': 0,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('file'))
+        self.assertFalse(Activity.objects.filter(week__user=self.user).exists())
+
+    def test_rrule_occurrences_are_bounded(self):
+        rows, errors = parse_ics(self.ics_event('COUNT=100000'))
+        self.assertEqual((len(rows), errors), (IMPORT_MAX_ROWS, []))
+        rows, errors = parse_ics(self.ics_event('INTERVAL=999999999'))
+        self.assertEqual((len(rows), errors), (1, []))
+
+    def test_csv_row_with_extra_columns_is_a_row_error(self):
+        data = 'day,name\nsenin,Renang\nselasa,Membaca,lebih,banyak\n'.encode()
+        response = self.client.post(reverse('tracker:import_activities'), {
+            'file': SimpleUploadedFile('aktivitas.csv', data, content_type='text/csv'),
+            'week_offset': 0,
+        })
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['created'], 1)
+        self.assertEqual(response.context['errors'], [(3, 'Jumlah kolom melebihi header')])
+
+
+class AdminChangelistTests(SummaryAssertions, TestCase):
+    """Changelist admin tidak boleh menjalankan query per baris"""
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser('admin_user', password='password')
+        self.client.force_login(self.admin)
+        self.user = User.objects.create_user('admin_target', password='password')
+
+    def add_weeks(self, offsets):
+        for offset in offsets:
+            week = Week.get_week_by_offset(self.user, offset)
+            Activity.objects.create(week=week, day='senin', name='Custom', completed=offset % 2 == 0)
+
+    def count_queries(self, url):
+        with capture_statements() as statements:
+            self.assertEqual(self.client.get(url).status_code, 200)
+        return len(statements)
+
+    def test_changelists_use_constant_queries(self):
+        for url in (reverse('admin:tracker_week_changelist'), reverse('admin:tracker_activity_changelist')):
+            self.add_weeks(range(-2, 0))
+            few = self.count_queries(url)
+            self.add_weeks(range(-12, -2))
+            self.assertEqual(self.count_queries(url), few)
+            Week.objects.all().delete()
+
+    def test_bulk_delete_actions_keep_summaries(self):
+        self.add_weeks(range(-3, 0))
+        week = Week.get_week_by_offset(self.user, -1)
+        week.ensure_template()
+        revision = Week.objects.get(pk=week.pk).revision
+        doomed = list(Activity.objects.filter(week=week).values_list('pk', flat=True))
+
+        response = self.client.post(reverse('admin:tracker_activity_changelist'), {
+            'action': 'delete_selected', '_selected_action': doomed, 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Activity.objects.filter(pk__in=doomed).exists())
+        self.assertEqual(ActivityTombstone.objects.filter(activity_id__in=doomed).count(), len(doomed))
+        self.assertGreater(Week.objects.get(pk=week.pk).revision, revision)
+        self.assertSummariesConsistent(self.user)
+
+        doomed_week = Week.get_week_by_offset(self.user, -2)
+        doomed_activity = Activity.objects.get(week=doomed_week)
+        response = self.client.post(reverse('admin:tracker_week_changelist'), {
+            'action': 'delete_selected', '_selected_action': [doomed_week.pk], 'post': 'yes',
+        })
+        self.assertEqual(response.status_code, 302)
+        self.assertFalse(Week.objects.filter(pk=doomed_week.pk).exists())
+        self.assertTrue(ActivityTombstone.objects.filter(activity_id=doomed_activity.pk).exists())
+        self.assertSummariesConsistent(self.user)
+
+    def test_week_changelist_sorts_by_progress(self):
+        self.add_weeks(range(-4, 0))
+        response = self.client.get(reverse('admin:tracker_week_changelist'), {'o': '-4'})
+        progress = [week.progress for week in response.context['cl'].result_list]
+        self.assertEqual(progress, sorted(progress, reverse=True))
+        self.assertEqual(progress[0], 100.0)
+
+
+class AchievementTests(TestCase):
+    """Pencapaian dibuka sekali setelah commit, hanya rule yang terdampak perubahan yang dievaluasi"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('achievement_user', password='password')
+        self.week = Week.get_week_by_offset(self.user, 0)
+
+    def unlocked(self):
+        return set(Achievement.objects.filter(user=self.user).values_list('code', flat=True))
+
+    def test_rules_unlock_once_and_only_on_relevant_changes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            activity = Activity.objects.create(week=self.week, day='senin', name='Custom', completed=True)
+        self.assertEqual(self.unlocked(), {'first_week', 'high_achiever'})
+
+        # Membatalkan selesai tidak bisa membuka rule apa pun: tidak ada query pencapaian
+        with self.captureOnCommitCallbacks(execute=True), capture_statements() as statements:
+            activity.toggle()
+        self.assertFalse([sql for sql, _ in statements if 'tracker_achievement' in sql])
+        # Pencapaian yang sudah terbuka tidak dicabut
+        self.assertEqual(self.unlocked(), {'first_week', 'high_achiever'})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Activity.objects.bulk_create([
+                Activity(week=self.week, day='selasa', name=f'Bulk {i}') for i in range(100)
+            ])
+            Week.rebuild_summaries([self.week])
+        self.assertEqual(self.unlocked(), {'first_week', 'high_achiever', 'century_club'})
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse('tracker:profile'))
+        self.assertContains(response, 'Century Club')
+        self.assertNotContains(response, 'Week Warrior')
+
+
+class StructuredTimeTests(TestCase):
+    """Teks waktu diparse ke kolom jam dan posisi hari, agar urutan kronologis bisa dilakukan di SQL"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('time_user', password='password')
+        self.week = Week.get_week_by_offset(self.user, 0)
+        self.week.ensure_template()
+
+    def test_parse_time_range(self):
+        self.assertEqual(parse_time_range('05:30 - 05:35'), (day_time(5, 30), day_time(5, 35)))
+        self.assertEqual(parse_time_range('8.00-10.00'), (day_time(8), day_time(10)))
+        self.assertEqual(parse_time_range('22:00'), (day_time(22), None))
+        self.assertEqual(parse_time_range('2 jam'), (None, None))
+        self.assertEqual(parse_time_range('25:00'), (None, None))
+        self.assertEqual(parse_time_range(None), (None, None))
+
+    def test_day_is_ordered_chronologically(self):
+        Activity.objects.create(week=self.week, day='senin', name='Tanpa Jam', time='2 jam')
+        Activity.objects.bulk_create([Activity(week=self.week, day='senin', name='Jogging', time='06:00 - 06:30')])
+        jogging = Activity.objects.get(week=self.week, name='Jogging')
+        self.assertEqual((jogging.day_order, jogging.start_time), (0, day_time(6)))
+
+        senin = [activity for activity in self.week.get_activities() if activity.day == 'senin']
+        start_times = [activity.start_time for activity in senin if activity.start_time is not None]
+        self.assertEqual(start_times, sorted(start_times))
+        self.assertEqual(senin[-1].name, 'Tanpa Jam')
+        self.assertIn('Jogging', [activity.name for activity in senin[:5]])
+
+    def test_backfill_fills_legacy_rows(self):
+        activity = Activity.objects.create(week=self.week, day='rabu', name='Lama', time='19:00 - 20:00')
+        Activity.objects.filter(pk=activity.pk).update(day_order=None, start_time=None, end_time=None)
+        call_command('backfill_activity_times', batch_size=1, stdout=io.StringIO())
+        activity.refresh_from_db()
+        self.assertEqual((activity.day_order, activity.start_time, activity.end_time), (2, day_time(19), day_time(20)))
+
+
+class ActivityCrudTests(TestCase):
+    """Tambah/edit aktivitas dengan nama yang sudah ada di hari yang sama ditolak sebagai error form, bukan 500"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('crud_user', password='password')
+        self.client.force_login(self.user)
+
+    def test_duplicate_name_is_a_form_error(self):
+        data = {'day': 'senin', 'name': 'Renang', 'time': '', 'week_offset': 0}
+        self.assertEqual(self.client.post(reverse('tracker:add_activity'), data).status_code, 302)
+        response = self.client.post(reverse('tracker:add_activity'), data)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('name'))
+
+        other = Activity.objects.create(week=Week.get_week_by_offset(self.user, 0), day='senin', name='Membaca')
+        response = self.client.post(reverse('tracker:edit_activity', args=[other.pk]), {**data, 'name': 'Renang'})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context['form'].has_error('name'))
+        # Menyimpan ulang dengan nama sendiri tetap boleh
+        response = self.client.post(reverse('tracker:edit_activity', args=[other.pk]), {**data, 'name': 'Membaca'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_template_item_name_is_a_duplicate(self):
+        name = next(name for day, name, _ in DEFAULT_ACTIVITY_TEMPLATE if day == 'senin')
+        # Week +1 belum pernah dibuka: template tetap diisi dulu sebelum validasi
+        for week_offset in (0, 1):
+            data = {'day': 'senin', 'name': name, 'time': '', 'week_offset': week_offset}
+            response = self.client.post(reverse('tracker:add_activity'), data)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.context['form'].has_error('name'))
+        self.assertFalse(Activity.objects.filter(week__user=self.user, name=name).exists())
+
+        # Edit aktivitas custom menjadi nama item template juga ditolak
+        custom = Activity.objects.create(week=Week.get_week_by_offset(self.user, 0), day='senin', name='Custom')
+        response = self.client.post(reverse('tracker:edit_activity', args=[custom.pk]), {**data, 'week_offset': 0})
+        self.assertTrue(response.context['form'].has_error('name'))
+
+
+class CsrfTests(TestCase):
+    """Endpoint AJAX yang mengubah data mewajibkan token CSRF yang dikirim dashboard lewat header"""
+
+    def test_toggle_endpoints_require_csrf_token(self):
+        user = User.objects.create_user('csrf_user', password='password')
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(user)
+        week = Week.get_week_by_offset(user, 0)
+        activity = Activity.objects.create(week=week, day='senin', name='Custom')
+        requests = [
+            (reverse('tracker:toggle_activity'), {'activity_id': activity.pk}),
+            (reverse('tracker:toggle_activities'), {'week_offset': 0, 'day': 'senin', 'completed': True}),
+        ]
+        for url, payload in requests:
+            response = client.post(url, json.dumps(payload), content_type='application/json')
+            self.assertEqual(response.status_code, 403)
+
+        dashboard = client.get(reverse('tracker:dashboard'))
+        token = str(dashboard.context['csrf_token'])
+        self.assertContains(dashboard, 'name="csrfmiddlewaretoken"')
+        for url, payload in requests:
+            response = client.post(url, json.dumps(payload), content_type='application/json', HTTP_X_CSRFTOKEN=token)
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['success'])
+
+
+class ProgressCounterTests(SummaryAssertions, TestCase):
+    """Counter week tersimpan harus sama dengan hasil hitung ulang setelah setiap tambah/edit/hapus/toggle"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('counter_user', password='password')
+        self.client.force_login(self.user)
+        self.week = Week.get_week_by_offset(self.user, 0)
+        self.week.ensure_template()
+
+    def toggle(self, activity_id):
+        response = self.client.post(
+            reverse('tracker:toggle_activity'), json.dumps({'activity_id': activity_id}), content_type='application/json'
+        )
+        self.assertTrue(response.json()['success'])
+        # Progress di respons dibaca dari counter, harus sama dengan hitungan ulang
+        week = Week.objects.annotate(**Week.counted_activities()).get(pk=self.week.pk)
+        self.assertEqual(response.json()['progress'], Week.calculate_progress(week.actual_total, week.actual_completed))
+
+    def test_counters_follow_every_mutation(self):
+        data = {'day': 'senin', 'name': 'Renang', 'time': '06:00', 'week_offset': 0}
+        self.assertEqual(self.client.post(reverse('tracker:add_activity'), data).status_code, 302)
+        activity = Activity.objects.get(week=self.week, name='Renang')
+        self.assertSummariesConsistent(self.user)
+
+        self.toggle(activity.pk)
+        self.assertSummariesConsistent(self.user)
+
+        # Pindah hari dalam keadaan selesai: counter week tetap, rollup pindah tanggal
+        response = self.client.post(reverse('tracker:edit_activity', args=[activity.pk]), {**data, 'day': 'kamis'})
+        self.assertEqual(response.status_code, 302)
+        self.assertSummariesConsistent(self.user)
+
+        self.toggle(TemplateActivity.make_id(self.week.pk, 0))
+        self.assertSummariesConsistent(self.user)
+        self.toggle(activity.pk)
+        self.assertSummariesConsistent(self.user)
+
+        self.assertEqual(self.client.post(reverse('tracker:delete_activity', args=[activity.pk])).status_code, 302)
+        self.assertFalse(Activity.objects.filter(pk=activity.pk).exists())
+        self.assertSummariesConsistent(self.user)
+        week = Week.objects.get(pk=self.week.pk)
+        self.assertEqual((week.total_activities, week.completed_activities), (week.template_total, 1))
+
+
+def raw_daily_counts(user):
+    """Jumlah (total, selesai) per tanggal dihitung langsung dari baris Activity dan bitmap template"""
+    counts = {}
+    for week in Week.objects.filter(user=user):
+        rows = [(activity.day, activity.completed) for activity in Activity.objects.filter(week=week)]
+        rows += [(activity.day, activity.completed) for activity in week.template_activities()]
+        for day, completed in rows:
+            count = counts.setdefault(Week.date_for_day(week.start_date, day), [0, 0])
+            count[0] += 1
+            count[1] += completed
+    return {date: tuple(count) for date, count in counts.items()}
+
+
+class DailyRollupTests(SummaryAssertions, TestCase):
+    """Rollup harian dan semua statistik yang membacanya harus sama dengan hitungan dari riwayat mentah"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('rollup_user', password='password')
+        self.weeks = [Week.get_week_by_offset(self.user, offset) for offset in (-2, -1, 0)]
+        for week in self.weeks:
+            week.ensure_template()
+        # Riwayat campuran: sebagian item template selesai, aktivitas custom dibuat, dipindah dan dihapus
+        self.weeks[0].set_template_completed(range(0, 60, 3), True)
+        self.weeks[1].set_template_completed(range(40), True)
+        moved = Activity.objects.create(week=self.weeks[1], day='senin', name='Pindah', completed=True)
+        moved.day = 'sabtu'
+        moved.save()
+        Activity.objects.create(week=self.weeks[2], day='selasa', name='Hapus').delete()
+        Activity.objects.create(week=self.weeks[2], day='rabu', name='Custom').toggle()
+
+    def assertRollupsMatchHistory(self):
+        raw = {date: count for date, count in raw_daily_counts(self.user).items() if any(count)}
+        self.assertEqual(self.snapshot_rollups(self.user), raw)
+
+    def test_rollups_and_statistics_match_history(self):
+        self.assertRollupsMatchHistory()
+        self.assertSummariesConsistent(self.user)
+
+        raw = raw_daily_counts(self.user).values()
+        total, completed = sum(count[0] for count in raw), sum(count[1] for count in raw)
+        stats = build_user_statistics(self.user)
+        self.assertEqual((stats['total_activities'], stats['completed_activities']), (total, completed))
+        self.assertEqual(stats['completion_rate'], Week.calculate_progress(total, completed))
+        profile = UserProfile.objects.create(user=self.user)
+        self.assertEqual(profile.total_activities, total)
+        self.assertEqual(profile.completion_rate, round(completed / total * 100, 1))
+
+    def test_backfill_rebuilds_rollups(self):
+        DailyRollup.objects.filter(user=self.user).delete()
+        call_command('backfill_daily_rollups', batch_size=2, stdout=io.StringIO())
+        self.assertRollupsMatchHistory()
+
+    def test_streak_matches_day_by_day_walk(self):
+        def walked_streak():
+            counts, streak = raw_daily_counts(self.user), 0
+            day = timezone.now().date()
+            while counts.get(day, (0, 0))[0] and counts[day][1] / counts[day][0] >= 0.5:
+                streak += 1
+                day -= timedelta(days=1)
+            return streak
+
+        self.assertEqual(DailyRollup.streak_for_user(self.user.pk), walked_streak())
+        # Week terpisah satu minggu kosong dari riwayat lain: celah tanggal harus memutus streak
+        isolated = Week.get_week_by_offset(self.user, -4)
+        isolated.ensure_template()
+        for week in [isolated, *self.weeks]:
+            week.set_template_completed(week.template_positions(), True)
+        # Seluruh riwayat sampai hari ini selesai: streak membentang sampai hari pertama week tertua yang bersambung
+        streak = walked_streak()
+        self.assertEqual(streak, (timezone.now().date() - self.weeks[0].start_date).days + 1)
+        self.assertEqual(DailyRollup.streak_for_user(self.user.pk), streak)
+
+        broken = timezone.now().date() - timedelta(days=3)
+        week = next(week for week in self.weeks if week.start_date <= broken <= week.end_date)
+        day = Activity.DAYS_CHOICES[broken.weekday()][0]
+        week.set_template_completed(week.template_positions(day), False)
+        self.assertEqual(walked_streak(), 3)
+        self.assertEqual(DailyRollup.streak_for_user(self.user.pk), 3)
+
+
+class StatisticsTests(TestCase):
+    """Breakdown statistik sama dengan hitungan dari riwayat mentah, dengan query tetap dan cache per user"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('stats_user', password='password')
+        self.client.force_login(self.user)
+        self.add_weeks((-2, -1))
+
+    def add_weeks(self, offsets):
+        for offset in offsets:
+            week = Week.get_week_by_offset(self.user, offset)
+            week.ensure_template()
+            week.set_template_completed(range(0, 80, -offset + 1), True)
+            Activity.objects.create(week=week, day='senin', name='Olahraga Sore', completed=offset % 2 == 0)
+
+    def test_breakdowns_match_history(self):
+        names, weekdays = {}, {}
+        for week in Week.objects.filter(user=self.user):
+            for activity in [*Activity.objects.filter(week=week), *week.template_activities()]:
+                for counts in (
+                    names.setdefault(activity.name, [0, 0]),
+                    weekdays.setdefault(Activity.DAY_INDEX[activity.day], [0, 0]),
+                ):
+                    counts[0] += 1
+                    counts[1] += activity.completed
+
+        stats = build_user_statistics(self.user)
+        labels = dict(Activity.DAYS_CHOICES)
+        self.assertEqual(
+            {row['label']: [row['total'], row['completed']] for row in stats['by_activity']}, names
+        )
+        self.assertEqual(
+            {row['label']: [row['total'], row['completed']] for row in stats['by_weekday']},
+            {labels[Activity.DAYS_CHOICES[index][0]]: counts for index, counts in weekdays.items()},
+        )
+        self.assertEqual(
+            [(row['total'], row['completed']) for row in stats['by_week']],
+            [(week.actual_total, week.actual_completed) for week in Week.objects.filter(user=self.user).annotate(
+                **Week.counted_activities()
+            ).order_by('-start_date')],
+        )
+
+    def test_breakdown_queries_do_not_grow_with_history(self):
+        def count_queries():
+            counts = []
+            for breakdown in (completion_by_week, completion_by_weekday, completion_by_activity):
+                with capture_statements() as statements:
+                    breakdown(self.user)
+                counts.append(len(statements))
+            return counts
+
+        self.assertEqual(count_queries(), [1, 1, 3])
+        self.add_weeks(range(-8, -2))
+        self.assertEqual(count_queries(), [1, 1, 3])
+
+    def test_stats_page_is_served_from_cache_until_activities_change(self):
+        self.assertEqual(self.client.get(reverse('tracker:stats')).status_code, 200)
+        with capture_statements() as statements:
+            self.client.get(reverse('tracker:stats'))
+        self.assertFalse([sql for sql, _ in statements if 'tracker_' in sql])
+
+        activity = Activity.objects.get(week__user=self.user, name='Olahraga Sore', completed=False)
+        with self.captureOnCommitCallbacks(execute=True):
+            activity.toggle()
+        response = self.client.get(reverse('tracker:stats'))
+        self.assertEqual(response.context['stats'], build_user_statistics(self.user))
+        self.assertEqual(
+            response.context['stats']['completed_activities'], DailyRollup.totals_for_user(self.user)['completed']
+        )
+
+
+class DashboardFragmentTests(TestCase):
+    """Perubahan aktivitas hanya membuat kolom dashboard hari yang bersangkutan dirender ulang"""
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('fragment_user', password='password')
+        self.client.force_login(self.user)
+        self.week = Week.get_week_by_offset(self.user, 0)
+        self.week.ensure_template()
+        self.activity = Activity.objects.create(week=self.week, day='kamis', name='Custom')
+
+    def assertOnlyDaysChanged(self, days, mutate):
+        self.client.get(reverse('tracker:dashboard'))
+        before = get_day_fragment_keys(self.user, Week.objects.get(pk=self.week.pk), 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            mutate()
+        after = get_day_fragment_keys(self.user, Week.objects.get(pk=self.week.pk), 0)
+        self.assertEqual({day for day, key in after.items() if before[day] != key}, set(days))
+        cached = cache.get_many(list(after.values()))
+        self.assertEqual({day for day, key in after.items() if key not in cached}, set(days))
+        return self.client.get(reverse('tracker:dashboard'))
+
+    def test_unchanged_days_are_served_from_cache(self):
+        self.client.get(reverse('tracker:dashboard'))
+        with capture_statements() as statements:
+            response = self.client.get(reverse('tracker:dashboard'))
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse([sql for sql, _ in statements if 'tracker_activity' in sql])
+
+    def test_template_change_invalidates_all_days(self):
+        self.client.get(reverse('tracker:dashboard'))
+        before = get_day_fragment_keys(self.user, self.week, 0)
+        # Deploy yang mengubah template kolom: fragmen lama tidak boleh dipakai lagi
+        with mock.patch('tracker.views.get_dashboard_template_fingerprint', return_value='deploy-baru'):
+            after = get_day_fragment_keys(self.user, self.week, 0)
+            with capture_statements() as statements:
+                self.assertEqual(self.client.get(reverse('tracker:dashboard')).status_code, 200)
+        self.assertFalse(set(before.values()) & set(after.values()))
+        self.assertTrue([sql for sql, _ in statements if 'tracker_activity' in sql])
+        self.assertEqual(set(cache.get_many(list(after.values()))), set(after.values()))
+
+    def test_mutations_invalidate_only_their_day(self):
+        template_id = TemplateActivity.make_id(self.week.pk, 0)
+        response = self.assertOnlyDaysChanged(['senin'], lambda: self.client.post(
+            reverse('tracker:toggle_activity'), json.dumps({'activity_id': template_id}), content_type='application/json'
+        ))
+        self.assertRegex(response.content.decode(), rf'activity-item completed"\s+data-activity-id="{template_id}"')
+
+        data = {'day': 'kamis', 'name': 'Custom Baru', 'time': '', 'week_offset': 0}
+        response = self.assertOnlyDaysChanged(['kamis'], lambda: self.client.post(
+            reverse('tracker:edit_activity', args=[self.activity.pk]), data
+        ))
+        self.assertContains(response, 'Custom Baru')
+        self.assertOnlyDaysChanged(['kamis', 'sabtu'], lambda: self.client.post(
+            reverse('tracker:edit_activity', args=[self.activity.pk]), {**data, 'day': 'sabtu'}
+        ))
+        self.assertOnlyDaysChanged(['jumat'], lambda: self.client.post(
+            reverse('tracker:add_activity'), {**data, 'day': 'jumat', 'name': 'Tambahan'}
+        ))
+        response = self.assertOnlyDaysChanged(['sabtu'], lambda: self.client.post(
+            reverse('tracker:delete_activity', args=[self.activity.pk])
+        ))
+        self.assertNotContains(response, 'Custom Baru')
+
+
+class BatchToggleTests(SummaryAssertions, TestCase):
+    """Batch toggle mengubah aktivitas milik user sendiri sekaligus dan menjaga counter serta rollup"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('batch_user', password='password')
+        self.client.force_login(self.user)
+        self.week = Week.get_week_by_offset(self.user, 0)
+        self.week.ensure_template()
+        self.custom = [
+            Activity.objects.create(week=self.week, day=day, name='Custom', completed=day == 'rabu')
+            for day in ('senin', 'rabu')
+        ]
+
+    def post(self, payload):
+        response = self.client.post(
+            reverse('tracker:toggle_activities'), json.dumps(payload), content_type='application/json'
+        )
+        data = response.json()
+        self.assertTrue(data['success'], data)
+        week = Week.objects.annotate(**Week.counted_activities()).get(pk=self.week.pk)
+        self.assertEqual(data['progress'], Week.calculate_progress(week.actual_total, week.actual_completed))
+        return data
+
+    def test_whole_day(self):
+        data = self.post({'week_offset': 0, 'day': 'senin', 'completed': True})
+        positions = self.week.template_positions('senin')
+        self.assertEqual(
+            set(data['changed_ids']),
+            {self.custom[0].pk, *(TemplateActivity.make_id(self.week.pk, position) for position in positions)},
+        )
+        self.assertSummariesConsistent(self.user)
+        senin = Week.date_for_day(self.week.start_date, 'senin')
+        self.assertEqual(self.snapshot_rollups(self.user)[senin], (len(positions) + 1, len(positions) + 1))
+
+        # Status yang sudah sama tidak diubah lagi
+        self.assertEqual(self.post({'week_offset': 0, 'day': 'senin', 'completed': True})['changed_ids'], [])
+        self.post({'week_offset': 0, 'day': 'senin', 'completed': False})
+        self.assertSummariesConsistent(self.user)
+        self.assertEqual(self.snapshot_rollups(self.user).get(senin), (len(positions) + 1, 0))
+
+    def test_selection_ignores_other_users_and_weeks(self):
+        other = User.objects.create_user('batch_other', password='password')
+        other_week = Week.get_week_by_offset(other, 0)
+        other_week.ensure_template()
+        foreign = Activity.objects.create(week=other_week, day='senin', name='Milik Lain')
+        previous_week = Week.get_week_by_offset(self.user, -1)
+        previous = Activity.objects.create(week=previous_week, day='senin', name='Minggu Lalu')
+
+        ids = [
+            self.custom[0].pk, self.custom[1].pk, foreign.pk, previous.pk,
+            TemplateActivity.make_id(self.week.pk, 3), TemplateActivity.make_id(other_week.pk, 3),
+        ]
+        data = self.post({'week_offset': 0, 'activity_ids': ids, 'completed': True})
+        self.assertEqual(set(data['changed_ids']), {self.custom[0].pk, TemplateActivity.make_id(self.week.pk, 3)})
+        foreign.refresh_from_db()
+        previous.refresh_from_db()
+        self.assertFalse(foreign.completed or previous.completed)
+        self.assertFalse(Week.objects.get(pk=other_week.pk).template_completed)
+        self.assertSummariesConsistent(self.user)
+        self.assertSummariesConsistent(other)
+
+    def test_model_batch_keeps_summaries(self):
+        self.week.set_completed(Activity.objects.filter(week=self.week), range(0, 40, 2), True)
+        self.assertSummariesConsistent(self.user)
+        self.week.set_completed(Activity.objects.filter(week=self.week, day='rabu'), range(0, 20), False)
+        self.assertSummariesConsistent(self.user)
+
+
+class DeltaSyncTests(TestCase):
+    """Pull delta-sync per halaman kecil harus menghasilkan state yang sama dengan pull penuh"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('sync_user', password='password')
+        self.client.force_login(self.user)
+        self.weeks = [Week.get_week_by_offset(self.user, offset) for offset in (-1, 0)]
+        # Entri template dan aktivitas berbagi sync_seq yang sama, agar halaman terpotong
+        # di tengah kelompok seq dan di perbatasan jenis entri
+        with transaction.atomic():
+            Activity.materialize_template(self.weeks)
+            seq = SyncClock.current(self.user.pk)
+            Activity.objects.bulk_create([
+                Activity(week=week, day='senin', name=f'Custom {i}', sync_seq=seq)
+                for week in self.weeks for i in range(5)
+            ])
+            Week.rebuild_summaries(self.weeks)
+        Activity.set_completed(Activity.objects.filter(week__user=self.user, name__in=['Custom 0', 'Custom 1']), True)
+
+    def fetch(self, cursor=None, limit=None):
+        params = {key: value for key, value in (('cursor', cursor), ('limit', limit)) if value is not None}
+        return self.client.get(reverse('tracker:sync_activities'), params)
+
+    @staticmethod
+    def apply(state, changes):
+        """Menerapkan entri sync ke state perangkat seperti yang dilakukan klien"""
+        for change in changes:
+            if 'template' in change:
+                state['templates'][change['week_id']] = change['template']['completed']
+            elif change['deleted']:
+                state['activities'].pop(change['id'], None)
+            else:
+                state['activities'][change['id']] = (change['day'], change['name'], change['completed'])
+        return state
+
+    def pull(self, cursor=None, limit=None, state=None):
+        """Mengulang pull sampai has_more false; mengembalikan (entri, cursor, state perangkat)"""
+        state = state or {'activities': {}, 'templates': {}}
+        entries = []
+        while True:
+            data = self.fetch(cursor, limit).json()
+            entries += data['changes']
+            self.apply(state, data['changes'])
+            cursor = data['cursor']
+            if not data['has_more']:
+                return entries, cursor, state
+
+    def server_state(self):
+        return {
+            'activities': {
+                activity.pk: (activity.day, activity.name, activity.completed)
+                for activity in Activity.objects.filter(week__user=self.user)
+            },
+            'templates': {
+                week.pk: [activity.position for activity in week.template_activities() if activity.completed]
+                for week in Week.objects.filter(user=self.user, template__isnull=False)
+            },
+        }
+
+    def test_small_pages_match_full_pull(self):
+        Activity.objects.filter(week=self.weeks[0], name='Custom 4').get().delete()
+        full, cursor, state = self.pull()
+        self.assertEqual(state, self.server_state())
+        paged, paged_cursor, paged_state = self.pull(limit=2)
+        self.assertEqual(paged, full)
+        self.assertEqual((paged_cursor, paged_state), (cursor, state))
+        self.assertTrue([entry for entry in full if entry['deleted']])
+        self.assertEqual(len([entry for entry in full if 'template' in entry]), len(self.weeks))
+
+    def test_changes_between_pages_are_not_lost(self):
+        data = self.fetch(limit=3).json()
+        self.assertTrue(data['has_more'])
+        state = self.apply({'activities': {}, 'templates': {}}, data['changes'])
+
+        # Di antara halaman: aktivitas yang sudah terkirim dihapus, yang lain diubah, template ditoggle
+        delivered = next(change['id'] for change in data['changes'] if 'template' not in change)
+        Activity.objects.get(pk=delivered).delete()
+        Activity.objects.filter(week=self.weeks[1], name='Custom 4').get().toggle()
+        self.weeks[0].set_template_completed([5], True)
+        Activity.objects.create(week=self.weeks[1], day='selasa', name='Baru')
+
+        _, cursor, state = self.pull(data['cursor'], limit=2, state=state)
+        self.assertEqual(state, self.server_state())
+        # Pull berikutnya dari cursor terakhir kosong sampai ada perubahan lagi
+        self.assertEqual(self.fetch(cursor).json()['changes'], [])
+
+    def test_legacy_two_part_cursor(self):
+        cursors, entries = [], []
+        cursor = None
+        while True:
+            data = self.fetch(cursor, limit=1).json()
+            if not data['changes']:
+                break
+            cursor = data['cursor']
+            cursors.append(cursor)
+            entries += data['changes']
+
+        index = next(i for i, entry in enumerate(entries) if 'template' not in entry)
+        seq, kind, activity_id = cursors[index].split('-')
+        self.assertEqual(int(kind), Activity.SYNC_ACTIVITY)
+        legacy, _, _ = self.pull(f'{seq}-{activity_id}')
+        self.assertEqual(legacy, entries[index + 1:])
+        for invalid in ('abc', '1-2-3-4'):
+            self.assertEqual(self.fetch(invalid).status_code, 400)
+
+
+class DashboardEtagTests(TestCase):
+    """Dashboard dan API week menjawab 304 selama week tidak berubah, dan ETag berganti setelah setiap perubahan"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('etag_user', password='password')
+        self.client.force_login(self.user)
+        self.week = Week.get_week_by_offset(self.user, 0)
+        self.week.ensure_template()
+        self.activity = Activity.objects.create(week=self.week, day='senin', name='Custom')
+
+    def assertNotModifiedUntilChanged(self, url, etag, mutate):
+        """Mengembalikan ETag baru setelah ``mutate``; ETag lama tidak boleh lagi menghasilkan 304"""
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        mutate()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        return response['ETag']
+
+    def test_dashboard_etag_follows_mutations(self):
+        url = reverse('tracker:dashboard')
+        etag = self.client.get(url)['ETag']
+        toggle = json.dumps({'activity_id': self.activity.pk})
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: self.client.post(
+            reverse('tracker:toggle_activity'), toggle, content_type='application/json'
+        ))
+        template = json.dumps({'activity_id': TemplateActivity.make_id(self.week.pk, 0)})
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: self.client.post(
+            reverse('tracker:toggle_activity'), template, content_type='application/json'
+        ))
+        data = {'day': 'selasa', 'name': 'Tambahan', 'time': '', 'week_offset': 0}
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: self.client.post(
+            reverse('tracker:add_activity'), data
+        ))
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: self.client.post(
+            reverse('tracker:edit_activity', args=[self.activity.pk]), {**data, 'name': 'Custom Baru'}
+        ))
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: self.client.post(
+            reverse('tracker:delete_activity', args=[self.activity.pk])
+        ))
+
+        admin = Client()
+        admin.force_login(User.objects.create_superuser('etag_admin', password='password'))
+        added = Activity.objects.get(week=self.week, name='Tambahan')
+        etag = self.assertNotModifiedUntilChanged(url, etag, lambda: admin.post(
+            reverse('admin:tracker_activity_changelist'),
+            {'action': 'delete_selected', '_selected_action': [added.pk], 'post': 'yes'},
+        ))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+    def test_week_api_etag_follows_mutations(self):
+        url = reverse('tracker:week_api')
+        etag = self.client.get(url)['ETag']
+        etag = self.assertNotModifiedUntilChanged(url, etag, self.activity.toggle)
+        self.assertNotModifiedUntilChanged(url, etag, lambda: self.week.set_template_completed([1, 2], True))
+
+    def test_login_invalidates_cached_csrf_token(self):
+        client = Client(enforce_csrf_checks=True)
+        dashboard = reverse('tracker:dashboard')
+
+        def page_token(response):
+            return re.search(r'name="csrfmiddlewaretoken" value="([^"]+)"', response.content.decode()).group(1)
+
+        def login():
+            page = client.get(reverse('tracker:login'))
+            client.post(reverse('tracker:login'), {
+                'username': 'etag_user', 'password': 'password', 'csrfmiddlewaretoken': page_token(page),
+            })
+
+        login()
+        response = client.get(dashboard)
+        etag, stale_token = response['ETag'], page_token(response)
+        client.post(reverse('tracker:logout'), {'csrfmiddlewaretoken': stale_token})
+        login()
+
+        # Login merotasi secret CSRF: HTML lama (beserta tokennya) tidak boleh dipertahankan lewat 304
+        response = client.get(dashboard, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        payload = json.dumps({'activity_id': self.activity.pk})
+        url = reverse('tracker:toggle_activity')
+        self.assertEqual(
+            client.post(url, payload, content_type='application/json', HTTP_X_CSRFTOKEN=stale_token).status_code, 403
+        )
+        response = client.post(url, payload, content_type='application/json', HTTP_X_CSRFTOKEN=page_token(response))
+        self.assertTrue(response.json()['success'])
+        # Tanpa perubahan apa pun, revalidasi berikutnya tetap 304
+        etag = client.get(dashboard)['ETag']
+        self.assertEqual(client.get(dashboard, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+
+class ApplyHealthyTemplateTests(SummaryAssertions, TestCase):
+    """apply_healthy_template mengganti aktivitas lama dengan rujukan template tanpa merusak ringkasan"""
+
+    def test_replaces_activities_and_keeps_summaries(self):
+        user = User.objects.create_user('template_user', password='password')
+        newcomer = User.objects.create_user('template_newcomer', password='password')
+        week = Week.get_week_by_offset(user, -1)
+        replaced = [
+            Activity.objects.create(week=week, day='senin', name='Custom', completed=True),
+            Activity.objects.create(week=week, day='selasa', name='Salinan Default Lama', is_default=True),
+        ]
+
+        out = io.StringIO()
+        # Di SQLite --workers dipaksa menjadi satu proses
+        call_command('apply_healthy_template', clear_existing=True, workers=2, stdout=out)
+        if connection.vendor == 'sqlite':
+            self.assertIn('--workers diabaikan', out.getvalue())
+
+        self.assertFalse(Activity.objects.filter(pk__in=[activity.pk for activity in replaced]).exists())
+        self.assertEqual(
+            set(ActivityTombstone.objects.filter(user=user).values_list('activity_id', flat=True)),
+            {activity.pk for activity in replaced},
+        )
+        week.refresh_from_db()
+        self.assertEqual(
+            (week.template_total, week.template_completed, week.total_activities, week.completed_activities),
+            (len(DEFAULT_ACTIVITY_TEMPLATE), 0, len(DEFAULT_ACTIVITY_TEMPLATE), 0),
+        )
+        self.assertTrue(Week.objects.filter(user=newcomer, start_date=Week.start_date_for_offset(0)).exists())
+        self.assertSummariesConsistent(user)
+        self.assertSummariesConsistent(newcomer)
+
+
+class RequestMetricsTests(TestCase):
+    """Middleware metrik memasang Server-Timing, mencatat histogram per view, dan /metrics/ khusus staff"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('metrics_user', password='password')
+        self.client.force_login(self.user)
+
+    def test_server_timing_reports_queries_and_duration(self):
+        week = Week.get_week_by_offset(self.user, 0)
+        activity = Activity.objects.create(week=week, day='senin', name='Custom')
+        responses = [
+            self.client.get(reverse('tracker:dashboard')),
+            # View async juga terukur, termasuk query yang berjalan di thread sync_to_async
+            self.client.post(
+                reverse('tracker:toggle_activity'), json.dumps({'activity_id': activity.pk}),
+                content_type='application/json',
+            ),
+        ]
+        for response in responses:
+            match = re.search(
+                r'db;dur=([\d.]+);desc="(\d+) queries", cache;desc="\d+ hit \d+ miss", total;dur=([\d.]+)',
+                response['Server-Timing'],
+            )
+            self.assertIsNotNone(match, response['Server-Timing'])
+            self.assertGreater(int(match.group(2)), 0)
+            self.assertGreaterEqual(float(match.group(3)), float(match.group(1)))
+
+    def test_histograms_grow_after_a_request(self):
+        labels = (('view', 'tracker:dashboard'),)
+
+        def observed():
+            snapshot = registry.snapshot()
+            histogram = snapshot['histograms'].get(('tracker_request_queries', labels), [[], 0.0, 0])
+            return histogram[2], snapshot['counters'].get(('tracker_requests_total', labels + (('status', '2xx'),)), 0)
+
+        before = observed()
+        self.client.get(reverse('tracker:dashboard'))
+        self.assertEqual(observed(), (before[0] + 1, before[1] + 1))
+
+    def test_metrics_endpoint_is_staff_only(self):
+        self.assertEqual(self.client.get(reverse('tracker:metrics')).status_code, 302)
+        self.client.get(reverse('tracker:dashboard'))
+
+        self.client.force_login(User.objects.create_user('metrics_staff', password='password', is_staff=True))
+        response = self.client.get(reverse('tracker:metrics'))
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        body = response.content.decode()
+        self.assertIn('# TYPE tracker_request_duration_seconds histogram', body)
+        self.assertRegex(body, r'tracker_requests_total\{view="tracker:dashboard",status="2xx"\} \d+')
+
+
+class PregenerateWeeksTests(SummaryAssertions, TestCase):
+    """pregenerate_weeks menyiapkan week mendatang beserta template, dan aman dijalankan ulang"""
+
+    def test_creates_next_week_once(self):
+        users = [User.objects.create_user(f'pregen_{i}', password='password') for i in range(2)]
+        inactive = User.objects.create_user('pregen_inactive', password='password', is_active=False)
+        # Week minggu ini yang sudah dibuka tidak diubah
+        current = Week.get_week_by_offset(users[0], 0)
+        current.ensure_template()
+        Activity.objects.create(week=current, day='senin', name='Custom', completed=True)
+        current.refresh_from_db()
+
+        call_command('pregenerate_weeks', batch_size=1, stdout=io.StringIO())
+        next_start = Week.start_date_for_offset(1)
+        for user in users:
+            week = Week.objects.get(user=user, start_date=next_start)
+            self.assertTrue(week.template_applied)
+            self.assertEqual(
+                (week.template_total, week.total_activities, week.completed_activities),
+                (len(DEFAULT_ACTIVITY_TEMPLATE), len(DEFAULT_ACTIVITY_TEMPLATE), 0),
+            )
+            rollups = DailyRollup.objects.filter(user=user, date__range=(week.start_date, week.end_date))
+            self.assertEqual(sum(rollups.values_list('total', flat=True)), len(DEFAULT_ACTIVITY_TEMPLATE))
+            self.assertSummariesConsistent(user)
+        self.assertFalse(Week.objects.filter(user=inactive).exists())
+        unchanged = Week.objects.get(pk=current.pk)
+        self.assertEqual(
+            (unchanged.revision, unchanged.total_activities, unchanged.completed_activities),
+            (current.revision, current.total_activities, current.completed_activities),
+        )
+
+        weeks = list(Week.objects.order_by('pk').values_list('pk', 'revision', 'total_activities'))
+        out = io.StringIO()
+        call_command('pregenerate_weeks', batch_size=1, stdout=out)
+        self.assertIn('Week baru: 0, diisi template: 0', out.getvalue())
+        self.assertEqual(list(Week.objects.order_by('pk').values_list('pk', 'revision', 'total_activities')), weeks)
+
+
+class SeedTrackerTests(SummaryAssertions, TestCase):
+    """seed_tracker membuat data sintetis yang ringkasannya langsung konsisten tanpa recount"""
+
+    def test_small_seed_has_no_drift(self):
+        call_command('seed_tracker', users=2, weeks=2, custom_activities=3, chunk_size=1, stdout=io.StringIO())
+        users = list(User.objects.filter(username__startswith='seed_user_'))
+        self.assertEqual(len(users), 2)
+        self.assertEqual(UserProfile.objects.filter(user__in=users).count(), 2)
+
+        weeks = Week.objects.filter(user__in=users)
+        self.assertTrue(2 <= weeks.count() <= 4)
+        self.assertEqual(Activity.objects.filter(week__in=weeks).count(), weeks.count() * 3)
+        self.assertEqual(set(weeks.values_list('template_total', flat=True)), {len(DEFAULT_ACTIVITY_TEMPLATE)})
+        for user in users:
+            self.assertSummariesConsistent(user)
+
+        out = io.StringIO()
+        call_command('recount_week_progress', check=True, stdout=out)
+        self.assertIn(f'0 dari {weeks.count()} week memiliki counter yang drift', out.getvalue())
+
+        # Username yang sudah ada tidak ditimpa
+        with self.assertRaises(CommandError):
+            call_command('seed_tracker', users=2, weeks=2, stdout=io.StringIO())
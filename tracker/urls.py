@@ -26,7 +26,19 @@ urlpatterns = [
     
     # AJAX endpoints (login required)
     path('toggle-activity/', views.toggle_activity, name='toggle_activity'),
+    path('toggle-activities/', views.toggle_activities, name='toggle_activities'),
+    
+    # JSON API (login required)
+    path('api/week/', views.week_api, name='week_api'),
+    path('api/sync/', views.sync_activities, name='sync_activities'),
+    
+    # Ekspor dan impor riwayat aktivitas (login required)
+    path('export/', views.export_activities, name='export_activities'),
+    path('import/', views.import_activities, name='import_activities'),
     
     # Statistics (login required)
     path('stats/', views.stats, name='stats'),
+    
+    # Metrik Prometheus (khusus staff)
+    path('metrics/', views.metrics, name='metrics'),
 ]
\ No newline at end of file